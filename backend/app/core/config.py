@@ -34,6 +34,135 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str | None = None
     EMAILS_FROM_EMAIL: str | None = None
 
+    # Admin endpoints (model warm-up, stats). When unset, the endpoints are disabled.
+    ADMIN_TOKEN: str | None = None
+
+    # Resume analyzer NLP models are loaded lazily; set this to load them during startup instead
+    PRELOAD_NLP_MODELS: bool = False
+
+    # Batched NER for resume name extraction
+    NER_BATCH_SIZE: int = 16
+    # How long concurrent single-resume requests wait to share one batched NER pool task (0 disables)
+    NER_BATCH_MAX_WAIT_MS: int = 10
+
+    # Resume document extraction limits
+    RESUME_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    RESUME_MAX_PAGES: int = 30
+
+    # Resume analysis process pool and bulk screening limits
+    RESUME_POOL_WORKERS: int = 2
+    # Tasks allowed to be queued or running before new requests get a 503
+    RESUME_POOL_MAX_PENDING: int = 8
+    RESUME_POOL_RETRY_AFTER_SECONDS: int = 5
+
+    # Resume analysis cache: in-process LRU in front of a MongoDB collection with a TTL
+    RESUME_CACHE_MAX_ENTRIES: int = 512
+    RESUME_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    BULK_RESUME_MAX_FILES: int = 500
+    BULK_RESUME_MAX_TOTAL_BYTES: int = 200 * 1024 * 1024
+
+    # Shared Gemini client: concurrency and request rate sized to the API quota.
+    # Reserved slots are only used by live interview traffic.
+    AI_MAX_CONCURRENCY: int = 8
+    AI_REQUESTS_PER_MINUTE: float = 60.0
+    AI_BURST: int = 10
+    AI_LIVE_RESERVED_SLOTS: int = 2
+    # One retry policy for every Gemini call: exponential backoff with full jitter
+    AI_MAX_RETRIES: int = 4
+    AI_BACKOFF_BASE_SECONDS: float = 1.0
+    AI_BACKOFF_MAX_SECONDS: float = 30.0
+    AI_RETRY_BUDGET_SECONDS: float = 60.0
+
+    # Resume AI feedback: how long a request waits before returning the feedback as pending,
+    # and the total time background generation gets, retries included
+    AI_FEEDBACK_DEADLINE_SECONDS: float = 8.0
+    AI_FEEDBACK_RETRY_BUDGET_SECONDS: float = 120.0
+
+    # Text-to-speech for the HR interviewer: "gtts" (network), "espeak" (local, offline) or "silent" (tests)
+    TTS_BACKEND: str = "gtts"
+    TTS_MAX_WORKERS: int = 4
+    # Per-sentence audio cache on disk, evicted least-recently-used past the byte cap (0 disables it)
+    TTS_CACHE_DIR: str = "tts_cache"
+    TTS_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    # Clips handed out as audio URLs are not evicted for this long, so the client can fetch them
+    TTS_CLIP_PIN_SECONDS: float = 600.0
+
+    # In-progress HR interviews kept in memory, so turns do not re-read the session from MongoDB
+    HR_SESSION_CACHE_MAX_ENTRIES: int = 1000
+
+    # Speculative HR follow-ups from partial transcripts: a new speculation needs this many more
+    # characters of answer, and the final answer must be this similar (0-1) to reuse one
+    HR_SPECULATION_ENABLED: bool = True
+    HR_SPECULATION_MIN_NEW_CHARS: int = 80
+    HR_SPECULATION_MATCH_THRESHOLD: float = 0.8
+    HR_SPECULATION_MAX_PER_TURN: int = 3
+    # Speculations of interviews with no new partial transcript for this long are dropped
+    HR_SPECULATION_TTL_SECONDS: float = 300.0
+    HR_SPECULATION_MAX_INTERVIEWS: int = 1000
+    # Role question banks generated at startup, used when a live turn cannot be generated
+    HR_PREWARM_QUESTION_BANK: bool = True
+    HR_QUESTION_BANK_SIZE: int = 8
+
+    # Background feedback jobs: local worker tasks, how long a request waits for the result
+    # before returning the job for polling, and how often abandoned jobs are re-queued
+    FEEDBACK_JOB_WORKERS: int = 2
+    FEEDBACK_JOB_WAIT_SECONDS: float = 30.0
+    FEEDBACK_JOB_POLL_SECONDS: float = 1.0
+    FEEDBACK_JOB_RECOVERY_SECONDS: float = 30.0
+    FEEDBACK_JOB_STALE_SECONDS: float = 300.0
+    # Finished jobs (and their feedback) are deleted this long after they finish
+    FEEDBACK_JOB_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # Review sources (SerpAPI, Reddit): base URLs (point them at the local stub server for testing),
+    # per-source timeouts, and the circuit breaker that skips a source after repeated failures
+    SERPAPI_BASE_URL: str = "https://serpapi.com"
+    REDDIT_BASE_URL: str = "https://www.reddit.com"
+    SERPAPI_TIMEOUT_SECONDS: float = 10.0
+    REDDIT_TIMEOUT_SECONDS: float = 5.0
+    REVIEW_SOURCE_BREAKER_FAILURES: int = 5
+    REVIEW_SOURCE_BREAKER_RESET_SECONDS: float = 60.0
+    REVIEW_HTTP_MAX_CONNECTIONS: int = 20
+    REVIEW_HTTP_KEEPALIVE_SECONDS: float = 30.0
+
+    # Company interview reviews cache: entries older than the soft TTL are served stale while a
+    # background refresh regenerates them; entries nobody refreshes are deleted after the hard TTL
+    REVIEW_CACHE_SOFT_TTL_SECONDS: int = 24 * 3600
+    REVIEW_CACHE_HARD_TTL_SECONDS: int = 7 * 24 * 3600
+    # Scheduled refresh of the most requested companies, so they are regenerated before going stale
+    REVIEW_PREWARM_ENABLED: bool = True
+    REVIEW_PREWARM_TOP_N: int = 20
+    REVIEW_PREWARM_INTERVAL_SECONDS: float = 3600.0
+
+    # Group discussion room state: "memory" (single worker only) or "mongo" (shared by all workers).
+    # With several workers, also set the Socket.IO message queue (redis://... or amqp://...)
+    # so broadcasts reach clients connected to other workers
+    GD_ROOM_STORE: str = "memory"
+    SOCKETIO_MESSAGE_QUEUE_URL: Optional[str] = None
+    # Room garbage collection: how often the sweeper runs, how long an empty room is kept (so a
+    # reconnecting participant finds it), and how long a room may wait without any join or leave
+    GD_ROOM_SWEEP_INTERVAL_SECONDS: float = 30.0
+    GD_EMPTY_ROOM_GRACE_SECONDS: float = 120.0
+    GD_WAITING_ROOM_TTL_SECONDS: float = 1800.0
+    # Joins and leaves within this window are sent as one participant_update per room
+    GD_PARTICIPANT_UPDATE_WINDOW_SECONDS: float = 0.25
+
+    # GD transcripts collected on the /gd namespace: utterances kept in memory per room, the
+    # batch size and interval for writing them to MongoDB, and how many new utterances trigger
+    # a rolling partial evaluation (must stay below the buffer size). A room's running notes are
+    # kept for GD_TRANSCRIPT_RETAIN_SECONDS after everyone leaves, for late end_discussion requests.
+    GD_TRANSCRIPT_BUFFER_SIZE: int = 500
+    GD_TRANSCRIPT_BATCH_SIZE: int = 20
+    GD_TRANSCRIPT_FLUSH_SECONDS: float = 5.0
+    GD_PARTIAL_EVALUATION_EVERY: int = 15
+    GD_TRANSCRIPT_RETAIN_SECONDS: float = 300.0
+
+    # Pre-generated GD topics per difficulty: pool size, the level that triggers a background
+    # refill, and how many recently used topics are never handed out again
+    GD_TOPIC_POOL_SIZE: int = 10
+    GD_TOPIC_POOL_LOW_WATERMARK: int = 3
+    GD_TOPIC_RECENT_SIZE: int = 200
+    GD_PREWARM_TOPIC_POOL: bool = True
+
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
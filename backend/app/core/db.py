@@ -10,6 +10,12 @@ room_collection = database.get_collection("rooms")
 interview_sessions_collection = database.get_collection("interview_sessions")
 # Add the new collection for caching interview reviews
 interview_reviews_cache_collection = database.get_collection("interview_reviews_cache")
+# Cached resume extraction results and AI feedback
+resume_analysis_cache_collection = database.get_collection("resume_analysis_cache")
+# Background HR/GD feedback generation jobs, one per session and kind
+feedback_jobs_collection = database.get_collection("feedback_jobs")
+# Group discussion utterances collected on the /gd namespace, one document per utterance
+gd_transcripts_collection = database.get_collection("gd_transcripts")
 
 async def get_user_by_email(email: str):
     return await user_collection.find_one({"email": email})
@@ -1,7 +1,8 @@
+import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from jose import JWTError, jwt
@@ -79,3 +80,18 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserOut:
         del user_dict["_id"]
 
     return UserOut(**user_dict)
+
+
+# --- Admin Authentication ---
+async def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Guards operational endpoints with the shared ADMIN_TOKEN; they stay closed when none is configured."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled",
+        )
+    if not secrets.compare_digest(x_admin_token or "", settings.ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or missing admin token",
+        )
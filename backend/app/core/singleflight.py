@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from .metrics import metrics
+
+# --- Metrics ---
+
+singleflight_calls = metrics.counter(
+    "singleflight_calls_total", "Coalesced calls by group and role (leader runs the work, shared waits on it)."
+)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the work, and every
+    caller that arrives while it is running awaits the same result (or exception).
+    Nothing is cached once the call finishes. Must be used from a single event loop.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._calls.get(key)
+        if future is not None:
+            singleflight_calls.inc(group=self.name, role="shared")
+            return await asyncio.shield(future)
+
+        singleflight_calls.inc(group=self.name, role="leader")
+        # A task, so a leader whose request is cancelled does not cancel the waiters' work
+        future = self._calls[key] = asyncio.ensure_future(fn())
+        future.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(future)
+
+    def _finished(self, key: Hashable, future: "asyncio.Future[Any]") -> None:
+        self._calls.pop(key, None)
+        if not future.cancelled():
+            # Marks the exception as retrieved when every caller has gone away
+            future.exception()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -1,4 +1,17 @@
+import logging
+
 import socketio
+from fastapi import HTTPException
+
+from .config import settings
+from .security import get_current_user
+from ..services import hr_interview_service
+from ..services.feedback_jobs import DONE, FAILED, feedback_jobs, public_view
+from ..services.room_store import IN_PROGRESS, room_store
+from ..services.room_broadcast import ParticipantUpdateCoalescer
+from ..services.gd_transcripts import transcript_collector
+
+logger = logging.getLogger(__name__)
 
 # ✅ Define allowed origins for WebSockets
 origins = [
@@ -8,58 +21,244 @@ origins = [
     "http://127.0.0.1:5173",
 ]
 
+
+def create_client_manager():
+    """
+    The Socket.IO message queue that relays emits and room membership between workers.
+    None (the default) keeps everything in this process, which only works with one worker.
+    """
+    url = settings.SOCKETIO_MESSAGE_QUEUE_URL
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://")):
+        return socketio.AsyncRedisManager(url)
+    if url.startswith(("amqp://", "amqps://")):
+        return socketio.AsyncAioPikaManager(url)
+    raise ValueError(f"Unsupported SOCKETIO_MESSAGE_QUEUE_URL {url!r}; expected redis:// or amqp://.")
+
+
 # ✅ Create the async Socket.IO server instance here
-sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins=origins)
+sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins=origins, client_manager=create_client_manager())
+
+# --- Socket Authentication ---
+
+async def authenticate_token(token: str):
+    """The user a JWT belongs to, or None when it does not validate."""
+    try:
+        return await get_current_user(token)
+    except HTTPException:
+        return None
+
+
+# --- Feedback Job Notifications ---
+
+def feedback_job_room(job_id: str) -> str:
+    return f"feedback-job:{job_id}"
+
+
+async def watch_feedback_job(namespace: str, sid, data, user=None) -> None:
+    """
+    Subscribes a client to a feedback job ({"job_id"}). It receives one feedback_job_update
+    when the job finishes, or immediately if it already has. Jobs are only delivered to the
+    user they belong to.
+    """
+    job_id = (data or {}).get("job_id")
+    if not job_id:
+        return
+    job = await feedback_jobs.get(job_id)
+    if job is None or user is None or job.get("user_id") != str(user.id):
+        return
+    await sio.enter_room(sid, feedback_job_room(job_id), namespace=namespace)
+    if job["status"] in (DONE, FAILED):
+        await sio.emit("feedback_job_update", public_view(job), to=sid, namespace=namespace)
+
+
+async def notify_feedback_job(job) -> None:
+    for namespace in ("/", "/interview", "/gd"):
+        await sio.emit("feedback_job_update", public_view(job), room=feedback_job_room(job["_id"]), namespace=namespace)
+
+
+feedback_jobs.add_listener(notify_feedback_job)
+
+
+@sio.on("watch_feedback_job")
+async def on_watch_feedback_job(sid, data):
+    # The default namespace has no connect-time auth, so the client sends its "token" here
+    token = (data or {}).get("token")
+    await watch_feedback_job("/", sid, data, await authenticate_token(token) if token else None)
+
 
 # --- Namespaces ---
-class InterviewNamespace(socketio.AsyncNamespace):
-    async def on_connect(self, sid, environ):
+class AuthenticatedNamespace(socketio.AsyncNamespace):
+    """Namespace whose clients may authenticate at connect time, or per event with a "token"."""
+
+    async def _authenticate_connection(self, sid, auth) -> None:
+        # Clients may authenticate once at connect time with {"token": <JWT>}
+        token = (auth or {}).get("token")
+        if token:
+            user = await self._authenticate(token)
+            if user is None:
+                raise socketio.exceptions.ConnectionRefusedError("Could not validate credentials")
+            await self.save_session(sid, {"user": user})
+
+    async def _authenticate(self, token: str):
+        return await authenticate_token(token)
+
+    async def _session_user(self, sid, data):
+        session = await self.get_session(sid)
+        return session.get("user") or (await self._authenticate(data["token"]) if data.get("token") else None)
+
+
+class InterviewNamespace(AuthenticatedNamespace):
+    async def on_connect(self, sid, environ, auth=None):
         print(f"🔌 Interview socket connected: {sid}")
+        await self._authenticate_connection(sid, auth)
 
     async def on_disconnect(self, sid):
         print(f"❌ Interview socket disconnected: {sid}")
+        session = await self.get_session(sid)
+        for interview_id in session.get("speculating", ()):
+            hr_interview_service.discard_speculations(interview_id)
+
+    async def on_watch_feedback_job(self, sid, data):
+        await watch_feedback_job(self.namespace, sid, data, await self._session_user(sid, data or {}))
+
+    async def on_hr_partial_transcript(self, sid, data):
+        """
+        Partial transcript of the answer the candidate is still giving ({"interview_id", "text"}).
+        Lets the server start generating the follow-up question before the answer is final.
+        """
+        data = data or {}
+        user = await self._session_user(sid, data)
+        if user is None or not data.get("interview_id"):
+            return
+        if await hr_interview_service.speculate_follow_up(data["interview_id"], str(user.id), data.get("text", "")):
+            # Remembered so the speculations can be dropped if the client disconnects mid-answer
+            async with self.session(sid) as session:
+                session.setdefault("speculating", set()).add(data["interview_id"])
+
+    async def on_hr_respond(self, sid, data):
+        """
+        Streaming counterpart of POST /api/v1/hr/respond. Takes the same fields as HRRequest
+        (plus "token" when the connection was not authenticated) and streams the turn back as
+        hr_turn_started, hr_text deltas, per-sentence binary hr_audio frames and hr_turn_completed.
+        hr_turn_reset means the text and audio received so far for the turn should be discarded.
+        """
+        data = data or {}
+        user = await self._session_user(sid, data)
+        if user is None:
+            await self.emit("hr_error", {"detail": "Could not validate credentials"}, to=sid)
+            return
+
+        async def emit_to_client(event, payload):
+            await self.emit(event, payload, to=sid)
+
+        result = await hr_interview_service.stream_hr_response(
+            conversation_history=data.get("conversation") or [],
+            user_id=str(user.id),
+            user_name=user.full_name,
+            emit=emit_to_client,
+            interview_id=data.get("interview_id"),
+            answer=data.get("answer"),
+            role=data.get("role", "default"),
+            company=data.get("company", "our company"),
+            experience_level=data.get("experience_level", "candidate"),
+        )
+        if "error" in result:
+            logger.error(f"Streamed HR turn failed for {sid}: {result['error']}")
+            await self.emit("hr_error", {"detail": result["error"]}, to=sid)
+
+class GDNamespace(AuthenticatedNamespace):
+    # Rooms are created with POST /gd/create-room and started by the REST join flow; this
+    # namespace only joins rooms that already exist in the shared GD room store
 
-class GDNamespace(socketio.AsyncNamespace):
     def __init__(self, namespace):
         super().__init__(namespace)
-        self.gd_rooms = {}
-        self.MAX_PARTICIPANTS = 1  # Keep at 1 for testing
+        self.participant_updates = ParticipantUpdateCoalescer(
+            self._emit_participant_update, settings.GD_PARTICIPANT_UPDATE_WINDOW_SECONDS
+        )
 
-    async def on_connect(self, sid, environ):
+    async def _emit_participant_update(self, room_id, payload):
+        await self.emit("participant_update", payload, room=room_id)
+
+    async def on_connect(self, sid, environ, auth=None):
         print(f"🔌 GD socket connected: {sid}")
+        await self._authenticate_connection(sid, auth)
 
     async def on_disconnect(self, sid):
         print(f"❌ GD socket disconnected: {sid}")
-        for room_id, info in list(self.gd_rooms.items()):
-            if sid in info["participants"]:
-                info["participants"].remove(sid)
-                count = len(info["participants"])
-                await self.emit("participant_update", {"count": count}, room=room_id)
-                if count == 0:
-                    del self.gd_rooms[room_id]
-                    print(f"🗑️ Deleted empty room {room_id}")
+        for room_id in await room_store.rooms_for(sid):
+            room = await room_store.leave(room_id, sid)
+            if room is None:
+                continue
+            count = len(room["participants"])
+            self.participant_updates.left(room_id, sid, count)
+            # Empty rooms are left to the sweeper's grace period (GD_EMPTY_ROOM_GRACE_SECONDS),
+            # like the REST rooms they are; only the transcript state starts winding down
+            if count == 0:
+                transcript_collector.close(room_id)
 
     async def on_join_room(self, sid, data):
-        room_id = data.get("roomId")
+        room_id = (data or {}).get("roomId")
         if not room_id:
             print("⚠️ No roomId provided")
             return
 
-        if room_id not in self.gd_rooms:
-            self.gd_rooms[room_id] = {"participants": set()}
-
+        room = await room_store.join(room_id, sid)
+        if room is None:
+            print(f"⚠️ {sid} tried to join non-existent room {room_id}")
+            await self.emit("room_closed", {"roomId": room_id}, to=sid)
+            return
         await self.enter_room(sid, room_id)
-        self.gd_rooms[room_id]["participants"].add(sid)
 
-        count = len(self.gd_rooms[room_id]["participants"])
+        count = len(room["participants"])
         print(f"✅ {sid} joined room {room_id} ({count} participants)")
-        await self.emit("participant_update", {"count": count}, room=room_id)
+        await self.emit("participant_update", {"count": count, "joined": room["participants"], "left": []}, to=sid)
+        self.participant_updates.joined(room_id, sid, count)
+
+        # Late joiners of a discussion that already started get its topic
+        if room["status"] == IN_PROGRESS:
+            await self.emit("gd_started", {"topic": room["topic"], "duration": 300}, to=sid)  # 5 minutes
+
+    async def on_utterance(self, sid, data):
+        """
+        One finished utterance by this participant ({"roomId", "text", "name"}), from chat or
+        speech recognition. It is relayed to the room as gd_utterance and added to the transcript.
+        """
+        data = data or {}
+        room_id, text = data.get("roomId"), (data.get("text") or "").strip()
+        if not room_id or not text or room_id not in self.rooms(sid):
+            return
+        utterance = transcript_collector.append(room_id, sid, data.get("name") or f"Participant {sid[:5]}", text)
+        await self.emit(
+            "gd_utterance",
+            {"seq": utterance["seq"], "sid": sid, "name": utterance["name"], "text": text},
+            room=room_id,
+        )
+
+    async def on_end_discussion(self, sid, data):
+        """
+        Requests this participant's feedback once the timer ends ({"roomId"}, plus "token" when
+        the connection was not authenticated). Returns the feedback job (as the acknowledgement)
+        and sends feedback_job_update when it is done.
+        """
+        data = data or {}
+        room_id = data.get("roomId")
+        if not room_id:
+            return {"error": "roomId is required"}
+        if room_id not in self.rooms(sid):
+            return {"error": "Not a participant of this room"}
+        user = await self._session_user(sid, data)
+        if user is None:
+            return {"error": "Could not validate credentials"}
+        job = await feedback_jobs.enqueue(
+            "gd_live", f"{room_id}:{sid}", user_id=str(user.id), payload={"room_id": room_id, "sid": sid}
+        )
+        await watch_feedback_job(self.namespace, sid, {"job_id": job["_id"]}, user)
+        return public_view(job)
 
-        if count >= self.MAX_PARTICIPANTS:
-            topic = "The Impact of AI on Future Jobs"
-            duration = 5  # minutes
-            print(f"🚀 Starting GD for room {room_id}")
-            await self.emit("gd_started", {"topic": topic, "duration": duration}, room=room_id)
+    async def on_watch_feedback_job(self, sid, data):
+        await watch_feedback_job(self.namespace, sid, data, await self._session_user(sid, data or {}))
 
 # --- Instantiate Namespaces ---
 interview_socket = InterviewNamespace('/interview')
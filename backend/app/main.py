@@ -1,10 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import socketio
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from .core.config import settings
 from .core.sockets import sio, interview_socket, gd_socket # Import sio from its new central location
+from .services.resume_pool import resume_pool
+from .services.speech_service import speech_engine
+from .services.feedback_jobs import feedback_jobs
+from .services.gd_topics import topic_pool
+from .services.room_store import MongoRoomStore, room_store
+from .services.gd_transcripts import transcript_collector
+from .services import hr_interview_service, interview_review_service, review_sources
 
 # ✅ Initialize FastAPI
 app = FastAPI(title="AI Mock Interview API")
@@ -17,13 +25,88 @@ origins = [
     "http://127.0.0.1:5173",
 ]
 
+# ✅ Long-running background tasks started at startup, cancelled at shutdown. Kept here rather
+# than on app.state: `app` is rebound to the Socket.IO ASGIApp below, which has no state.
+background_tasks = {}
+
 # ✅ Database connection
 @app.on_event("startup")
 async def startup_db_client():
     app.mongodb_client = AsyncIOMotorClient(settings.MONGO_DATABASE_URI)
     app.database = app.mongodb_client[settings.MONGO_DATABASE_NAME]
-    cache_collection = app.database["interview_reviews_cache"]
-    await cache_collection.create_index("created_at", expireAfterSeconds=259200)
+    await interview_review_service.ensure_cache_indexes()
+    resume_cache_collection = app.database["resume_analysis_cache"]
+    await resume_cache_collection.create_index("created_at", expireAfterSeconds=settings.RESUME_CACHE_TTL_SECONDS)
+    await app.database["feedback_jobs"].create_index("status")
+    await app.database["feedback_jobs"].create_index("finished_at", expireAfterSeconds=settings.FEEDBACK_JOB_TTL_SECONDS)
+    await app.database["gd_transcripts"].create_index([("room_id", 1), ("sid", 1), ("seq", 1)], unique=True)
+    if isinstance(room_store, MongoRoomStore):
+        await room_store.ensure_indexes()
+
+# ✅ Optionally start the resume pool (and load its NLP models) before the worker accepts traffic
+@app.on_event("startup")
+async def preload_nlp_models():
+    if settings.PRELOAD_NLP_MODELS:
+        await resume_pool.warm_up()
+
+# ✅ Generate the HR role question banks in the background (low priority on the Gemini quota)
+@app.on_event("startup")
+async def prewarm_hr_question_bank():
+    if settings.HR_PREWARM_QUESTION_BANK:
+        background_tasks["question_bank"] = asyncio.create_task(hr_interview_service.prewarm_question_bank())
+
+# ✅ Fill the GD topic pools in the background, so rooms start without waiting on Gemini
+@app.on_event("startup")
+async def prewarm_gd_topic_pool():
+    if settings.GD_PREWARM_TOPIC_POOL:
+        background_tasks["topic_pool"] = asyncio.create_task(topic_pool.warm_up())
+
+# ✅ Garbage-collect empty and idle GD rooms
+@app.on_event("startup")
+async def start_gd_room_sweeper():
+    background_tasks["gd_room_sweeper"] = asyncio.create_task(gd_router.sweep_rooms())
+
+# ✅ Refresh the most requested companies' interview reviews before they go stale
+@app.on_event("startup")
+async def start_review_prewarmer():
+    if settings.REVIEW_PREWARM_ENABLED:
+        background_tasks["review_prewarmer"] = asyncio.create_task(interview_review_service.prewarm_popular_companies())
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in background_tasks.values():
+        task.cancel()
+    background_tasks.clear()
+
+# ✅ Start the feedback job workers (and recover jobs left behind by a previous process)
+@app.on_event("startup")
+async def start_feedback_jobs():
+    feedback_jobs.start()
+
+@app.on_event("shutdown")
+async def stop_feedback_jobs():
+    await feedback_jobs.stop()
+
+# ✅ Write collected GD transcripts to MongoDB in batches (and flush what is left on shutdown)
+@app.on_event("startup")
+async def start_transcript_collector():
+    transcript_collector.start()
+
+@app.on_event("shutdown")
+async def stop_transcript_collector():
+    await transcript_collector.stop()
+
+@app.on_event("shutdown")
+async def close_review_sources():
+    await review_sources.close_http_client()
+
+@app.on_event("shutdown")
+async def shutdown_resume_pool():
+    resume_pool.shutdown()
+
+@app.on_event("shutdown")
+async def shutdown_speech_engine():
+    speech_engine.shutdown()
 
 # ✅ 1. Add CORS middleware to the FastAPI app first
 app.add_middleware(
@@ -35,7 +118,7 @@ app.add_middleware(
 )
 
 # ✅ 2. Import and register socket events and API routers
-from .routers import auth, chatbot, dashboard, resume, hr, interview_review, career_advisor, job_tracker, gd_router, resume_router
+from .routers import auth, chatbot, dashboard, resume, hr, interview_review, career_advisor, job_tracker, gd_router, resume_router, admin, feedback_jobs as feedback_jobs_router
 from .api.endpoints import streaming
 
 # Register Socket.IO namespaces
@@ -53,6 +136,8 @@ app.include_router(chatbot.router, prefix="/api/v1/chatbot", tags=["Chatbot"])
 app.include_router(streaming.router, prefix="/api/v1/streaming", tags=["Streaming"])
 app.include_router(career_advisor.router, prefix="/api/v1/career-path", tags=["Career Advisor"])
 app.include_router(job_tracker.router, prefix="/api/v1/job-tracker/rankings", tags=["Job Tracker"])
+app.include_router(feedback_jobs_router.router, prefix="/api/v1/feedback-jobs", tags=["Feedback Jobs"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["Admin"])
 
 @app.get("/", tags=["Root"])
 async def read_root():
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Literal
 from datetime import datetime
 import uuid
 
@@ -9,13 +9,20 @@ class HRRequest(BaseModel):
     role: str
     company: str
     experience_level: str
-    conversation: List[Dict[str, Any]]
+    # The server keeps the transcript: send the latest `answer` with the `interview_id`.
+    # Older clients may still send the full `conversation` instead.
+    conversation: Optional[List[Dict[str, Any]]] = None
+    answer: Optional[str] = None
     interview_id: Optional[str] = None
+    # "inline": base64 audio in the response body. "url": a link to the range-capable audio endpoint.
+    audio_delivery: Literal["inline", "url"] = "inline"
 
 class HRResponse(BaseModel):
     """Response model for the /hr/respond endpoint."""
     text: str
-    audio: str
+    audio: Optional[str] = None
+    audio_url: Optional[str] = None
+    audio_media_type: Optional[str] = None
     interview_id: str
 
 class HRInterviewSession(BaseModel):
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from ..core.metrics import metrics
+from ..core.security import require_admin_token
+from ..services.ai_client import ai_client
+from ..services.model_registry import models
+from ..services.resume_pool import resume_pool
+from ..services import review_sources
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/models", tags=["Admin"])
+async def get_model_stats():
+    """
+    Returns the load state, load time and memory footprint of every NLP model registered
+    in this API process. Resume analysis itself runs in the resume pool workers; use the
+    warm-up endpoint to see their stats.
+    """
+    return {"models": models.stats()}
+
+
+@router.post("/models/warm-up", tags=["Admin"])
+async def warm_up_models():
+    """
+    Starts every resume pool worker and loads its NLP models, so the API worker can serve
+    resume analysis without a cold start. Intended to be called before the worker joins
+    the load balancer.
+    """
+    workers = await resume_pool.warm_up()
+    failed = [worker for worker in workers if any(entry["error"] for entry in worker["models"])]
+    if failed:
+        raise HTTPException(status_code=500, detail={"message": "Some models failed to load.", "workers": workers})
+    return {"workers": workers}
+
+
+@router.get("/ai", tags=["Admin"])
+async def get_ai_client_stats():
+    """
+    Returns the shared Gemini client's cached model handles and current admission state
+    (calls in flight and calls queued for a slot).
+    """
+    return ai_client.stats()
+
+
+@router.get("/review-sources", tags=["Admin"])
+async def get_review_source_stats():
+    """Returns whether the review HTTP client uses HTTP/2 and each source's circuit breaker state."""
+    return review_sources.stats()
+
+
+@router.get("/metrics", tags=["Admin"])
+async def get_metrics(format: str = "json"):
+    """
+    Returns this process's metrics as JSON, or in Prometheus text format with `?format=prometheus`.
+    """
+    if format == "prometheus":
+        return PlainTextResponse(metrics.render_prometheus())
+    return metrics.snapshot()
@@ -0,0 +1,34 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+
+from ..core.config import settings
+from ..core.security import get_current_user
+from ..models.user import UserOut
+from ..services.feedback_jobs import DONE, FAILED, feedback_jobs, public_view
+
+router = APIRouter()
+
+
+async def job_response(job: Dict[str, Any]) -> Any:
+    """
+    Waits up to FEEDBACK_JOB_WAIT_SECONDS for a feedback job. Returns the feedback itself when
+    it finishes in time (the same body the endpoints always returned), or 202 with the job's
+    status so the client can poll GET /api/v1/feedback-jobs/{job_id} or watch it over Socket.IO.
+    """
+    job = await feedback_jobs.wait(job, settings.FEEDBACK_JOB_WAIT_SECONDS)
+    if job["status"] == DONE:
+        return job["result"]
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=500, detail=f"Feedback generation failed: {job.get('error')}")
+    return JSONResponse(status_code=202, content=public_view(job))
+
+
+@router.get("/{job_id}", tags=["Feedback Jobs"])
+async def get_feedback_job(job_id: str, current_user: UserOut = Depends(get_current_user)):
+    """Returns the status of a feedback job, and its result once it is done."""
+    job = await feedback_jobs.get(job_id)
+    if job is None or job.get("user_id") != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Feedback job not found.")
+    return public_view(job)
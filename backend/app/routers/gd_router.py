@@ -1,20 +1,35 @@
 # c/Users/misba/OneDrive/Documents/aimock/backend/app/routers/gd_router.py
 
 import asyncio
+import hashlib
 from fastapi.exceptions import HTTPException
 import uuid
 import logging
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Union
+import json
 
 # Import 'sio' from its original source to avoid circular imports
+from ..core.config import settings
+from ..core.security import get_current_user
 from ..core.sockets import sio
-# ✅ Import the real Gemini topic generator
-from ..services.discussion_service import generate_discussion_topic
-from ..services.feedback_service import generate_gd_feedback
+from ..models.user import UserOut
+# ✅ Rooms start with a pre-generated topic (generated on demand only if the pool is empty)
+from ..services.gd_topics import topic_pool
+from ..services.room_store import IN_PROGRESS, STARTING, WAITING, room_store
+from ..services.room_broadcast import ParticipantUpdateCoalescer
+from ..services import feedback_service  # noqa: F401 (registers the "gd" feedback job handler)
+from ..services.feedback_jobs import feedback_jobs
+from .feedback_jobs import job_response
 
-# --- In-Memory Storage for Rooms ---
-rooms = {}
+# --- Room state lives in the shared room store (in memory or MongoDB, see GD_ROOM_STORE) ---
+
+# --- Membership broadcasts: participant_update carries deltas, debounced per room ---
+async def _emit_participant_update(room_id, payload):
+    await sio.emit('participant_update', payload, room=room_id)
+
+participant_updates = ParticipantUpdateCoalescer(_emit_participant_update, settings.GD_PARTICIPANT_UPDATE_WINDOW_SECONDS)
 
 # --- Pydantic Models ---
 class CreateRoomRequest(BaseModel):
@@ -45,15 +60,13 @@ async def create_room(request: CreateRoomRequest):
     """Creates a new Group Discussion room."""
     room_id = generate_room_id()
 
-    rooms[room_id] = {
-        "name": request.name,
-        "required_participants": request.participants,
-        "difficulty": request.difficulty,
-        "participants": set(),
-        "status": "waiting",
-        "topic": None,
-    }
-    logging.info(f"Room created: {room_id} with data {rooms[room_id]}")
+    room = await room_store.create(
+        room_id,
+        name=request.name,
+        required_participants=request.participants,
+        difficulty=request.difficulty,
+    )
+    logging.info(f"Room created: {room_id} with data {room}")
     return CreateRoomResponse(room_id=room_id)
 
 
@@ -62,42 +75,49 @@ async def create_room(request: CreateRoomRequest):
 async def handle_join_room(sid, data):
     """Handles user joining a room and starts GD when full."""
     room_id = data.get('roomId')
-    if not room_id or room_id not in rooms:
+    room = await room_store.join(room_id, sid) if room_id else None
+    if room is None:
         logging.warning(f"User {sid} tried to join non-existent room {room_id}")
         return
 
-    room = rooms[room_id]
     await sio.enter_room(sid, room_id)
-    room["participants"].add(sid)
-
-    logging.info(f"User {sid} joined room {room_id}. Participants: {len(room['participants'])}/{room['required_participants']}")
-
-    # Broadcast updated participant count
-    await sio.emit('participant_update', {
-        'participants': list(room["participants"]),
-        'count': len(room["participants"])
-    }, room=room_id)
-
-    # ✅ When room full → generate topic using Gemini API
-    if len(room["participants"]) == room["required_participants"] and room["status"] == "waiting":
-        room["status"] = "in_progress"
-
-        logging.info(f"Room {room_id} full. Generating GD topic using Gemini...")
-        topic_data = generate_discussion_topic()  # ← Synchronous call
-        topic = topic_data.get("topic", "Topic unavailable due to API error.")
-        room["topic"] = topic
-
-        logging.info(f"Room {room_id} topic generated: {room['topic']}")
-
-        # Broadcast GD start
-        await sio.emit('gd_started', {
-            'topic': room['topic'],
-            'duration': 300  # 5 minutes
-        }, room=room_id)
-        return
+    participants = room["participants"]
+
+    logging.info(f"User {sid} joined room {room_id}. Participants: {len(participants)}/{room['required_participants']}")
+
+    # The joiner gets the full membership once; the room gets the change, coalesced with
+    # other joins and leaves in the window
+    await sio.emit('participant_update', {'count': len(participants), 'joined': participants, 'left': []}, to=sid)
+    participant_updates.joined(room_id, sid, len(participants))
+
+    # ✅ When room full → start it with a topic. The compare-and-set on the status makes sure
+    # only one join (on any worker) starts the room.
+    if len(participants) >= room["required_participants"] and await room_store.transition(room_id, WAITING, STARTING):
+        try:
+            topic = await topic_pool.get(room["difficulty"])
+        except Exception as e:
+            # Put the room back, so the next join (or the sweeper's waiting TTL) can deal with it;
+            # this participant still goes through WebRTC signaling below
+            logging.error(f"Could not get a topic for room {room_id}: {e}")
+            await room_store.transition(room_id, STARTING, WAITING)
+            await sio.emit('gd_start_failed', {'roomId': room_id, 'detail': 'Could not start the discussion. Please try again.'}, room=room_id)
+        else:
+            await room_store.transition(room_id, STARTING, IN_PROGRESS, topic=topic)
+
+            logging.info(f"Room {room_id} full. Topic: {topic}")
+
+            # Broadcast GD start, after the final participant count. Sockets on the /gd namespace
+            # join the same rooms but never start them, so they hear about it from here too.
+            await participant_updates.flush(room_id)
+            for namespace in ("/", "/gd"):
+                await sio.emit('gd_started', {
+                    'topic': topic,
+                    'duration': 300  # 5 minutes
+                }, room=room_id, namespace=namespace)
+            return
 
     # --- WebRTC signaling ---
-    existing_sids = list(room["participants"] - {sid})
+    existing_sids = [participant for participant in participants if participant != sid]
     if existing_sids:
         await sio.emit('existing_users', {'sids': existing_sids}, to=sid)
 
@@ -107,32 +127,62 @@ async def handle_join_room(sid, data):
 @sio.on('disconnect')
 async def handle_disconnect(sid):
     """Removes user from rooms when disconnected."""
-    for room_id, room in rooms.items():
-        if sid in room["participants"]:
-            room["participants"].remove(sid)
+    for room_id in await room_store.rooms_for(sid):
+        room = await room_store.leave(room_id, sid)
+        if room is None:
+            continue
+
+        participant_updates.left(room_id, sid, len(room["participants"]))
+
+        logging.info(f"User {sid} disconnected from room {room_id}")
+        await sio.emit('user_left', {'sid': sid}, room=room_id, skip_sid=sid)
 
-            await sio.emit('participant_update', {
-                'participants': list(room["participants"]),
-                'count': len(room["participants"])
-            }, room=room_id)
+        # Empty rooms are kept for GD_EMPTY_ROOM_GRACE_SECONDS: participants move from the waiting
+        # room to the discussion page on a new socket, and rejoin after the old one disconnects.
+        # The sweeper removes rooms nobody comes back to.
 
-            logging.info(f"User {sid} disconnected from room {room_id}")
-            await sio.emit('user_left', {'sid': sid}, room=room_id, skip_sid=sid)
-            break
+
+async def sweep_rooms():
+    """
+    Periodically removes rooms that stayed empty past the grace period and rooms stuck in
+    'waiting', telling anyone still in an expired room that it was closed.
+    """
+    while True:
+        await asyncio.sleep(settings.GD_ROOM_SWEEP_INTERVAL_SECONDS)
+        try:
+            removed = await room_store.sweep(settings.GD_EMPTY_ROOM_GRACE_SECONDS, settings.GD_WAITING_ROOM_TTL_SECONDS)
+            for room_id in removed:
+                for namespace in ("/", "/gd"):
+                    await sio.emit('room_closed', {'roomId': room_id}, room=room_id, namespace=namespace)
+                    await sio.close_room(room_id, namespace=namespace)
+            if removed:
+                logging.info(f"Removed {len(removed)} expired GD room(s).")
+            await room_store.counts()
+        except Exception as e:
+            logging.warning(f"GD room sweep failed: {e}")
 
 class FeedbackRequest(BaseModel):
-    transcript: str
+    # The transcript as text, or as utterances ({"name", "text", "is_user"})
+    transcript: Union[str, List[Dict[str, Any]]]
 
 @router.post("/feedback")
-async def get_feedback(request: FeedbackRequest):
+async def get_feedback(request: FeedbackRequest, current_user: UserOut = Depends(get_current_user)):
     """
-    Receives a transcript (from chat or speech) and returns AI-generated feedback.
+    Receives a transcript (from chat or speech) and returns AI-generated feedback,
+    or a 202 with the job status when generation takes longer than a few seconds.
     """
+    if not request.transcript or (isinstance(request.transcript, str) and not request.transcript.strip()):
+        raise HTTPException(status_code=400, detail="Transcript cannot be empty.")
+    serialized = request.transcript if isinstance(request.transcript, str) else json.dumps(request.transcript, sort_keys=True)
+    # The job is keyed by the user and the transcript hash, so only the same user resubmitting
+    # the same transcript shares a job with an earlier request
+    user_id = str(current_user.id)
+    session_id = f"{user_id}:{hashlib.sha256(serialized.encode('utf-8')).hexdigest()}"
     try:
-        if not request.transcript or not request.transcript.strip():
-            raise HTTPException(status_code=400, detail="Transcript cannot be empty.")
-        feedback_data = await generate_gd_feedback(request.transcript)
-        return feedback_data
+        job = await feedback_jobs.enqueue("gd", session_id, user_id=user_id, payload={"transcript": request.transcript})
+        return await job_response(job)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error generating GD feedback: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Any
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Any, Iterator, Optional, Tuple
+import os
 
 from ..services import hr_interview_service, interview_review_service, assemblyai_service
 from ..models.user import UserOut
 from ..models.interview import HRRequest, HRResponse
 from ..core.security import get_current_user
+from ..services.feedback_jobs import feedback_jobs
+from ..services.speech_service import MEDIA_TYPES, speech_engine
+from .feedback_jobs import job_response
 
 router = APIRouter()
 
@@ -17,8 +22,9 @@ async def get_hr_response(
 ):
     """
     Handles the conversation logic for the HR interview.
-    - On the first call (no conversation history), it uses the 'role' to generate an initial question.
-    - On subsequent calls, it generates a follow-up question/feedback based on the history.
+    - On the first call (no interview_id), it uses the 'role' to generate an initial question.
+    - On subsequent calls, send the candidate's `answer` with the `interview_id`; the follow-up
+      question/feedback is generated from the stored transcript.
     - Creates and updates the interview session in the database.
     """
     result = await hr_interview_service.generate_hr_response(
@@ -28,7 +34,9 @@ async def get_hr_response(
         role=request.role,
         company=request.company,
         experience_level=request.experience_level,
-        interview_id=request.interview_id
+        interview_id=request.interview_id,
+        answer=request.answer,
+        audio_delivery=request.audio_delivery
     )
 
     if "error" in result:
@@ -37,6 +45,68 @@ async def get_hr_response(
     return result
 
 
+# ------------------ HR INTERVIEW AUDIO ------------------
+
+AUDIO_CHUNK_SIZE = 64 * 1024
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parses a single "bytes=start-end" range into inclusive offsets; None means the whole file."""
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start_text, _, end_text = range_header[len("bytes="):].partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = min(int(end_text), size - 1) if end_text else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start, end = max(0, size - int(end_text)), size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+def iter_file_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as audio_file:
+        audio_file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = audio_file.read(min(AUDIO_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+@router.get("/audio/{clip_id}", tags=["HR Interview"])
+async def get_hr_audio(clip_id: str, range_header: Optional[str] = Header(None, alias="Range")):
+    """
+    Streams a synthesized interviewer clip referenced by `audio_url` in an /hr/respond response.
+    Supports HTTP Range requests so the browser can start playback and seek without the whole file.
+    Clip ids are content hashes, so the endpoint does not require the bearer token an <audio> tag cannot send.
+    """
+    path = speech_engine.clip_path(clip_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Audio clip not found or expired.")
+
+    size = os.path.getsize(path)
+    byte_range = parse_range(range_header, size)
+    start, end = byte_range or (0, size - 1)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(end - start + 1),
+        "Cache-Control": "public, max-age=86400, immutable",
+    }
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        iter_file_range(path, start, end),
+        status_code=206 if byte_range else 200,
+        media_type=MEDIA_TYPES[clip_id.rsplit(".", 1)[1]],
+        headers=headers,
+    )
+
+
 # ------------------ HR INTERVIEW FEEDBACK ------------------
 
 @router.post("/feedback/{interview_id}", tags=["HR Interview"], response_model=Any)
@@ -47,15 +117,14 @@ async def get_interview_feedback(
     """
     Generates and retrieves the feedback for a completed HR interview session.
     If feedback already exists, it returns the stored data.
-    Otherwise, it generates new feedback, saves it, and returns it.
+    Otherwise, feedback is generated by the background job queue: it is returned directly if
+    it is ready within a few seconds, else a 202 with the job status to poll.
     """
-    try:
-        feedback = await hr_interview_service.generate_interview_feedback(interview_id, current_user.id)
-        return feedback
-    except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+    user_id = str(current_user.id)
+    if not await hr_interview_service.interview_exists(interview_id, user_id):
+        raise HTTPException(status_code=404, detail="Interview session not found or access denied.")
+    job = await feedback_jobs.enqueue("hr", interview_id, user_id=user_id)
+    return await job_response(job)
 
 
 # ------------------ ASSEMBLYAI UNIVERSAL STREAMING ------------------
@@ -1,61 +1,130 @@
 from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
-from typing import Any
-import pypdf
-import docx
-from io import BytesIO
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Any, List, Optional
+import json
 
-from ..services import resume_analyzer
+from ..core.config import settings
+from ..services import resume_pipeline
+from ..services.document_extraction import (
+    DOCX_CONTENT_TYPE,
+    PDF_CONTENT_TYPE,
+    DocumentExtractionError,
+    DocumentTooLargeError,
+    StagedDocument,
+    stage_upload,
+)
+from ..services.resume_pool import resume_pool, PoolSaturatedError
 from ..core.security import get_current_user
 from ..models.user import UserOut
 
 router = APIRouter()
 
-def extract_text_from_pdf(file_stream: BytesIO) -> str:
-    """Extracts text from a PDF file stream."""
-    try:
-        reader = pypdf.PdfReader(file_stream)
-        return "".join(page.extract_text() or "" for page in reader.pages)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error processing PDF file: {e}")
+def pool_saturated(e: PoolSaturatedError) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
 
-def extract_text_from_docx(file_stream: BytesIO) -> str:
-    """Extracts text from a DOCX file stream."""
-    try:
-        doc = docx.Document(file_stream)
-        return "\n".join([para.text for para in doc.paragraphs])
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error processing DOCX file: {e}")
+def extraction_error(e: DocumentExtractionError) -> HTTPException:
+    status_code = 413 if isinstance(e, DocumentTooLargeError) else 400
+    return HTTPException(status_code=status_code, detail=str(e))
 
 @router.post("/analyze-resume", tags=["Resume Analyzer"])
 async def analyze_resume_endpoint(
     resume: UploadFile = File(...),
     job_description: str = Form(...),
+    debug: bool = Form(False),
     current_user: UserOut = Depends(get_current_user)
 ):
     """
     Receives a resume file and a job description, analyzes them,
-    and returns a detailed analysis.
+    and returns a detailed analysis. With `debug`, per-stage timings (ms) are included.
     """
-    if not resume.content_type in ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]:
+    if not resume.content_type in [PDF_CONTENT_TYPE, DOCX_CONTENT_TYPE]:
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a PDF or DOCX file.")
 
+    document = None
     try:
-        file_content = await resume.read()
-        file_stream = BytesIO(file_content)
-        
-        if resume.content_type == "application/pdf":
-            resume_text = extract_text_from_pdf(file_stream)
-        else: # DOCX
-            resume_text = extract_text_from_docx(file_stream)
-
-        if not resume_text.strip():
-            raise HTTPException(status_code=400, detail="Could not extract text from the resume. The file might be empty or image-based.")
-
-        analysis_result = resume_analyzer.analyze_resume_against_jd(resume_text, job_description)
-        
+        document = await stage_upload(resume)
+        analysis_result = await resume_pipeline.analyze_staged_document(document, job_description, debug=debug)
         return {"message": "Analysis successful", "analysis": analysis_result}
 
+    except PoolSaturatedError as e:
+        raise pool_saturated(e)
+    except DocumentExtractionError as e:
+        raise extraction_error(e)
     except HTTPException as e:
         raise e # Re-raise HTTP exceptions
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+    finally:
+        if document:
+            document.cleanup()
+
+@router.get("/analyze-resume/feedback/{feedback_id}", tags=["Resume Analyzer"])
+async def get_resume_feedback_endpoint(
+    feedback_id: str,
+    current_user: UserOut = Depends(get_current_user)
+):
+    """
+    Returns AI feedback that was still pending when /analyze-resume responded.
+    "status" is "pending" until the feedback is ready; poll again after a short delay.
+    """
+    ai_feedback = await resume_pipeline.get_feedback(feedback_id)
+    if ai_feedback is None:
+        raise HTTPException(status_code=404, detail="Feedback not found. It may have failed or expired; please re-run the analysis.")
+    return {"ai_feedback": ai_feedback}
+
+@router.post("/analyze-resumes/bulk", tags=["Resume Analyzer"])
+async def bulk_analyze_resumes_endpoint(
+    job_description: str = Form(...),
+    resumes: List[UploadFile] = File(default=[]),
+    archive: Optional[UploadFile] = File(None),
+    include_ai_feedback: bool = Form(False),
+    current_user: UserOut = Depends(get_current_user)
+):
+    """
+    Screens many resumes (PDF/DOCX files and/or a zip archive of them) against one job description.
+    Streams one NDJSON record per resume as it finishes, then a summary ranked by ATS score.
+    """
+    if resume_pool.in_flight >= resume_pool.max_pending:
+        raise pool_saturated(PoolSaturatedError(resume_pool.retry_after_seconds))
+    if len(resumes) > settings.BULK_RESUME_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Too many resumes (limit is {settings.BULK_RESUME_MAX_FILES}).")
+
+    documents: List[StagedDocument] = []
+    try:
+        remaining_bytes = settings.BULK_RESUME_MAX_TOTAL_BYTES
+        for upload in resumes:
+            document = await stage_upload(upload, min(settings.RESUME_MAX_UPLOAD_BYTES, remaining_bytes))
+            documents.append(document)
+            remaining_bytes -= document.size
+
+        if archive is not None:
+            staged_archive = await stage_upload(archive, remaining_bytes)
+            try:
+                documents.extend(await run_in_threadpool(
+                    resume_pipeline.read_zip_archive,
+                    staged_archive.path,
+                    settings.BULK_RESUME_MAX_FILES - len(documents),
+                    remaining_bytes,
+                ))
+            finally:
+                staged_archive.cleanup()
+    except DocumentExtractionError as e:
+        for document in documents:
+            document.cleanup()
+        raise extraction_error(e)
+
+    if not documents:
+        raise HTTPException(status_code=400, detail="Please upload at least one resume or a zip archive of resumes.")
+
+    async def ndjson_stream():
+        async for record in resume_pipeline.screen_resumes(documents, job_description, include_ai_feedback):
+            yield json.dumps(record) + "\n"
+
+    def cleanup_documents():
+        # Covers clients that disconnect before the stream starts; cleanup is idempotent
+        for document in documents:
+            document.cleanup()
+
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson", background=BackgroundTask(cleanup_documents))
@@ -0,0 +1,309 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import google.generativeai as genai
+from google.api_core.exceptions import DeadlineExceeded, InternalServerError, ResourceExhausted, ServiceUnavailable
+
+from ..core.config import settings
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# --- Metrics ---
+
+ai_requests = metrics.counter("ai_requests_total", "Gemini requests by feature and outcome.")
+ai_retries = metrics.counter("ai_retries_total", "Gemini request retries by feature.")
+ai_queue_seconds = metrics.histogram("ai_queue_seconds", "Time spent waiting for a Gemini slot, by priority.")
+ai_request_seconds = metrics.histogram("ai_request_seconds", "Gemini request latency including retries, by feature.")
+
+# --- Constants ---
+
+FLASH_MODEL = "models/gemini-2.5-flash"
+PRO_MODEL = "gemini-2.5-pro"
+
+# Transient Gemini errors worth retrying; anything else fails the call immediately
+RETRYABLE_ERRORS = (ResourceExhausted, ServiceUnavailable, DeadlineExceeded, InternalServerError)
+
+
+class AIClientError(RuntimeError):
+    """Gemini is not configured, or the call failed after exhausting its retries."""
+
+
+class Priority(IntEnum):
+    """Lower values are admitted first when requests queue for the Gemini quota."""
+    LIVE = 0         # Live interview turns and rooms waiting on a topic
+    INTERACTIVE = 1  # A user is waiting on the page (chatbot, resume feedback, reviews)
+    BATCH = 2        # Reports and recommendations that tolerate delay
+
+
+# --- Retry Policy ---
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_retries: int
+    base_delay: float
+    max_delay: float
+    budget_seconds: float
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        return cls(
+            max_retries=settings.AI_MAX_RETRIES,
+            base_delay=settings.AI_BACKOFF_BASE_SECONDS,
+            max_delay=settings.AI_BACKOFF_MAX_SECONDS,
+            budget_seconds=settings.AI_RETRY_BUDGET_SECONDS,
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter, so retries from many requests do not line up."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+# --- Admission Control ---
+
+class PriorityLimiter:
+    """
+    Admits Gemini calls in priority order, bounded by both a concurrency limit and a
+    token bucket sized to the API quota. `reserved_slots` are only handed to LIVE
+    requests, so a burst of batch work can never take the last slots a live interview needs.
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, max_concurrency: int, requests_per_minute: float, burst: int, reserved_slots: int = 0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.reserved_slots = min(max(0, reserved_slots), self.max_concurrency - 1)
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.active = 0
+        self._tokens = self.capacity
+        self._refilled_at = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        while self._waiters:
+            priority, _, waiter = self._waiters[0]
+            if waiter.done():
+                heapq.heappop(self._waiters)
+                continue
+            limit = self.max_concurrency if priority == Priority.LIVE else self.max_concurrency - self.reserved_slots
+            if self.active >= limit:
+                return
+            self._refill()
+            if self._tokens < 1:
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else 1.0
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            self.active += 1
+            waiter.set_result(None)
+
+    async def acquire(self, priority: Priority) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), waiter))
+        if self._timer is None:
+            self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Admitted just before being cancelled: hand the slot back
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.active -= 1
+        if self._timer is None:
+            self._dispatch()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+
+# --- Client ---
+
+class AIClient:
+    """
+    The single entry point for Gemini calls. Configures the SDK once, keeps one
+    long-lived handle per model, and routes every call through the shared
+    PriorityLimiter and RetryPolicy.
+    """
+
+    def __init__(self, limiter: PriorityLimiter, retry_policy: RetryPolicy):
+        self.limiter = limiter
+        self.retry_policy = retry_policy
+        self._models: Dict[Tuple[str, Optional[str]], Any] = {}
+        self._lock = threading.Lock()
+        self._configured = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.GOOGLE_API_KEY)
+
+    def model(self, name: str = FLASH_MODEL, system_instruction: Optional[str] = None) -> Any:
+        """Returns the cached GenerativeModel for `name`, creating it on first use."""
+        if not self.enabled:
+            raise AIClientError("Google API key not configured.")
+        key = (name, system_instruction)
+        handle = self._models.get(key)
+        if handle is None:
+            with self._lock:
+                if not self._configured:
+                    genai.configure(api_key=settings.GOOGLE_API_KEY)
+                    self._configured = True
+                handle = self._models.get(key)
+                if handle is None:
+                    handle = self._models[key] = genai.GenerativeModel(name, system_instruction=system_instruction)
+        return handle
+
+    async def _admitted(self, priority: Priority) -> None:
+        started = time.perf_counter()
+        await self.limiter.acquire(priority)
+        ai_queue_seconds.observe(time.perf_counter() - started, priority=priority.name.lower())
+
+    async def generate(
+        self,
+        contents: Any,
+        *,
+        feature: str,
+        priority: Priority = Priority.INTERACTIVE,
+        model: str = FLASH_MODEL,
+        budget_seconds: Optional[float] = None,
+        **kwargs: Any,
+    ) -> str:
+        """
+        Generates a completion and returns its stripped text. Transient errors are retried
+        under the shared policy; every attempt waits for a limiter slot at `priority`.
+        Raises AIClientError when the retries or the time budget run out.
+        """
+        handle = self.model(model)
+        policy = self.retry_policy
+        budget = policy.budget_seconds if budget_seconds is None else budget_seconds
+        started = time.perf_counter()
+
+        async def attempt_with_retries() -> str:
+            for attempt in range(policy.max_retries + 1):
+                await self._admitted(priority)
+                try:
+                    response = await handle.generate_content_async(contents, **kwargs)
+                    return response.text.strip()
+                except RETRYABLE_ERRORS as e:
+                    if attempt == policy.max_retries:
+                        raise AIClientError(f"Gemini request failed after {attempt + 1} attempts: {e}")
+                    delay = policy.delay(attempt)
+                    ai_retries.inc(feature=feature)
+                    logger.warning(f"Gemini {feature} attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s.")
+                finally:
+                    self.limiter.release()
+                await asyncio.sleep(delay)
+
+        try:
+            text = await asyncio.wait_for(attempt_with_retries(), budget)
+        except asyncio.TimeoutError:
+            ai_requests.inc(feature=feature, outcome="timeout")
+            raise AIClientError(f"Gemini {feature} request exceeded its {budget:.0f}s budget.")
+        except Exception:
+            ai_requests.inc(feature=feature, outcome="error")
+            raise
+        finally:
+            ai_request_seconds.observe(time.perf_counter() - started, feature=feature)
+        ai_requests.inc(feature=feature, outcome="ok")
+        return text
+
+    async def stream(
+        self,
+        contents: Any,
+        *,
+        feature: str,
+        priority: Priority = Priority.LIVE,
+        model: str = FLASH_MODEL,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        """
+        Streams a completion as text chunks. Retries only happen before the first chunk
+        arrives; the limiter slot is held until the stream is exhausted or closed.
+        """
+        handle = self.model(model)
+        policy = self.retry_policy
+        for attempt in range(policy.max_retries + 1):
+            await self._admitted(priority)
+            yielded = False
+            try:
+                response = await handle.generate_content_async(contents, stream=True, **kwargs)
+                async for chunk in response:
+                    text = getattr(chunk, "text", "")
+                    if text:
+                        yielded = True
+                        yield text
+                ai_requests.inc(feature=feature, outcome="ok")
+                return
+            except RETRYABLE_ERRORS as e:
+                if yielded or attempt == policy.max_retries:
+                    ai_requests.inc(feature=feature, outcome="error")
+                    raise AIClientError(f"Gemini stream failed: {e}")
+                delay = policy.delay(attempt)
+                ai_retries.inc(feature=feature)
+                logger.warning(f"Gemini {feature} stream attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s.")
+            finally:
+                self.limiter.release()
+            await asyncio.sleep(delay)
+
+    def generate_sync(self, contents: Any, *, feature: str, model: str = FLASH_MODEL, **kwargs: Any) -> str:
+        """
+        Blocking variant for scripts and worker threads without an event loop. It shares
+        the model handles and retry policy but not the limiter, which lives on the server's loop.
+        """
+        handle = self.model(model)
+        policy = self.retry_policy
+        for attempt in range(policy.max_retries + 1):
+            try:
+                response = handle.generate_content(contents, **kwargs)
+                ai_requests.inc(feature=feature, outcome="ok")
+                return response.text.strip()
+            except RETRYABLE_ERRORS as e:
+                if attempt == policy.max_retries:
+                    ai_requests.inc(feature=feature, outcome="error")
+                    raise AIClientError(f"Gemini request failed after {attempt + 1} attempts: {e}")
+                ai_retries.inc(feature=feature)
+                time.sleep(policy.delay(attempt))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "models": [name for name, _ in self._models],
+            "active": self.limiter.active,
+            "queued": self.limiter.queued,
+            "max_concurrency": self.limiter.max_concurrency,
+        }
+
+
+def strip_code_fences(text: str) -> str:
+    """Removes the ```json fences Gemini tends to wrap JSON answers in."""
+    return text.strip().replace("```json", "").replace("```", "")
+
+
+ai_client = AIClient(
+    PriorityLimiter(
+        max_concurrency=settings.AI_MAX_CONCURRENCY,
+        requests_per_minute=settings.AI_REQUESTS_PER_MINUTE,
+        burst=settings.AI_BURST,
+        reserved_slots=settings.AI_LIVE_RESERVED_SLOTS,
+    ),
+    RetryPolicy.from_settings(),
+)
@@ -1,10 +1,9 @@
-import google.generativeai as genai
 import logging
 import json
 from typing import List, Dict, Any
 
-from ..core.config import settings
 from ..models.career_advisor import CareerAdvisorRequest, CareerPath
+from .ai_client import Priority, ai_client, strip_code_fences
 
 logger = logging.getLogger(__name__)
 
@@ -57,12 +56,10 @@ async def get_career_recommendations(request: CareerAdvisorRequest) -> List[Dict
     """
     Generates career path recommendations using the Gemini API.
     """
-    if not settings.GOOGLE_API_KEY:
+    if not ai_client.enabled:
         logger.error("Google API key not configured for Career Advisor.")
         raise ValueError("API key not configured.")
 
-    genai.configure(api_key=settings.GOOGLE_API_KEY)
-
     prompt = CAREER_ADVISOR_PROMPT_TEMPLATE.format(
         skills=", ".join(request.skills),
         interests=", ".join(request.interests),
@@ -73,13 +70,10 @@ async def get_career_recommendations(request: CareerAdvisorRequest) -> List[Dict
     )
 
     try:
-        # Initialize the model once
-        model = genai.GenerativeModel('models/gemini-2.5-flash') 
-        response = await model.generate_content_async(prompt)
+        response_text = await ai_client.generate(prompt, feature="career_advisor", priority=Priority.BATCH)
 
         # Clean and parse the JSON response
-        cleaned_response = response.text.strip().replace("```json", "").replace("```", "")
-        paths_data = json.loads(cleaned_response)
+        paths_data = json.loads(strip_code_fences(response_text))
 
         # Validate with Pydantic models
         validated_paths = [CareerPath.model_validate(path) for path in paths_data]
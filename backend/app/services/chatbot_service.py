@@ -1,8 +1,7 @@
-import google.generativeai as genai
 from typing import List, Dict, Any
 import logging
 
-from ..core.config import settings
+from .ai_client import PRO_MODEL, Priority, ai_client
 
 logger = logging.getLogger(__name__)
 
@@ -14,16 +13,14 @@ If asked an off-topic question, politely decline by saying something like, "My p
 Keep your answers helpful, concise, and encouraging.
 """
 
-def get_chatbot_response(history: List[Dict[str, str]]) -> Dict[str, Any]:
+async def get_chatbot_response(history: List[Dict[str, str]]) -> Dict[str, Any]:
     """
     Generates a response from the career coach chatbot using Google Gemini.
     """
-    if not settings.GOOGLE_API_KEY:
+    if not ai_client.enabled:
         logger.error("Google API key not configured for chatbot.")
         return {"error": "API key not configured."}
 
-    genai.configure(api_key=settings.GOOGLE_API_KEY)
-
     try:
         # The new Gemini API prefers a structured history.
         # We prepend the system prompt to the conversation history.
@@ -35,11 +32,9 @@ def get_chatbot_response(history: List[Dict[str, str]]) -> Dict[str, Any]:
             role = 'user' if msg['role'] == 'user' else 'model'
             messages_for_api.append({'role': role, 'parts': [msg['content']]})
 
-        # Use a stable and widely available model like 'gemini-pro'.
-        model = genai.GenerativeModel('gemini-2.5-pro')
-        
-        response = model.generate_content(messages_for_api)
-        ai_text = response.text.strip()
+        ai_text = await ai_client.generate(
+            messages_for_api, feature="chatbot", priority=Priority.INTERACTIVE, model=PRO_MODEL
+        )
 
         return {"text": ai_text}
 
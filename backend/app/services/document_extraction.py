@@ -0,0 +1,168 @@
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import IO, Any, Iterator, Optional
+
+import docx
+import pypdf
+
+try:
+    import fitz  # PyMuPDF, faster than pypdf when installed
+except ImportError:
+    fitz = None
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+
+PDF_CONTENT_TYPE = "application/pdf"
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+DOCUMENT_TYPES = {
+    PDF_CONTENT_TYPE: "pdf",
+    DOCX_CONTENT_TYPE: "docx",
+    ".pdf": "pdf",
+    ".docx": "docx",
+}
+
+CHUNK_SIZE = 1024 * 1024
+
+
+# --- Errors ---
+
+class DocumentExtractionError(ValueError):
+    """The document could not be read as a PDF or DOCX resume."""
+
+
+class DocumentTooLargeError(DocumentExtractionError):
+    """The upload exceeded the configured byte cap."""
+
+
+# --- Staging ---
+
+@dataclass
+class StagedDocument:
+    """An upload written to a temporary file, so pool workers can open it by path."""
+    filename: str
+    document_type: Optional[str]
+    path: str
+    size: int
+
+    def cleanup(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def detect_document_type(filename: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    """Returns "pdf" or "docx" based on the content type, falling back to the file extension."""
+    if content_type in DOCUMENT_TYPES:
+        return DOCUMENT_TYPES[content_type]
+    extension = os.path.splitext(filename or "")[1].lower()
+    return DOCUMENT_TYPES.get(extension)
+
+
+def _new_temp_file(document_type: Optional[str]) -> IO[bytes]:
+    return tempfile.NamedTemporaryFile(prefix="resume-", suffix=f".{document_type or 'bin'}", delete=False)
+
+
+async def stage_upload(upload: Any, max_bytes: Optional[int] = None) -> StagedDocument:
+    """
+    Streams an UploadFile to a temporary file in fixed-size chunks, so memory stays flat
+    regardless of the upload size. Raises DocumentTooLargeError past `max_bytes`.
+    """
+    max_bytes = settings.RESUME_MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    document_type = detect_document_type(upload.filename, upload.content_type)
+    size = 0
+    with _new_temp_file(document_type) as target:
+        staged = StagedDocument(upload.filename or "resume", document_type, target.name, 0)
+        try:
+            while chunk := await upload.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise DocumentTooLargeError(f"{staged.filename} exceeds the upload size limit.")
+                target.write(chunk)
+        except Exception:
+            target.close()
+            staged.cleanup()
+            raise
+    staged.size = size
+    return staged
+
+
+def stage_stream(source: IO[bytes], filename: str, max_bytes: Optional[int] = None) -> StagedDocument:
+    """Synchronous counterpart of stage_upload for file-like sources such as zip archive members."""
+    max_bytes = settings.RESUME_MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    document_type = detect_document_type(filename)
+    size = 0
+    with _new_temp_file(document_type) as target:
+        staged = StagedDocument(filename, document_type, target.name, 0)
+        try:
+            while chunk := source.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise DocumentTooLargeError(f"{filename} exceeds the upload size limit.")
+                target.write(chunk)
+        except Exception:
+            target.close()
+            staged.cleanup()
+            raise
+    staged.size = size
+    return staged
+
+
+# --- Page Extraction ---
+
+def _iter_pdf_pages(path: str, max_pages: int) -> Iterator[str]:
+    """
+    Yields page texts one after another from a single document handle. Pages are not
+    extracted in parallel: PyMuPDF is not thread-safe and pypdf is pure Python under the
+    GIL; documents already run in parallel across the process pool.
+    """
+    if fitz is not None:
+        with fitz.open(path) as document:
+            total_pages = document.page_count
+            page_count = min(total_pages, max_pages)
+            if total_pages > page_count:
+                logger.info(f"PDF has {total_pages} pages; only the first {page_count} are extracted.")
+            for index in range(page_count):
+                yield document.load_page(index).get_text() or ""
+    else:
+        reader = pypdf.PdfReader(path)
+        total_pages = len(reader.pages)
+        page_count = min(total_pages, max_pages)
+        if total_pages > page_count:
+            logger.info(f"PDF has {total_pages} pages; only the first {page_count} are extracted.")
+        for index in range(page_count):
+            yield reader.pages[index].extract_text() or ""
+
+
+def iter_page_texts(path: str, document_type: Optional[str], max_pages: Optional[int] = None) -> Iterator[str]:
+    """
+    Yields the text of each page of a staged PDF or DOCX (a DOCX is a single page),
+    stopping at the page cap. Raises DocumentExtractionError for unreadable files.
+    """
+    max_pages = settings.RESUME_MAX_PAGES if max_pages is None else max_pages
+    if document_type == "pdf":
+        try:
+            yield from _iter_pdf_pages(path, max_pages)
+        except DocumentExtractionError:
+            raise
+        except Exception as e:
+            raise DocumentExtractionError(f"Error processing PDF file: {e}")
+    elif document_type == "docx":
+        try:
+            yield "\n".join(para.text for para in docx.Document(path).paragraphs)
+        except Exception as e:
+            raise DocumentExtractionError(f"Error processing DOCX file: {e}")
+    else:
+        raise DocumentExtractionError("Unsupported file type. Please upload a PDF or DOCX file.")
+
+
+def extract_text(path: str, document_type: Optional[str], max_pages: Optional[int] = None) -> str:
+    """Extracts the full text of a staged document, joining pages once instead of concatenating repeatedly."""
+    return "\n".join(iter_page_texts(path, document_type, max_pages))
@@ -0,0 +1,245 @@
+import asyncio
+import datetime
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+from ..core.config import settings
+from ..core.db import feedback_jobs_collection
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# --- Metrics ---
+
+jobs_finished = metrics.counter("feedback_jobs_total", "Feedback jobs finished, by kind and status.")
+queue_seconds = metrics.histogram("feedback_job_queue_seconds", "Time from enqueue to a worker claiming the job, by kind.")
+processing_seconds = metrics.histogram("feedback_job_processing_seconds", "Time spent generating feedback, by kind.")
+
+# --- Job States ---
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+Listener = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def job_id(kind: str, session_id: str) -> str:
+    """One job per session and kind: the id is what makes enqueueing idempotent."""
+    return f"{kind}:{session_id}"
+
+
+def public_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields clients see when polling a job or receiving its socket event."""
+    return {
+        "job_id": job["_id"],
+        "kind": job["kind"],
+        "session_id": job["session_id"],
+        "status": job["status"],
+        "result": job.get("result"),
+        "error": job.get("error"),
+    }
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _seconds_since(moment: Optional[datetime.datetime]) -> float:
+    if moment is None:
+        return 0.0
+    if moment.tzinfo is None:
+        # Motor returns naive UTC datetimes unless the client is tz-aware
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (_now() - moment).total_seconds())
+
+
+# --- Job Queue ---
+
+class FeedbackJobQueue:
+    """
+    Feedback generation jobs persisted in MongoDB and processed by local worker tasks.
+
+    Enqueueing is an upsert on the job id, so concurrent requests for the same session
+    share one job and one Gemini call. Workers claim jobs with an atomic
+    queued -> running transition, so several API processes can share the collection;
+    a recovery loop picks up jobs left behind by processes that died before finishing them.
+    """
+
+    def __init__(self, collection, concurrency: int, poll_seconds: float, recovery_seconds: float, stale_seconds: float):
+        self._collection = collection
+        self.concurrency = max(1, concurrency)
+        self.poll_seconds = poll_seconds
+        self.recovery_seconds = recovery_seconds
+        self.stale_seconds = stale_seconds
+        self._handlers: Dict[str, Handler] = {}
+        self._listeners: List[Listener] = []
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._waiters: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def register(self, kind: str, handler: Handler) -> None:
+        self._handlers[kind] = handler
+
+    def add_listener(self, listener: Listener) -> None:
+        """Called with the job document whenever a job finishes (e.g. to emit a socket event)."""
+        self._listeners.append(listener)
+
+    # --- Producer side ---
+
+    async def enqueue(
+        self,
+        kind: str,
+        session_id: str,
+        user_id: Optional[str] = None,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Returns the session's job, creating it if needed. A failed job is re-queued."""
+        if kind not in self._handlers:
+            raise ValueError(f"No feedback handler registered for {kind!r}.")
+        key = job_id(kind, session_id)
+        job = await self._collection.find_one_and_update(
+            {"_id": key},
+            {"$setOnInsert": {
+                "kind": kind,
+                "session_id": session_id,
+                "user_id": user_id,
+                "payload": payload or {},
+                "status": QUEUED,
+                "attempts": 0,
+                "created_at": _now(),
+            }},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if job["status"] == FAILED:
+            job = await self._collection.find_one_and_update(
+                {"_id": key, "status": FAILED},
+                # Dropping finished_at keeps the TTL index off a job that is queued again
+                {"$set": {"status": QUEUED, "created_at": _now(), "error": None}, "$unset": {"finished_at": ""}},
+                return_document=ReturnDocument.AFTER,
+            ) or await self._collection.find_one({"_id": key})
+        if job["status"] == QUEUED:
+            self._queue.put_nowait(key)
+        return job
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return await self._collection.find_one({"_id": key})
+
+    async def wait(self, job: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """
+        Waits up to `timeout` seconds for the job to finish and returns its latest state.
+        Jobs running in this process resolve a shared future; others are polled in MongoDB.
+        """
+        if job["status"] in (DONE, FAILED):
+            return job
+        key = job["_id"]
+        deadline = time.monotonic() + timeout
+        future = self._waiters.get(key)
+        if future is None:
+            future = self._waiters[key] = asyncio.get_running_loop().create_future()
+
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), min(self.poll_seconds, remaining))
+            except asyncio.TimeoutError:
+                pass
+            latest = await self.get(key)
+            if latest is not None and latest["status"] in (DONE, FAILED):
+                # Finished by another process: release every local waiter
+                self._waiters.pop(key, None)
+                if not future.done():
+                    future.set_result(latest)
+                return latest
+        return await self.get(key) or job
+
+    # --- Worker side ---
+
+    async def _claim(self, key: str) -> Optional[Dict[str, Any]]:
+        return await self._collection.find_one_and_update(
+            {"_id": key, "status": QUEUED},
+            {"$set": {"status": RUNNING, "started_at": _now()}, "$inc": {"attempts": 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _process(self, key: str) -> None:
+        job = await self._claim(key)
+        if job is None:
+            # Already claimed by another worker or process
+            return
+        kind = job["kind"]
+        queue_seconds.observe(_seconds_since(job.get("created_at")), kind=kind)
+
+        started = time.perf_counter()
+        update: Dict[str, Any] = {}
+        try:
+            update["result"] = await self._handlers[kind](job)
+            update["status"] = DONE
+        except Exception as e:
+            logger.error(f"Feedback job {key} failed: {e}")
+            update["status"] = FAILED
+            update["error"] = str(e)
+        update["finished_at"] = _now()
+        processing_seconds.observe(time.perf_counter() - started, kind=kind)
+        jobs_finished.inc(kind=kind, status=update["status"])
+
+        job = await self._collection.find_one_and_update(
+            {"_id": key}, {"$set": update}, return_document=ReturnDocument.AFTER
+        )
+        future = self._waiters.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(job)
+        for listener in self._listeners:
+            try:
+                await listener(job)
+            except Exception as e:
+                logger.warning(f"Feedback job listener failed for {key}: {e}")
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._queue.get()
+            try:
+                await self._process(key)
+            except Exception as e:
+                logger.error(f"Feedback worker error on {key}: {e}")
+
+    async def _recover(self) -> None:
+        """Re-queues jobs left queued by other processes, and running jobs whose worker died."""
+        while True:
+            try:
+                stale_before = _now() - datetime.timedelta(seconds=self.stale_seconds)
+                await self._collection.update_many(
+                    {"status": RUNNING, "started_at": {"$lt": stale_before}},
+                    {"$set": {"status": QUEUED}},
+                )
+                async for job in self._collection.find({"status": QUEUED}, {"_id": 1}).limit(100):
+                    self._queue.put_nowait(job["_id"])
+            except Exception as e:
+                logger.warning(f"Feedback job recovery failed: {e}")
+            await asyncio.sleep(self.recovery_seconds)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._recover()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+feedback_jobs = FeedbackJobQueue(
+    feedback_jobs_collection,
+    concurrency=settings.FEEDBACK_JOB_WORKERS,
+    poll_seconds=settings.FEEDBACK_JOB_POLL_SECONDS,
+    recovery_seconds=settings.FEEDBACK_JOB_RECOVERY_SECONDS,
+    stale_seconds=settings.FEEDBACK_JOB_STALE_SECONDS,
+)
@@ -1,10 +1,10 @@
-import google.generativeai as genai
 import logging
 import json
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Any, Dict, List, Optional, Union
 
-from ..core.config import settings
+from .ai_client import Priority, ai_client, strip_code_fences
+from .feedback_jobs import feedback_jobs
 
 logger = logging.getLogger(__name__)
 
@@ -48,12 +48,94 @@ Example JSON Output:
 }}
 """
 
-async def generate_gd_feedback(transcript: str) -> dict:
-    genai.configure(api_key=settings.GOOGLE_API_KEY)
-    model = genai.GenerativeModel('models/gemini-2.5-flash')
-    prompt = EVALUATION_PROMPT_TEMPLATE.format(transcript=transcript)
-    response = await model.generate_content_async(prompt)
-    cleaned_response = response.text.strip().replace("```json", "").replace("```", "")
-    feedback_data = json.loads(cleaned_response)
+PARTIAL_EVALUATION_PROMPT_TEMPLATE = """
+You are an expert AI HR Manager observing a group discussion that is still in progress.
+Keep running evaluation notes for every speaker, so a final evaluation can be written quickly.
+
+Your notes so far (JSON, empty if the discussion just started):
+{notes}
+
+New part of the transcript since those notes:
+{transcript}
+
+Update the notes with the new part. For each speaker keep at most 5 short observations
+and provisional 1-10 scores for communication, confidence, team_collaboration and leadership_quality.
+
+Return the output in a strict JSON format, keyed by speaker name:
+{{"Speaker Name": {{"observations": ["..."], "scores": {{"communication": 7, "confidence": 6, "team_collaboration": 8, "leadership_quality": 5}}}}}}
+"""
+
+INCREMENTAL_EVALUATION_PROMPT_TEMPLATE = """
+You are an expert AI HR Manager evaluating a candidate's performance in a group discussion.
+The candidate is the speaker "{speaker}". The discussion has already been summarized into
+running evaluation notes; the end of the transcript that the notes do not cover yet follows.
+
+Running evaluation notes (JSON, keyed by speaker):
+{notes}
+
+Remaining transcript:
+{transcript}
+
+Evaluate only the candidate.
+
+Instructions:""" + EVALUATION_PROMPT_TEMPLATE.split("Instructions:", 1)[1]
+
+
+Transcript = Union[str, List[Dict[str, Any]]]
+
+
+def format_transcript(transcript: Transcript, candidate_sid: Optional[str] = None) -> str:
+    """
+    Renders an uploaded transcript string as-is, or a list of utterances as one line per
+    utterance. Utterances are {"name", "text"} plus either "is_user" (uploaded by the
+    candidate's browser) or "sid" (collected on the server), which marks the candidate as "You".
+    """
+    if isinstance(transcript, str):
+        return transcript
+    lines = []
+    for utterance in transcript:
+        is_candidate = utterance.get("is_user") or (candidate_sid is not None and utterance.get("sid") == candidate_sid)
+        lines.append(f"{utterance.get('name', 'Participant')} ({'You' if is_candidate else 'Participant'}): {utterance['text']}")
+    return "\n".join(lines)
+
+
+async def _generate_validated_feedback(prompt: str) -> dict:
+    response_text = await ai_client.generate(prompt, feature="gd_feedback", priority=Priority.BATCH)
+    feedback_data = json.loads(strip_code_fences(response_text))
     validated_feedback = GDFeedback.model_validate(feedback_data)
-    return validated_feedback.model_dump()
\ No newline at end of file
+    return validated_feedback.model_dump()
+
+
+async def generate_gd_feedback(transcript: Transcript, candidate_sid: Optional[str] = None) -> dict:
+    prompt = EVALUATION_PROMPT_TEMPLATE.format(transcript=format_transcript(transcript, candidate_sid))
+    return await _generate_validated_feedback(prompt)
+
+
+async def update_running_notes(notes: Dict[str, Any], utterances: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Folds new utterances into the per-speaker running notes of a discussion in progress."""
+    prompt = PARTIAL_EVALUATION_PROMPT_TEMPLATE.format(
+        notes=json.dumps(notes, ensure_ascii=False), transcript=format_transcript(utterances)
+    )
+    response_text = await ai_client.generate(prompt, feature="gd_partial_evaluation", priority=Priority.BATCH)
+    updated = json.loads(strip_code_fences(response_text))
+    if not isinstance(updated, dict):
+        raise ValueError("Running notes must be a JSON object keyed by speaker.")
+    return updated
+
+
+async def generate_incremental_gd_feedback(
+    notes: Dict[str, Any], tail: List[Dict[str, Any]], speaker: str, candidate_sid: str
+) -> dict:
+    """Final feedback from the running notes plus the utterances they do not cover yet."""
+    prompt = INCREMENTAL_EVALUATION_PROMPT_TEMPLATE.format(
+        speaker=speaker,
+        notes=json.dumps(notes, ensure_ascii=False),
+        transcript=format_transcript(tail, candidate_sid) or "(nothing new)",
+    )
+    return await _generate_validated_feedback(prompt)
+
+async def _run_feedback_job(job: dict) -> dict:
+    return await generate_gd_feedback(job["payload"]["transcript"])
+
+# Feedback is generated by the background job queue, one job per discussion session
+feedback_jobs.register("gd", _run_feedback_job)
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from .ai_client import PRO_MODEL, Priority, ai_client, strip_code_fences
+from .discussion_service import generate_discussion_topic
+
+logger = logging.getLogger(__name__)
+
+# --- Metrics ---
+
+topic_requests = metrics.counter("gd_topic_requests_total", "GD room topics by source (pool, generated, fallback).")
+topic_pool_size = metrics.gauge("gd_topic_pool_size", "Pre-generated GD topics available, by difficulty.")
+
+# --- Constants ---
+
+DEFAULT_DIFFICULTY = "intermediate"
+
+# Difficulty levels offered when creating a room, and how the topics should differ between them
+DIFFICULTY_GUIDANCE = {
+    "beginner": "familiar, everyday workplace or social themes that need no specialist knowledge",
+    "intermediate": "current business, technology and workplace trends with clear opposing viewpoints",
+    "expert": "nuanced ethical, economic or policy dilemmas that reward structured, evidence-based arguments",
+}
+
+# Used when Gemini is unavailable and the pool is empty
+FALLBACK_TOPICS = {
+    "beginner": [
+        "Is working from home better than working from an office?",
+        "Should schools teach personal finance as a compulsory subject?",
+        "Does social media bring people closer or push them apart?",
+    ],
+    "intermediate": [
+        "The Impact of AI on Future Jobs",
+        "Should companies adopt a four-day work week?",
+        "Is the gig economy good for workers?",
+    ],
+    "expert": [
+        "Should governments regulate frontier AI models before they are deployed?",
+        "Is economic growth compatible with meeting climate targets?",
+        "Should data privacy be treated as a fundamental right over national security?",
+    ],
+}
+
+TOPIC_BATCH_PROMPT = """
+You are an expert HR professional who sets topics for group discussions in interviews.
+
+Generate {count} distinct, concise and debatable group discussion topics for a {difficulty} level
+group, focused on {guidance}. Each topic is a single statement or question, with no preamble.
+
+Do not repeat or paraphrase any of these recently used topics:
+{recent}
+
+Return a JSON array of strings only.
+"""
+
+
+def normalize_difficulty(difficulty: Optional[str]) -> str:
+    key = (difficulty or "").strip().lower()
+    return key if key in DIFFICULTY_GUIDANCE else DEFAULT_DIFFICULTY
+
+
+def _normalize(topic: str) -> str:
+    return " ".join(topic.lower().strip().strip('"').split())
+
+
+# --- Topic Pool ---
+
+class TopicPool:
+    """
+    Pre-generated GD topics per difficulty, so starting a room is a pop from a deque
+    instead of a Gemini round-trip. Pools are refilled in the background (at batch
+    priority) once they drop below `low_watermark`, and topics used recently in this
+    process are never handed out again until they fall out of the `recent_size` window.
+    """
+
+    def __init__(self, target_size: int, low_watermark: int, recent_size: int):
+        self.target_size = max(1, target_size)
+        self.low_watermark = min(max(0, low_watermark), self.target_size)
+        self._pools: Dict[str, Deque[str]] = {key: deque() for key in DIFFICULTY_GUIDANCE}
+        self._recent: Deque[str] = deque(maxlen=max(1, recent_size))
+        self._refills: Dict[str, "asyncio.Task[None]"] = {}
+
+    def _is_new(self, topic: str, difficulty: str) -> bool:
+        key = _normalize(topic)
+        return bool(key) and key not in self._recent and key not in {_normalize(t) for t in self._pools[difficulty]}
+
+    def _mark_used(self, topic: str) -> None:
+        self._recent.append(_normalize(topic))
+
+    def _add(self, difficulty: str, topics: Iterable[str]) -> int:
+        added = 0
+        for topic in topics:
+            topic = topic.strip().strip('"')
+            if len(self._pools[difficulty]) >= self.target_size:
+                break
+            if self._is_new(topic, difficulty):
+                self._pools[difficulty].append(topic)
+                added += 1
+        topic_pool_size.set(len(self._pools[difficulty]), difficulty=difficulty)
+        return added
+
+    async def _generate_batch(self, difficulty: str, count: int) -> List[str]:
+        recent = list(self._recent)[-30:]
+        response_text = await ai_client.generate(
+            TOPIC_BATCH_PROMPT.format(
+                count=count,
+                difficulty=difficulty,
+                guidance=DIFFICULTY_GUIDANCE[difficulty],
+                recent="\n".join(f"- {topic}" for topic in recent) or "- (none)",
+            ),
+            feature="gd_topic_pool",
+            priority=Priority.BATCH,
+            model=PRO_MODEL,
+        )
+        return [t for t in json.loads(strip_code_fences(response_text)) if isinstance(t, str)]
+
+    async def _refill(self, difficulty: str) -> None:
+        missing = self.target_size - len(self._pools[difficulty])
+        if missing <= 0 or not ai_client.enabled:
+            return
+        try:
+            added = self._add(difficulty, await self._generate_batch(difficulty, missing))
+            logger.info(f"GD topic pool for {difficulty}: added {added}, now {len(self._pools[difficulty])}.")
+        except Exception as e:
+            logger.warning(f"Could not refill the {difficulty} GD topic pool: {e}")
+
+    def schedule_refill(self, difficulty: str) -> None:
+        task = self._refills.get(difficulty)
+        if task is None or task.done():
+            self._refills[difficulty] = asyncio.create_task(self._refill(difficulty))
+
+    def pop(self, difficulty: Optional[str]) -> Optional[str]:
+        """Takes a pre-generated topic without waiting; None when the pool is empty."""
+        key = normalize_difficulty(difficulty)
+        pool = self._pools[key]
+        topic = pool.popleft() if pool else None
+        topic_pool_size.set(len(pool), difficulty=key)
+        if len(pool) < max(1, self.low_watermark):
+            self.schedule_refill(key)
+        if topic is not None:
+            self._mark_used(topic)
+        return topic
+
+    async def get(self, difficulty: Optional[str]) -> str:
+        """
+        A topic for a room that is starting: from the pool when possible, otherwise generated
+        on demand at live priority, otherwise one of the built-in fallback topics.
+        """
+        topic = self.pop(difficulty)
+        if topic is not None:
+            topic_requests.inc(source="pool")
+            return topic
+
+        key = normalize_difficulty(difficulty)
+        topic_data = await generate_discussion_topic(key)
+        topic = topic_data.get("topic")
+        if topic and _normalize(topic) not in self._recent:
+            topic_requests.inc(source="generated")
+            self._mark_used(topic)
+            return topic
+
+        topic_requests.inc(source="fallback")
+        for candidate in FALLBACK_TOPICS[key]:
+            if _normalize(candidate) not in self._recent:
+                self._mark_used(candidate)
+                return candidate
+        return FALLBACK_TOPICS[key][0]
+
+    async def warm_up(self) -> None:
+        """Fills every difficulty's pool; failures leave that pool to the on-demand fallback."""
+        await asyncio.gather(*(self._refill(key) for key in self._pools))
+
+    def stats(self) -> Dict[str, int]:
+        return {key: len(pool) for key, pool in self._pools.items()}
+
+
+topic_pool = TopicPool(
+    target_size=settings.GD_TOPIC_POOL_SIZE,
+    low_watermark=settings.GD_TOPIC_POOL_LOW_WATERMARK,
+    recent_size=settings.GD_TOPIC_RECENT_SIZE,
+)
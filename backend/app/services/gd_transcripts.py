@@ -0,0 +1,235 @@
+import asyncio
+import datetime
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from ..core.config import settings
+from ..core.db import gd_transcripts_collection
+from ..core.metrics import metrics
+from . import feedback_service
+from .ai_client import ai_client
+from .feedback_jobs import feedback_jobs
+
+logger = logging.getLogger(__name__)
+
+# --- Metrics ---
+
+utterances_collected = metrics.counter("gd_utterances_total", "GD utterances collected on the /gd namespace.")
+transcript_flushes = metrics.counter("gd_transcript_flushes_total", "Batched transcript writes to MongoDB, by outcome.")
+partial_evaluations = metrics.counter("gd_partial_evaluations_total", "Rolling GD evaluations, by outcome.")
+final_feedback = metrics.counter("gd_live_feedback_total", "Final GD feedback, by path (incremental, full).")
+
+
+# --- Room Transcripts ---
+
+@dataclass
+class RoomTranscript:
+    # Most recent utterances only; the full transcript is in MongoDB
+    recent: Deque[Dict[str, Any]]
+    pending: List[Dict[str, Any]] = field(default_factory=list)
+    next_seq: int = 0
+    # Running per-speaker notes, and the first utterance they do not cover yet
+    notes: Dict[str, Any] = field(default_factory=dict)
+    evaluated_seq: int = 0
+    evaluation: Optional["asyncio.Task[None]"] = None
+    flushing: Optional["asyncio.Task[None]"] = None
+    # Set while the room is empty and waiting out the retention period
+    closing: Optional["asyncio.Task[None]"] = None
+
+
+class TranscriptCollector:
+    """
+    Collects GD utterances per room as they are spoken. Each room keeps a bounded ring buffer
+    of recent utterances in memory, and utterances are written to MongoDB in batches (when
+    `batch_size` are pending, and every `flush_seconds`). Every `evaluate_every` utterances the
+    new part of the discussion is folded into running per-speaker notes, so final feedback
+    only has to evaluate the notes plus the last few utterances. A closed room's state is kept
+    for `retain_seconds`, so feedback requested just after everyone leaves still uses the notes.
+    """
+
+    def __init__(
+        self,
+        collection,
+        buffer_size: int,
+        batch_size: int,
+        flush_seconds: float,
+        evaluate_every: int,
+        retain_seconds: float = 0.0,
+    ):
+        self._collection = collection
+        self.buffer_size = max(1, buffer_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        # Evaluations must run before the utterances they need fall out of the ring buffer
+        self.evaluate_every = min(max(1, evaluate_every), self.buffer_size)
+        self.retain_seconds = max(0.0, retain_seconds)
+        self._rooms: Dict[str, RoomTranscript] = {}
+        self._flusher: Optional[asyncio.Task] = None
+
+    def _room(self, room_id: str) -> RoomTranscript:
+        room = self._rooms.get(room_id)
+        if room is None:
+            room = self._rooms[room_id] = RoomTranscript(recent=deque(maxlen=self.buffer_size))
+        elif room.closing is not None:
+            # Someone is talking in the room again
+            room.closing.cancel()
+            room.closing = None
+        return room
+
+    def append(self, room_id: str, sid: str, name: str, text: str) -> Dict[str, Any]:
+        room = self._room(room_id)
+        utterance = {
+            "room_id": room_id,
+            "seq": room.next_seq,
+            "sid": sid,
+            "name": name,
+            "text": text,
+            "at": datetime.datetime.now(datetime.timezone.utc),
+        }
+        room.next_seq += 1
+        room.recent.append(utterance)
+        room.pending.append(utterance)
+        utterances_collected.inc()
+
+        if len(room.pending) >= self.batch_size:
+            self._schedule_flush(room_id, room)
+        if room.next_seq - room.evaluated_seq >= self.evaluate_every and ai_client.enabled:
+            if room.evaluation is None or room.evaluation.done():
+                room.evaluation = asyncio.create_task(self._evaluate(room_id, room))
+        return utterance
+
+    # --- Persistence ---
+
+    def _schedule_flush(self, room_id: str, room: RoomTranscript) -> None:
+        if room.flushing is None or room.flushing.done():
+            room.flushing = asyncio.create_task(self.flush(room_id))
+
+    async def flush(self, room_id: str) -> None:
+        room = self._rooms.get(room_id)
+        if room is None or not room.pending:
+            return
+        batch, room.pending = room.pending, []
+        try:
+            # Upserts keyed on (room_id, sid, seq), so retrying a partly written batch is harmless.
+            # seq is per worker, but each sid is only ever connected to one worker.
+            await self._collection.bulk_write(
+                [
+                    UpdateOne({"room_id": u["room_id"], "sid": u["sid"], "seq": u["seq"]}, {"$setOnInsert": u}, upsert=True)
+                    for u in batch
+                ],
+                ordered=False,
+            )
+            transcript_flushes.inc(outcome="ok")
+        except Exception as e:
+            # Put the batch back so the next flush retries it
+            room.pending[:0] = batch
+            transcript_flushes.inc(outcome="error")
+            logger.warning(f"Could not persist {len(batch)} utterance(s) for GD room {room_id}: {e}")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            for room_id in list(self._rooms):
+                await self.flush(room_id)
+
+    async def load(self, room_id: str) -> List[Dict[str, Any]]:
+        """The room's whole transcript: persisted utterances plus any not yet written."""
+        await self.flush(room_id)
+        cursor = self._collection.find({"room_id": room_id}, {"_id": 0}).sort([("at", 1), ("seq", 1)])
+        return [utterance async for utterance in cursor]
+
+    # --- Evaluation ---
+
+    async def _evaluate(self, room_id: str, room: RoomTranscript) -> None:
+        upto = room.next_seq
+        notes = room.notes
+        new_part = [u for u in room.recent if room.evaluated_seq <= u["seq"] < upto]
+        if not new_part:
+            return
+        try:
+            if new_part[0]["seq"] != room.evaluated_seq:
+                # The evaluation fell behind the ring buffer: rebuild the notes from the stored transcript
+                notes, new_part = {}, await self.load(room_id)
+            room.notes = await feedback_service.update_running_notes(notes, new_part)
+            room.evaluated_seq = upto
+            partial_evaluations.inc(outcome="ok")
+        except Exception as e:
+            # The utterances stay uncovered; the next evaluation (or the final one) includes them
+            partial_evaluations.inc(outcome="error")
+            logger.warning(f"Partial GD evaluation failed for room {room_id}: {e}")
+
+    async def finalize(self, room_id: str, sid: str) -> Dict[str, Any]:
+        """
+        Final feedback for participant `sid`. Uses the running notes when this process has
+        them, otherwise evaluates the full transcript stored in MongoDB.
+        """
+        room = self._rooms.get(room_id)
+        if room is not None:
+            await self.flush(room_id)
+            if room.evaluation is not None and not room.evaluation.done():
+                await asyncio.shield(room.evaluation)
+            tail = [u for u in room.recent if u["seq"] >= room.evaluated_seq]
+            # Notes only help when nothing between them and the ring buffer was lost
+            covered = not tail or tail[0]["seq"] == room.evaluated_seq
+            speaker = next((u["name"] for u in reversed(room.recent) if u["sid"] == sid), None)
+            # With several workers, other participants' utterances were collected (and noted) elsewhere
+            local_only = await self._collection.count_documents({"room_id": room_id}) <= room.next_seq
+            if room.notes and covered and speaker is not None and local_only:
+                final_feedback.inc(path="incremental")
+                return await feedback_service.generate_incremental_gd_feedback(room.notes, tail, speaker, sid)
+
+        transcript = await self.load(room_id)
+        if not transcript:
+            raise ValueError("No transcript has been collected for this room.")
+        final_feedback.inc(path="full")
+        return await feedback_service.generate_gd_feedback(transcript, candidate_sid=sid)
+
+    def close(self, room_id: str) -> None:
+        """
+        Writes a room's remaining utterances, then forgets its in-memory state after
+        `retain_seconds` unless the room is used again in the meantime.
+        """
+        room = self._rooms.get(room_id)
+        if room is None or room.closing is not None:
+            return
+
+        async def flush_and_forget() -> None:
+            await self.flush(room_id)
+            await asyncio.sleep(self.retain_seconds)
+            if self._rooms.get(room_id) is room:
+                await self.flush(room_id)
+                del self._rooms[room_id]
+
+        room.closing = asyncio.create_task(flush_and_forget())
+
+    def start(self) -> None:
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        for room_id in list(self._rooms):
+            await self.flush(room_id)
+
+
+transcript_collector = TranscriptCollector(
+    gd_transcripts_collection,
+    buffer_size=settings.GD_TRANSCRIPT_BUFFER_SIZE,
+    batch_size=settings.GD_TRANSCRIPT_BATCH_SIZE,
+    flush_seconds=settings.GD_TRANSCRIPT_FLUSH_SECONDS,
+    evaluate_every=settings.GD_PARTIAL_EVALUATION_EVERY,
+    retain_seconds=settings.GD_TRANSCRIPT_RETAIN_SECONDS,
+)
+
+
+async def _run_live_feedback_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    return await transcript_collector.finalize(job["payload"]["room_id"], job["payload"]["sid"])
+
+# Feedback for discussions collected on the /gd namespace, one job per room and participant
+feedback_jobs.register("gd_live", _run_live_feedback_job)
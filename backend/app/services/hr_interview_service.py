@@ -1,10 +1,9 @@
-import google.generativeai as genai
-from gtts import gTTS
-from typing import List, Dict, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import asyncio
 import logging
-from io import BytesIO
-import time
-from google.api_core.exceptions import ResourceExhausted
+import uuid
 import base64
 import json
 from pydantic import BaseModel, Field
@@ -12,6 +11,11 @@ from pydantic import BaseModel, Field
 from ..core.config import settings
 from ..core.db import interview_sessions_collection
 from ..models.interview import HRInterviewSession
+from . import speech_service
+from .speech_service import speech_engine
+from .ai_client import AIClientError, Priority, ai_client, strip_code_fences
+from .feedback_jobs import feedback_jobs
+from .hr_speculation import QuestionBank, SpeculationStore
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +36,13 @@ class HRInterviewFeedback(BaseModel):
 
 # --- Constants ---
 
+# Matches the closing rule in HR_PERSONA_PROMPT; used when a turn falls back to the question bank
+MAX_QUESTIONS = 3
+CLOSING_STATEMENT = "Thank you for your time today. It was a pleasure speaking with you. We'll be in touch shortly with the next steps."
+
+# Where the HR router serves synthesized clips (see routers/hr.py)
+AUDIO_URL_PREFIX = "/api/v1/hr/audio"
+
 INITIAL_QUESTIONS = {
     "system analyst": "Hi {name}, welcome to the interview for the System Analyst Trainee position at {company}! To start, could you tell me about a time you analyzed a complex system or improved a process?",
     "software developer": "Hi {name}, welcome to the interview for the Software Developer position at {company}! To start, can you tell me about a project you're proud of and what your role was in it?",
@@ -94,6 +105,270 @@ Example JSON Output:
 }}
 """
 
+# --- Turn Helpers ---
+
+def _role_key(role: str) -> str:
+    """Maps a role to its INITIAL_QUESTIONS key, which also keys the question bank."""
+    role_lower = role.lower().replace(" ", "_") if role else "default"
+
+    for key in INITIAL_QUESTIONS:
+        if key in role_lower:
+            return key
+    return "default"
+
+def _initial_question(role: str, company: str, user_name: str) -> str:
+    initial_question_template = INITIAL_QUESTIONS[_role_key(role)]
+    return initial_question_template.format(name=user_name.split(" ")[0], role=role.replace('_', ' ').title(), company=company)
+
+def _build_turn_prompt(conversation_history: List[Dict[str, str]], role: str, company: str, experience_level: str) -> str:
+    questions_asked = sum(1 for msg in conversation_history if msg['speaker'] == 'HR')
+
+    # Format history clearly for the model
+    history_lines = []
+    for msg in conversation_history:
+        speaker = "Alex (You)" if msg['speaker'] == 'HR' else "User"
+        history_lines.append(f"{speaker}: {msg['text']}")
+    history_str = "\n".join(history_lines)
+
+    return HR_PERSONA_PROMPT.format(
+        conversation_history=history_str,
+        role=role.replace('_', ' ').title(),
+        company=company,
+        experience_level=experience_level,
+        questions_asked=questions_asked
+    )
+
+# --- Active Sessions ---
+# The server owns the transcript: clients send only their latest answer, each turn is
+# appended with $push, and in-progress interviews are kept in a bounded in-memory cache.
+
+@dataclass
+class ActiveSession:
+    interview_id: str
+    user_id: str
+    role: str
+    company: str
+    experience_level: str
+    conversation_history: List[Dict[str, Any]]
+    # Serializes turns of one interview, so appended turns keep their order
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+
+class ActiveSessionCache:
+    """
+    LRU of in-progress interviews, so a turn does not re-read the session from MongoDB.
+    A cached history is only extended after the matching $push succeeded. The $push is
+    conditional on the stored history still having the cached length, so a turn served by
+    another worker is detected and the entry re-read instead of being built on.
+    """
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._sessions: "OrderedDict[str, ActiveSession]" = OrderedDict()
+
+    def get(self, interview_id: str) -> Optional[ActiveSession]:
+        session = self._sessions.get(interview_id)
+        if session is not None:
+            self._sessions.move_to_end(interview_id)
+        return session
+
+    def put(self, session: ActiveSession) -> ActiveSession:
+        """Caches `session`, unless another request cached the same interview first."""
+        existing = self._sessions.setdefault(session.interview_id, session)
+        self._sessions.move_to_end(session.interview_id)
+        while len(self._sessions) > self._max_entries:
+            self._sessions.popitem(last=False)
+        return existing
+
+    def invalidate(self, interview_id: str) -> None:
+        self._sessions.pop(interview_id, None)
+
+
+active_sessions = ActiveSessionCache(settings.HR_SESSION_CACHE_MAX_ENTRIES)
+
+
+async def _create_session(user_id: str, role: str, company: str, experience_level: str, ai_text: str) -> str:
+    """Creates a new interview session whose history starts with the opening question."""
+    new_session = HRInterviewSession(
+        user_id=user_id,
+        role=role,
+        company=company,
+        experience_level=experience_level,
+        conversation_history=[{"speaker": "HR", "text": ai_text}]
+    )
+    await interview_sessions_collection.insert_one(new_session.model_dump(by_alias=True))
+    active_sessions.put(ActiveSession(
+        new_session.id, user_id, role, company, experience_level, list(new_session.conversation_history)
+    ))
+    return new_session.id
+
+async def _load_session(interview_id: str, user_id: str) -> Optional[ActiveSession]:
+    session = active_sessions.get(interview_id)
+    if session is None:
+        document = await interview_sessions_collection.find_one(
+            {"_id": interview_id, "user_id": user_id},
+            {"feedback": 0},
+        )
+        if document is None:
+            return None
+        session = active_sessions.put(ActiveSession(
+            interview_id=interview_id,
+            user_id=document["user_id"],
+            role=document.get("role", "default"),
+            company=document.get("company", "our company"),
+            experience_level=document.get("experience_level", "candidate"),
+            conversation_history=document.get("conversation_history", []),
+        ))
+    return session if session.user_id == user_id else None
+
+def _pending_turns(
+    session: ActiveSession,
+    conversation_history: List[Dict[str, Any]],
+    answer: Optional[str],
+) -> List[Dict[str, Any]]:
+    """
+    Turns the server has not stored yet. Clients send only `answer`; older clients resend the
+    whole transcript, of which only the entries past the stored history are new.
+    """
+    if answer:
+        return [{"speaker": "User", "text": answer}]
+    return list(conversation_history[len(session.conversation_history):])
+
+# --- Speculative Follow-ups ---
+# While the candidate is still answering, partial transcripts (from the AssemblyAI streaming
+# path, relayed over the /interview socket) start follow-up generations early. When the final
+# answer closely matches one of them, that follow-up is used and the turn skips generation.
+# Role question banks are prewarmed at startup and back a turn whose live generation fails.
+
+speculations = SpeculationStore(
+    min_new_chars=settings.HR_SPECULATION_MIN_NEW_CHARS,
+    match_threshold=settings.HR_SPECULATION_MATCH_THRESHOLD,
+    max_per_turn=settings.HR_SPECULATION_MAX_PER_TURN,
+    ttl_seconds=settings.HR_SPECULATION_TTL_SECONDS,
+    max_interviews=settings.HR_SPECULATION_MAX_INTERVIEWS,
+)
+question_bank = QuestionBank(settings.HR_QUESTION_BANK_SIZE)
+
+async def prewarm_question_bank() -> None:
+    await question_bank.warm_up({key: key.title() if key != "default" else "General" for key in INITIAL_QUESTIONS})
+
+async def speculate_follow_up(interview_id: str, user_id: str, partial_answer: str) -> bool:
+    """Starts a speculative follow-up for the candidate's partial answer. Returns True if one was started."""
+    if not settings.HR_SPECULATION_ENABLED or not ai_client.enabled or not partial_answer:
+        return False
+    session = await _load_session(interview_id, user_id)
+    if session is None or session.lock.locked():
+        # The final answer is already being processed
+        return False
+
+    history_length = len(session.conversation_history)
+    prompt = _build_turn_prompt(
+        session.conversation_history + [{"speaker": "User", "text": partial_answer}],
+        session.role, session.company, session.experience_level
+    )
+
+    async def generate() -> str:
+        return await ai_client.generate(prompt, feature="hr_speculation", priority=Priority.INTERACTIVE)
+
+    return speculations.offer(interview_id, history_length, partial_answer, generate)
+
+def discard_speculations(interview_id: str) -> None:
+    """Drops the interview's speculative follow-ups, e.g. when the candidate disconnects."""
+    speculations.discard(interview_id)
+
+def _fallback_question(turns: List[Dict[str, Any]], role: str) -> Optional[str]:
+    asked = [msg["text"] for msg in turns if msg.get("speaker") == "HR"]
+    if len(asked) >= MAX_QUESTIONS:
+        return CLOSING_STATEMENT
+    return question_bank.pick(_role_key(role), asked)
+
+async def _generate_or_fallback(
+    prompt: str,
+    turns: List[Dict[str, Any]],
+    role: str,
+    generate: Callable[[str], Awaitable[str]],
+    deliver: Optional[Callable[[str], Awaitable[None]]],
+) -> str:
+    try:
+        return await generate(prompt)
+    except AIClientError as e:
+        fallback = _fallback_question(turns, role)
+        if fallback is None:
+            raise
+        logger.warning(f"HR turn generation failed ({e}); using the prewarmed question bank.")
+        if deliver:
+            await deliver(fallback)
+        return fallback
+
+async def _run_turn(
+    interview_id: Optional[str],
+    user_id: str,
+    conversation_history: List[Dict[str, Any]],
+    answer: Optional[str],
+    generate: Callable[[str], Awaitable[str]],
+    role: str,
+    company: str,
+    experience_level: str,
+    deliver: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> str:
+    """
+    Builds the prompt for the next turn, generates it (or takes a matching speculative
+    follow-up), and appends the new turns with one $push. `deliver` is called with text
+    that did not come from `generate`, so streaming callers can still emit it.
+    """
+    if not interview_id:
+        # Stateless turn for clients without an interview id; nothing is stored
+        logger.warning(f"Interview ID missing for user {user_id}. Could not save conversation.")
+        turns = conversation_history + ([{"speaker": "User", "text": answer}] if answer else [])
+        return await _generate_or_fallback(
+            _build_turn_prompt(turns, role, company, experience_level), turns, role, generate, deliver
+        )
+
+    session = await _load_session(interview_id, user_id)
+    if session is None:
+        raise ValueError("Interview session not found or access denied.")
+
+    async with session.lock:
+        new_turns = _pending_turns(session, conversation_history, answer)
+        turns = session.conversation_history + new_turns
+        final_answer = " ".join(msg["text"] for msg in new_turns if msg.get("speaker") != "HR")
+
+        ai_text = None
+        if final_answer:
+            ai_text = await speculations.take(interview_id, len(session.conversation_history), final_answer)
+        else:
+            speculations.discard(interview_id)
+        if ai_text is not None:
+            if deliver:
+                await deliver(ai_text)
+        else:
+            prompt = _build_turn_prompt(turns, session.role, session.company, session.experience_level)
+            ai_text = await _generate_or_fallback(prompt, turns, session.role, generate, deliver)
+        hr_turn = {"speaker": "HR", "text": ai_text}
+        new_turns.append(hr_turn)
+        result = await interview_sessions_collection.update_one(
+            {"_id": interview_id, "conversation_history": {"$size": len(session.conversation_history)}},
+            {"$push": {"conversation_history": {"$each": new_turns}}}
+        )
+        if result.matched_count:
+            session.conversation_history.extend(new_turns)
+            return ai_text
+
+        # Another worker stored turns this cache had not seen: append after them, working out the
+        # new turns against the stored history, and re-read the session on the next turn
+        active_sessions.invalidate(interview_id)
+        document = await interview_sessions_collection.find_one({"_id": interview_id}, {"conversation_history": 1})
+        stored = ActiveSession(
+            interview_id, session.user_id, session.role, session.company, session.experience_level,
+            (document or {}).get("conversation_history", []),
+        )
+        new_turns = _pending_turns(stored, conversation_history, answer) + [hr_turn]
+        await interview_sessions_collection.update_one(
+            {"_id": interview_id},
+            {"$push": {"conversation_history": {"$each": new_turns}}}
+        )
+    return ai_text
+
 async def generate_hr_response(
     conversation_history: List[Dict[str, str]],
     user_id: str,
@@ -105,107 +380,164 @@ async def generate_hr_response(
     Generates the next question or response from the AI HR using Google Gemini.
     Also handles creating and updating the interview session in the database.
     """
-    if not settings.GOOGLE_API_KEY:
+    if not ai_client.enabled:
         logger.error("Google API key not configured.")
         return {"error": "Google API key not configured."}
 
-    genai.configure(api_key=settings.GOOGLE_API_KEY)
-
     # The router passes the entire request model. We extract the role from kwargs.
     role = kwargs.get("role", "default")
     company = kwargs.get("company", "our company")
     experience_level = kwargs.get("experience_level", "candidate")
     
-    is_new_interview = not interview_id and not conversation_history
+    conversation_history = conversation_history or []
+    answer = kwargs.get("answer")
+    is_new_interview = not interview_id and not conversation_history and not answer
+
+    async def generate(prompt: str) -> str:
+        # Live turn: admitted ahead of batch work queued for the Gemini quota
+        return await ai_client.generate(prompt, feature="hr_turn", priority=Priority.LIVE)
 
     try:
         if is_new_interview:
             # --- Start of a new interview ---
-            role_lower = role.lower().replace(" ", "_") if role else "default"
-
-            matched_key = "default"
-            for key in INITIAL_QUESTIONS:
-                if key in role_lower:
-                    matched_key = key
-                    break
-            
-            initial_question_template = INITIAL_QUESTIONS[matched_key]
-            ai_text = initial_question_template.format(name=user_name.split(" ")[0], role=role.replace('_', ' ').title(), company=company)
-            
-            # Create a new session in the database
-            new_session = HRInterviewSession(
-                user_id=user_id,
-                role=role,
-                company=company,
-                experience_level=experience_level,
-                conversation_history=[{"speaker": "HR", "text": ai_text}]
-            )
-            await interview_sessions_collection.insert_one(new_session.model_dump(by_alias=True))
-            interview_id = new_session.id
-
-            # --- For a new interview, we have the text and ID. Now, generate audio and return. ---
-            # Use gTTS to convert the text to speech
-            tts = gTTS(text=ai_text, lang='en', slow=False)
-            audio_fp = BytesIO()
-            tts.write_to_fp(audio_fp)
-            audio_fp.seek(0)
-            
-            # Encode audio to base64 to send in JSON
-            audio_base64 = base64.b64encode(audio_fp.read()).decode('utf-8')
-
-            # Return immediately for a new interview
-            return {"text": ai_text, "audio": audio_base64, "interview_id": interview_id}
-
-            
+            ai_text = _initial_question(role, company, user_name)
+            interview_id = await _create_session(user_id, role, company, experience_level, ai_text)
         else:
             # --- Continuation of an existing interview ---
-            # Format the history for the prompt
-            questions_asked = sum(1 for msg in conversation_history if msg['speaker'] == 'HR')
-            
-            # Format history clearly for the model
-            history_lines = []
-            for msg in conversation_history:
-                speaker = "Alex (You)" if msg['speaker'] == 'HR' else "User"
-                history_lines.append(f"{speaker}: {msg['text']}")
-            history_str = "\n".join(history_lines)
-            
-            prompt = HR_PERSONA_PROMPT.format(
-                conversation_history=history_str, 
-                role=role.replace('_', ' ').title(),
-                company=company,
-                experience_level=experience_level,
-                questions_asked=questions_asked
+            ai_text = await _run_turn(
+                interview_id, user_id, conversation_history, answer, generate, role, company, experience_level
             )
 
-            model = genai.GenerativeModel('models/gemini-2.5-flash')
-            
-            response = await model.generate_content_async(prompt)
-            ai_text = response.text.strip()
-            # Update the session in the database
-            if interview_id:
-                updated_history = conversation_history + [{"speaker": "HR", "text": ai_text}]
-                await interview_sessions_collection.update_one(
-                    {"_id": interview_id},
-                    {"$set": {"conversation_history": updated_history}}
-                )
-            else:
-                logger.warning(f"Interview ID missing for user {user_id}. Could not save conversation.")
-
-        # Use gTTS to convert the text to speech
-        tts = gTTS(text=ai_text, lang='en', slow=False)
-        audio_fp = BytesIO()
-        tts.write_to_fp(audio_fp)
-        audio_fp.seek(0)
-        
+        if kwargs.get("audio_delivery") == "url" and speech_engine.cache is not None:
+            # The client fetches the audio separately from the range-capable /hr/audio endpoint
+            clip_id = await speech_engine.synthesize_clip(ai_text)
+            return {
+                "text": ai_text,
+                "audio_url": f"{AUDIO_URL_PREFIX}/{clip_id}",
+                "audio_media_type": speech_engine.media_type,
+                "interview_id": str(interview_id),
+            }
+
+        # Synthesized off the event loop; cached sentences (e.g. the fixed parts of greetings) are reused
+        audio = await speech_engine.synthesize(ai_text)
+
         # Encode audio to base64 to send in JSON
-        audio_base64 = base64.b64encode(audio_fp.read()).decode('utf-8')
+        audio_base64 = base64.b64encode(audio).decode('utf-8')
 
-        return {"text": ai_text, "audio": audio_base64, "interview_id": str(interview_id)}
+        return {"text": ai_text, "audio": audio_base64, "audio_media_type": speech_engine.media_type, "interview_id": str(interview_id)}
 
     except Exception as e:
         logger.error(f"An error occurred during HR response generation: {str(e)}")
         return {"error": f"An error occurred: {str(e)}"}
 
+async def stream_hr_response(
+    conversation_history: List[Dict[str, str]],
+    user_id: str,
+    user_name: str,
+    emit: Callable[[str, Dict[str, Any]], Awaitable[None]],
+    interview_id: Optional[str] = None,
+    **kwargs
+) -> Dict[str, Any]:
+    """
+    Streaming counterpart of generate_hr_response for the /interview socket namespace.
+    Emits "hr_text" deltas as Gemini tokens arrive and one binary "hr_audio" frame per
+    sentence, in order. Each sentence is synthesized as soon as it is complete, so the
+    candidate hears the first sentence while the rest is still being generated. If the stream
+    fails partway and a fallback question replaces it, "hr_turn_reset" tells the client to
+    discard the partial text and audio before the fallback is sent.
+    """
+    if not ai_client.enabled:
+        logger.error("Google API key not configured.")
+        return {"error": "Google API key not configured."}
+
+    role = kwargs.get("role", "default")
+    company = kwargs.get("company", "our company")
+    experience_level = kwargs.get("experience_level", "candidate")
+    conversation_history = conversation_history or []
+    answer = kwargs.get("answer")
+    is_new_interview = not interview_id and not conversation_history and not answer
+    turn_id = uuid.uuid4().hex
+
+    # Synthesis runs concurrently per sentence; the sender emits the clips in sentence order
+    audio_queue: "asyncio.Queue[Optional[Tuple[str, asyncio.Task]]]" = asyncio.Queue()
+
+    def queue_sentence(sentence: str) -> None:
+        audio_queue.put_nowait((sentence, asyncio.create_task(speech_engine.synthesize_sentence(sentence))))
+
+    def drop_queued_audio() -> None:
+        while not audio_queue.empty():
+            item = audio_queue.get_nowait()
+            if item is not None:
+                item[1].cancel()
+
+    async def send_audio() -> int:
+        index = 0
+        while (item := await audio_queue.get()) is not None:
+            sentence, synthesis = item
+            audio = await synthesis
+            await emit("hr_audio", {
+                "turn_id": turn_id, "index": index, "text": sentence, "audio": audio,
+                "media_type": speech_engine.media_type,
+            })
+            index += 1
+        return index
+
+    sender = asyncio.create_task(send_audio())
+    streamed = False
+    try:
+        if is_new_interview:
+            ai_text = _initial_question(role, company, user_name)
+            interview_id = await _create_session(user_id, role, company, experience_level, ai_text)
+            await emit("hr_turn_started", {"turn_id": turn_id, "interview_id": interview_id})
+            await emit("hr_text", {"turn_id": turn_id, "delta": ai_text})
+            for sentence in speech_service.split_sentences(ai_text):
+                queue_sentence(sentence)
+        else:
+            await emit("hr_turn_started", {"turn_id": turn_id, "interview_id": interview_id})
+
+            async def generate(prompt: str) -> str:
+                nonlocal streamed
+                splitter = speech_service.SentenceSplitter()
+                parts = []
+                async for delta in ai_client.stream(prompt, feature="hr_turn", priority=Priority.LIVE):
+                    streamed = True
+                    parts.append(delta)
+                    await emit("hr_text", {"turn_id": turn_id, "delta": delta})
+                    for sentence in splitter.feed(delta):
+                        queue_sentence(sentence)
+                for sentence in splitter.flush():
+                    queue_sentence(sentence)
+                return "".join(parts).strip()
+
+            async def deliver(text: str) -> None:
+                nonlocal sender
+                if streamed:
+                    # The stream failed partway: stop its audio and have the client drop what it got
+                    sender.cancel()
+                    drop_queued_audio()
+                    await emit("hr_turn_reset", {"turn_id": turn_id})
+                    sender = asyncio.create_task(send_audio())
+                await emit("hr_text", {"turn_id": turn_id, "delta": text})
+                for sentence in speech_service.split_sentences(text):
+                    queue_sentence(sentence)
+
+            ai_text = await _run_turn(
+                interview_id, user_id, conversation_history, answer, generate, role, company, experience_level,
+                deliver=deliver,
+            )
+
+        audio_queue.put_nowait(None)
+        sentence_count = await sender
+    except Exception as e:
+        sender.cancel()
+        drop_queued_audio()
+        logger.error(f"An error occurred during streamed HR response generation: {str(e)}")
+        return {"error": f"An error occurred: {str(e)}"}
+
+    result = {"turn_id": turn_id, "text": ai_text, "interview_id": str(interview_id), "sentences": sentence_count}
+    await emit("hr_turn_completed", result)
+    return result
+
 async def generate_interview_feedback(interview_id: str, user_id: str) -> Dict[str, Any]:
     """
     Generates a performance review for a completed HR interview session,
@@ -214,6 +546,8 @@ async def generate_interview_feedback(interview_id: str, user_id: str) -> Dict[s
     session = await interview_sessions_collection.find_one({"_id": interview_id, "user_id": user_id})
     if not session:
         raise ValueError("Interview session not found or access denied.")
+    # The interview is over; follow-ups still being speculated will never be asked
+    speculations.discard(interview_id)
 
     # Extract details for the prompt
     role_name = session.get("role", "the specified role")
@@ -226,9 +560,6 @@ async def generate_interview_feedback(interview_id: str, user_id: str) -> Dict[s
 
     transcript = "\n".join([f"{msg['speaker']}: {msg['text']}" for msg in session.get("conversation_history", [])])
 
-    genai.configure(api_key=settings.GOOGLE_API_KEY)
-    model = genai.GenerativeModel('models/gemini-2.5-flash')
-    
     prompt = EVALUATION_PROMPT_TEMPLATE.format(
         transcript=transcript,
         role_name=role_name,
@@ -236,9 +567,8 @@ async def generate_interview_feedback(interview_id: str, user_id: str) -> Dict[s
     )
     
     try:
-        response = await model.generate_content_async(prompt)
-        cleaned_response = response.text.strip().replace("```json", "").replace("```", "")
-        feedback_data = json.loads(cleaned_response)
+        response_text = await ai_client.generate(prompt, feature="hr_feedback", priority=Priority.BATCH)
+        feedback_data = json.loads(strip_code_fences(response_text))
 
         # Validate data with Pydantic model
         validated_feedback = HRInterviewFeedback.model_validate(feedback_data)
@@ -252,3 +582,12 @@ async def generate_interview_feedback(interview_id: str, user_id: str) -> Dict[s
     except Exception as e:
         logger.error(f"Error generating interview feedback for session {interview_id}: {e}")
         raise ValueError("Failed to generate or save feedback from AI model.")
+
+async def interview_exists(interview_id: str, user_id: str) -> bool:
+    return await interview_sessions_collection.count_documents({"_id": interview_id, "user_id": user_id}, limit=1) > 0
+
+async def _run_feedback_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    return await generate_interview_feedback(job["session_id"], job["user_id"])
+
+# Feedback is generated by the background job queue, one job per interview
+feedback_jobs.register("hr", _run_feedback_job)
@@ -0,0 +1,198 @@
+import asyncio
+import difflib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from ..core.metrics import metrics
+from .ai_client import Priority, ai_client, strip_code_fences
+
+logger = logging.getLogger(__name__)
+
+# --- Metrics ---
+
+speculation_results = metrics.counter(
+    "hr_speculation_total", "Speculative HR follow-ups by result (started, hit, miss)."
+)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def similarity(partial: str, final: str) -> float:
+    """How closely a partial transcript matches the final answer (0-1)."""
+    return difflib.SequenceMatcher(None, _normalize(partial), _normalize(final), autojunk=False).ratio()
+
+
+# --- Speculative Follow-ups ---
+
+@dataclass
+class Speculation:
+    # Length of the stored transcript the follow-up was generated for; stale once the interview moves on
+    history_length: int
+    partial_answer: str
+    task: "asyncio.Task[str]"
+    created: float = field(default_factory=time.monotonic)
+
+
+class SpeculationStore:
+    """
+    Follow-up questions generated from the candidate's partial transcript while they are
+    still answering. When the final answer arrives, the speculation whose partial answer is
+    most similar to it is used instead of a fresh generation, if it is similar enough.
+    Interviews that are abandoned mid-answer expire after `ttl_seconds`, and at most
+    `max_interviews` keep speculations at once (the least recently active are dropped).
+    """
+
+    def __init__(
+        self,
+        min_new_chars: int,
+        match_threshold: float,
+        max_per_turn: int,
+        ttl_seconds: float = 300.0,
+        max_interviews: int = 1000,
+    ):
+        self.min_new_chars = min_new_chars
+        self.match_threshold = match_threshold
+        self.max_per_turn = max_per_turn
+        self.ttl_seconds = ttl_seconds
+        self.max_interviews = max(1, max_interviews)
+        # Ordered by last activity, oldest first
+        self._speculations: Dict[str, List[Speculation]] = {}
+
+    def _prune(self) -> None:
+        expired_before = time.monotonic() - self.ttl_seconds
+        for interview_id, speculations in list(self._speculations.items()):
+            if speculations and speculations[-1].created >= expired_before:
+                break
+            self.discard(interview_id)
+        while len(self._speculations) > self.max_interviews:
+            self.discard(next(iter(self._speculations)))
+
+    def offer(
+        self,
+        interview_id: str,
+        history_length: int,
+        partial_answer: str,
+        generate: Callable[[], Awaitable[str]],
+    ) -> bool:
+        """
+        Starts a speculative generation for `partial_answer` unless one already covers most of it.
+        Returns True if a new speculation was started.
+        """
+        self._prune()
+        speculations = [s for s in self._speculations.get(interview_id, []) if s.history_length == history_length]
+        if len(speculations) >= self.max_per_turn:
+            return False
+        if speculations and len(partial_answer) - len(speculations[-1].partial_answer) < self.min_new_chars:
+            return False
+        if not speculations and len(partial_answer) < self.min_new_chars:
+            return False
+
+        task = asyncio.create_task(generate())
+        task.add_done_callback(_log_failure)
+        speculations.append(Speculation(history_length, partial_answer, task))
+        # Re-inserted so the dict stays ordered by last activity
+        for stale in self._speculations.pop(interview_id, []):
+            if stale not in speculations:
+                stale.task.cancel()
+        self._speculations[interview_id] = speculations
+        speculation_results.inc(result="started")
+        return True
+
+    async def take(self, interview_id: str, history_length: int, final_answer: str) -> Optional[str]:
+        """
+        Returns the follow-up of the best-matching speculation for this turn, or None.
+        All of the interview's speculations are dropped either way.
+        """
+        speculations = self._speculations.pop(interview_id, [])
+        best, best_score = None, self.match_threshold
+        for speculation in speculations:
+            if speculation.history_length != history_length or speculation.task.cancelled():
+                continue
+            score = similarity(speculation.partial_answer, final_answer)
+            if score >= best_score:
+                best, best_score = speculation, score
+
+        for speculation in speculations:
+            if speculation is not best:
+                speculation.task.cancel()
+        if best is None:
+            if speculations:
+                speculation_results.inc(result="miss")
+            return None
+
+        try:
+            # Still running is fine: it started earlier than a fresh generation would
+            follow_up = await best.task
+        except Exception:
+            speculation_results.inc(result="miss")
+            return None
+        speculation_results.inc(result="hit")
+        return follow_up
+
+    def discard(self, interview_id: str) -> None:
+        """Cancels and forgets every speculation of an interview."""
+        for speculation in self._speculations.pop(interview_id, []):
+            speculation.task.cancel()
+
+
+def _log_failure(task: "asyncio.Task[str]") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Speculative HR follow-up failed: {task.exception()}")
+
+
+# --- Question Bank ---
+
+QUESTION_BANK_PROMPT = """
+You are an expert HR interviewer. List {count} distinct, open-ended HR interview questions
+for a candidate applying for the {role} position. Mix behavioral ("Tell me about a time..."),
+situational ("What would you do if...") and motivation questions. Each question must be a
+single sentence that works as a follow-up in any interview for this role.
+
+Return a JSON array of strings only.
+"""
+
+
+class QuestionBank:
+    """
+    Role-specific HR questions generated ahead of time. They back a turn when live generation
+    fails or exceeds its budget, so the candidate still gets an immediate next question.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._questions: Dict[str, List[str]] = {}
+
+    async def _generate(self, role_key: str, role_title: str) -> None:
+        response_text = await ai_client.generate(
+            QUESTION_BANK_PROMPT.format(count=self.size, role=role_title),
+            feature="hr_question_bank",
+            priority=Priority.BATCH,
+        )
+        questions = [q.strip() for q in json.loads(strip_code_fences(response_text)) if isinstance(q, str) and q.strip()]
+        self._questions[role_key] = questions[: self.size]
+
+    async def warm_up(self, roles: Dict[str, str]) -> None:
+        """Generates the bank for each role key -> display title; failures leave that role empty."""
+        if not ai_client.enabled:
+            return
+        results = await asyncio.gather(
+            *(self._generate(key, title) for key, title in roles.items() if key not in self._questions),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Could not prewarm HR question bank: {result}")
+        logger.info(f"HR question bank ready for {len(self._questions)} role(s).")
+
+    def pick(self, role_key: str, asked: Iterable[str]) -> Optional[str]:
+        """Returns the first bank question for the role that has not been asked yet."""
+        asked_normalized = {_normalize(text) for text in asked}
+        for question in self._questions.get(role_key, []):
+            if _normalize(question) not in asked_normalized:
+                return question
+        return None
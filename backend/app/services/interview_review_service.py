@@ -1,17 +1,23 @@
-import google.generativeai as genai
 import logging
 import json
 import datetime
-from typing import List, Dict, Any
-import httpx, asyncio
-from serpapi import GoogleSearch
+from typing import List, Dict, Any, Set
+import asyncio
+from pymongo.errors import DuplicateKeyError
 
 from ..core.config import settings
 from ..models.interview_review import InterviewReview
 from ..core.db import interview_reviews_cache_collection
+from ..core.metrics import metrics
+from ..core.singleflight import SingleFlight
+from . import review_sources
+from .ai_client import Priority, ai_client
 
 logger = logging.getLogger(__name__)
 
+# Concurrent cache misses for the same company share one SerpAPI/Reddit/Gemini pipeline
+review_generation = SingleFlight("interview_reviews")
+
 # --- Prompt Template ---
 GEMINI_PROMPT_TEMPLATE = """
 You are an AI assistant integrated into an AI Mock Interview website.
@@ -81,17 +87,10 @@ async def get_serpapi_summary(company_name: str) -> str:
         logger.warning("SERPAPI_API_KEY not configured. Skipping web search.")
         return "No web search data available."
     try:
-        params = {
-            "engine": "google",
-            "q": f"{company_name} interview experience",
-            "api_key": settings.SERPAPI_API_KEY,
-        }
-        search = GoogleSearch(params)
-        results = search.get_dict()
-        organic_results = results.get("organic_results", [])
-        summary = " ".join([res.get("snippet", "") for res in organic_results[:3]])
+        snippets = await review_sources.fetch_serpapi_snippets(f"{company_name} interview experience")
+        summary = " ".join(snippets).strip()
         return summary if summary else "No relevant web search results found."
-    except Exception as e:
+    except review_sources.SourceUnavailable as e:
         logger.error(f"Error fetching data from SerpAPI: {e}")
         return "Error fetching web search data."
 
@@ -99,39 +98,181 @@ async def get_serpapi_summary(company_name: str) -> str:
 async def get_reddit_summary(company_name: str) -> str:
     """Fetches and summarizes Reddit posts."""
     try:
-        search_query = f"{company_name} interview experience"
-        url = (
-            f"https://www.reddit.com/search.json?"
-            f"q={search_query}&sort=relevance&t=all&limit=5"
+        posts = await review_sources.fetch_reddit_posts(f"{company_name} interview experience")
+        summary = " ".join(posts).strip()
+        return summary if summary else "No relevant Reddit posts found recently."
+    except review_sources.SourceUnavailable as e:
+        logger.error(f"Error fetching data from Reddit: {e}")
+        return "Error fetching Reddit data."
+
+# --- Cache ---
+# Entries are fresh for REVIEW_CACHE_SOFT_TTL_SECONDS, then served stale while a background
+# refresh regenerates them. MongoDB deletes an entry at its `expires_at` (the hard TTL), which
+# every write pushes back, so only companies nobody asks for again actually expire.
+
+cache_requests = metrics.counter("review_cache_requests_total", "Interview review cache lookups by result (hit, stale, miss).")
+cache_refreshes = metrics.counter("review_cache_refreshes_total", "Background review regenerations by trigger and outcome.")
+
+# A refresh claimed by one worker is skipped by the others for this long
+REFRESH_CLAIM_SECONDS = 300
+
+_refresh_tasks: Set["asyncio.Task[None]"] = set()
+
+
+def normalize_company_name(company_name: str) -> str:
+    """The cache and single-flight key: case- and whitespace-insensitive."""
+    return " ".join(company_name.lower().split())
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _age_seconds(entry: Dict[str, Any]) -> float:
+    created_at = entry.get("created_at")
+    if created_at is None:
+        return float("inf")
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=datetime.timezone.utc)
+    return (_now() - created_at).total_seconds()
+
+
+async def ensure_cache_indexes() -> None:
+    """
+    Makes company_name unique in the review cache, so concurrent generations in different
+    workers collapse into one document. Duplicates left by the old insert-only writes are
+    removed first (keeping the newest), since the unique index cannot be built over them.
+    Also replaces the old fixed 3-day TTL on created_at with the per-entry hard TTL.
+    """
+    duplicates = interview_reviews_cache_collection.aggregate([
+        {"$sort": {"created_at": -1}},
+        {"$group": {"_id": "$company_name", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ])
+    async for group in duplicates:
+        await interview_reviews_cache_collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+        logger.info(f"Removed {group['count'] - 1} duplicate review cache entries for {group['_id']!r}.")
+    await interview_reviews_cache_collection.create_index("company_name", unique=True)
+
+    if "created_at_1" in await interview_reviews_cache_collection.index_information():
+        await interview_reviews_cache_collection.drop_index("created_at_1")
+    await interview_reviews_cache_collection.update_many(
+        {"expires_at": {"$exists": False}},
+        [{"$set": {"expires_at": {"$add": ["$created_at", settings.REVIEW_CACHE_HARD_TTL_SECONDS * 1000]}}}],
+    )
+    await interview_reviews_cache_collection.create_index("expires_at", expireAfterSeconds=0)
+    await interview_reviews_cache_collection.create_index([("request_count", -1)])
+
+
+async def _store_reviews(company_key: str, reviews: List[Dict[str, Any]]) -> None:
+    now = _now()
+    try:
+        await interview_reviews_cache_collection.update_one(
+            {"company_name": company_key},
+            {
+                "$set": {
+                    "reviews": reviews,
+                    "created_at": now,
+                    "expires_at": now + datetime.timedelta(seconds=settings.REVIEW_CACHE_HARD_TTL_SECONDS),
+                },
+                "$unset": {"refresh_claimed_until": ""},
+                "$setOnInsert": {"request_count": 1, "last_requested_at": now},
+            },
+            upsert=True,
         )
-        headers = {"User-Agent": settings.REDDIT_USER_AGENT or "API-Client"}
+    except DuplicateKeyError:
+        # Another worker's upsert inserted the document first; its reviews are just as good
+        logger.info(f"Review cache for {company_key!r} was written concurrently by another worker.")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
 
-        posts = data.get("data", {}).get("children", [])
-        summary = " ".join([post.get("data", {}).get("selftext", "") for post in posts])
-        return summary if summary else "No relevant Reddit posts found recently."
+async def _claim_refresh(company_key: str) -> bool:
+    """Marks an entry as being refreshed, so other workers do not regenerate it too."""
+    now = _now()
+    claimed = await interview_reviews_cache_collection.find_one_and_update(
+        {
+            "company_name": company_key,
+            "$or": [{"refresh_claimed_until": {"$exists": False}}, {"refresh_claimed_until": {"$lt": now}}],
+        },
+        {"$set": {"refresh_claimed_until": now + datetime.timedelta(seconds=REFRESH_CLAIM_SECONDS)}},
+        projection={"_id": 1},
+    )
+    return claimed is not None
+
+
+async def refresh_reviews(company_name: str, trigger: str) -> None:
+    """Regenerates a cached entry at batch priority. Failures keep serving the old entry."""
+    company_key = normalize_company_name(company_name)
+    if company_key in review_generation or not await _claim_refresh(company_key):
+        return
+    try:
+        await review_generation.do(company_key, lambda: _generate_and_cache(company_name, company_key, Priority.BATCH))
+        cache_refreshes.inc(trigger=trigger, outcome="ok")
     except Exception as e:
-        logger.error(f"Error fetching data from Reddit: {e}")
-        return "Error fetching Reddit data."
+        cache_refreshes.inc(trigger=trigger, outcome="error")
+        logger.warning(f"Background refresh of interview reviews for {company_name!r} failed: {e}")
+
+
+def _schedule_refresh(company_name: str) -> None:
+    task = asyncio.create_task(refresh_reviews(company_name, trigger="stale"))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def prewarm_popular_companies() -> None:
+    """
+    Every REVIEW_PREWARM_INTERVAL_SECONDS, refreshes the REVIEW_PREWARM_TOP_N most requested
+    companies (requested within the hard TTL) whose entries would go stale before the next run.
+    """
+    interval = settings.REVIEW_PREWARM_INTERVAL_SECONDS
+    while True:
+        try:
+            now = _now()
+            popular = interview_reviews_cache_collection.find(
+                {"last_requested_at": {"$gte": now - datetime.timedelta(seconds=settings.REVIEW_CACHE_HARD_TTL_SECONDS)}},
+                {"company_name": 1, "created_at": 1},
+            ).sort("request_count", -1).limit(settings.REVIEW_PREWARM_TOP_N)
+            async for entry in popular:
+                if _age_seconds(entry) + interval >= settings.REVIEW_CACHE_SOFT_TTL_SECONDS:
+                    await refresh_reviews(entry["company_name"], trigger="prewarm")
+        except Exception as e:
+            logger.warning(f"Interview review prewarm failed: {e}")
+        await asyncio.sleep(interval)
+
 
 # --- Main Generator ---
 async def generate_interview_reviews(company_name: str) -> List[Dict[str, Any]]:
     """
     Generates interview reviews by fetching data and using Gemini.
+    Stale cache entries are returned immediately and refreshed in the background;
+    concurrent misses for the same company share one generation.
     """
-    # 1. Check for cached data first
-    cached_data = await interview_reviews_cache_collection.find_one({"company_name": company_name.lower()})
+    company_key = normalize_company_name(company_name)
+
+    # 1. Check for cached data first (and count the request for the prewarmer)
+    cached_data = await interview_reviews_cache_collection.find_one_and_update(
+        {"company_name": company_key},
+        {"$inc": {"request_count": 1}, "$set": {"last_requested_at": _now()}},
+    )
     if cached_data:
-        logger.info(f"Cache hit for company: {company_name}. Serving from cache.")
+        if _age_seconds(cached_data) >= settings.REVIEW_CACHE_SOFT_TTL_SECONDS:
+            logger.info(f"Stale cache entry for company: {company_name}. Serving it and refreshing in the background.")
+            cache_requests.inc(result="stale")
+            _schedule_refresh(company_name)
+        else:
+            logger.info(f"Cache hit for company: {company_name}. Serving from cache.")
+            cache_requests.inc(result="hit")
         # Validate data from cache to ensure it matches the Pydantic model
         validated_reviews = [InterviewReview.model_validate(review) for review in cached_data["reviews"]]
         return [review.model_dump() for review in validated_reviews]
 
-    logger.info(f"Cache miss for company: {company_name}. Generating new reviews.")
+    cache_requests.inc(result="miss")
+    return await review_generation.do(company_key, lambda: _generate_and_cache(company_name, company_key))
+
+
+async def _generate_and_cache(
+    company_name: str, company_key: str, priority: Priority = Priority.INTERACTIVE
+) -> List[Dict[str, Any]]:
+    logger.info(f"Generating new reviews for company: {company_name}.")
 
     api_keys = [settings.GOOGLE_API_KEY, settings.SERPAPI_API_KEY, settings.REDDIT_CLIENT_ID]
     if not all(api_keys):
@@ -143,9 +284,6 @@ async def generate_interview_reviews(company_name: str) -> List[Dict[str, Any]]:
         get_reddit_summary(company_name)
     )
 
-    genai.configure(api_key=settings.GOOGLE_API_KEY)
-    model = genai.GenerativeModel("models/gemini-2.5-flash")
-
     prompt = GEMINI_PROMPT_TEMPLATE.format(
         company_name=company_name,
         serpapi_summary=serpapi_summary,
@@ -153,11 +291,11 @@ async def generate_interview_reviews(company_name: str) -> List[Dict[str, Any]]:
     )
 
     try:
-        response = await model.generate_content_async(prompt)
+        response_text = await ai_client.generate(prompt, feature="interview_reviews", priority=priority)
 
         # Clean and parse JSON safely
         cleaned_response = (
-            response.text.strip()
+            response_text
             .replace("```json", "")
             .replace("```", "")
             .replace("\n", "")
@@ -193,11 +331,7 @@ async def generate_interview_reviews(company_name: str) -> List[Dict[str, Any]]:
         final_reviews = [r.model_dump() for r in validated_reviews]
 
         # 3. Store the newly generated reviews in the cache
-        await interview_reviews_cache_collection.insert_one({
-            "company_name": company_name.lower(),
-            "reviews": final_reviews,
-            "created_at": datetime.datetime.now(datetime.timezone.utc)
-        })
+        await _store_reviews(company_key, final_reviews)
 
         return final_reviews
 
@@ -1,10 +1,9 @@
-import google.generativeai as genai
 import logging
 import json
 from typing import List, Dict, Any
 
-from ..core.config import settings
 from ..models.job_tracker import JobPlatformRequest, JobPlatformRanking
+from .ai_client import Priority, ai_client, strip_code_fences
 
 logger = logging.getLogger(__name__)
 
@@ -55,12 +54,10 @@ async def get_platform_rankings(request: JobPlatformRequest) -> List[Dict[str, A
     """
     Generates job platform rankings using the Gemini API.
     """
-    if not settings.GOOGLE_API_KEY:
+    if not ai_client.enabled:
         logger.error("Google API key not configured for Job Tracker.")
         raise ValueError("API key not configured.")
 
-    genai.configure(api_key=settings.GOOGLE_API_KEY)
-
     prompt = JOB_PLATFORM_PROMPT_TEMPLATE.format(
         skills=", ".join(request.skills),
         work_arrangement=request.workArrangement,
@@ -69,10 +66,8 @@ async def get_platform_rankings(request: JobPlatformRequest) -> List[Dict[str, A
     )
 
     try:
-        model = genai.GenerativeModel('models/gemini-2.5-flash')
-        response = await model.generate_content_async(prompt)
-        cleaned_response = response.text.strip().replace("```json", "").replace("```", "")
-        rankings_data = json.loads(cleaned_response)
+        response_text = await ai_client.generate(prompt, feature="job_tracker", priority=Priority.BATCH)
+        rankings_data = json.loads(strip_code_fences(response_text))
         validated_rankings = [JobPlatformRanking.model_validate(ranking) for ranking in rankings_data]
         return [ranking.model_dump() for ranking in validated_rankings]
     except Exception as e:
@@ -0,0 +1,105 @@
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# --- Helpers ---
+
+def _current_rss_bytes() -> int:
+    """Returns the resident set size of this process, falling back to the peak RSS."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+# --- Model Registry ---
+
+@dataclass
+class ModelEntry:
+    name: str
+    loader: Callable[[], Any]
+    instance: Any = None
+    loaded: bool = False
+    load_seconds: Optional[float] = None
+    memory_bytes: Optional[int] = None
+    error: Optional[str] = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "loaded": self.loaded,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "memory_mb": round(self.memory_bytes / (1024 * 1024), 1) if self.memory_bytes is not None else None,
+            "error": self.error,
+        }
+
+
+class ModelRegistry:
+    """
+    Loads heavy NLP models lazily on first use.
+
+    Each model has its own lock, so concurrent first requests block on a single
+    load instead of each loading a copy, while already-loaded models are served
+    without taking any lock.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, ModelEntry] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        self._entries[name] = ModelEntry(name=name, loader=loader)
+
+    def get(self, name: str) -> Any:
+        entry = self._entries[name]
+        if entry.loaded:
+            return entry.instance
+        with entry.lock:
+            if not entry.loaded:
+                self._load(entry)
+        return entry.instance
+
+    def _load(self, entry: ModelEntry) -> None:
+        logger.info(f"Loading model '{entry.name}'...")
+        rss_before = _current_rss_bytes()
+        started = time.perf_counter()
+        try:
+            entry.instance = entry.loader()
+        except Exception as e:
+            entry.error = str(e)
+            logger.error(f"Failed to load model '{entry.name}': {e}")
+            raise
+        entry.load_seconds = time.perf_counter() - started
+        entry.memory_bytes = max(_current_rss_bytes() - rss_before, 0)
+        entry.error = None
+        entry.loaded = True
+        logger.info(f"Model '{entry.name}' loaded in {entry.load_seconds:.2f}s (+{entry.memory_bytes / (1024 * 1024):.0f} MB)")
+
+    def warm_up(self, names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Loads the given models (all of them by default) and returns their stats."""
+        for name in names or list(self._entries):
+            try:
+                self.get(name)
+            except Exception:
+                pass  # The failure is recorded on the entry and reported in the stats
+        return self.stats(names)
+
+    def stats(self, names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        return [self._entries[name].stats() for name in names or list(self._entries)]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+
+models = ModelRegistry()
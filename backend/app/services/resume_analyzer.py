@@ -1,27 +1,52 @@
-import re
-import spacy
 import os
 import json
-from transformers import pipeline
-from typing import List, Dict, Any, Set
-import time
-from google.api_core.exceptions import ResourceExhausted
-import google.generativeai as genai
+from typing import List, Dict, Any, Set, Tuple, Optional
+from functools import lru_cache
 import logging
 
 from ..core.config import settings
+from ..core.metrics import StageTimer
+from .ai_client import Priority, ai_client
+from .skill_index import SkillIndex
+from .model_registry import models
+from .resume_sections import Section, sectionize
+from . import resume_patterns as patterns
 
 # --- Model and Pipeline Initialization ---
-# It's good practice to load models once and reuse them.
+# Models are registered here but only loaded on first use (or by an explicit warm-up),
+# so workers that never analyze a resume do not pay for them.
 # Models should be downloaded via the `download_models.py` script before starting the app.
 # This avoids trying to download models at runtime.
 logger = logging.getLogger(__name__)
 
-nlp = spacy.load("en_core_web_sm")
+SPACY_MODEL_NAME = "spacy_en_core_web_sm"
+NER_MODEL_NAME = "hf_bert_base_ner"
 
-ner_pipeline = pipeline("ner", model="dslim/bert-base-NER", aggregation_strategy="simple")
+def _load_spacy_model():
+    import spacy
+    return spacy.load("en_core_web_sm")
+
+def _load_ner_pipeline():
+    from transformers import pipeline
+    return pipeline("ner", model="dslim/bert-base-NER", aggregation_strategy="simple")
+
+models.register(SPACY_MODEL_NAME, _load_spacy_model)
+models.register(NER_MODEL_NAME, _load_ner_pipeline)
+
+def get_nlp():
+    return models.get(SPACY_MODEL_NAME)
+
+def get_ner_pipeline():
+    return models.get(NER_MODEL_NAME)
+
+def warm_up_models() -> List[Dict[str, Any]]:
+    """Loads every resume analysis model up front and returns their load stats."""
+    return models.warm_up([SPACY_MODEL_NAME, NER_MODEL_NAME])
 
 # --- Constants ---
+# Bump whenever extraction or scoring logic changes, so cached analyses are not reused
+ANALYZER_VERSION = "2"
+
 NON_NAMES = {name.lower() for name in {"MERN Stack", "Stack", "Problem Solving", "Education", "Projects", "Skills", "Experience"}}
 
 # A more comprehensive list of skills
@@ -35,6 +60,20 @@ SKILLS_LIST = [
     "Project Management", "Agile", "Scrum", "JIRA", "Software Development Life Cycle", "SDLC"
 ]
 
+# Alternative spellings that should be reported under their canonical skill name
+SKILL_ALIASES = {
+    "JavaScript": ["JS"],
+    "Node.js": ["NodeJS"],
+    "Express.js": ["ExpressJS"],
+    "Vue.js": ["VueJS"],
+    "PostgreSQL": ["Postgres"],
+    "Kubernetes": ["K8s"],
+    "Scikit-learn": ["sklearn"],
+}
+
+# Built once at import time and shared by every request
+SKILL_INDEX = SkillIndex(SKILLS_LIST, SKILL_ALIASES)
+
 AI_PROMPT_TEMPLATE = """
 You are an expert career coach reviewing a resume. Based on the following analysis, provide a professional and encouraging feedback paragraph (3-4 sentences).
 
@@ -51,94 +90,84 @@ Your feedback should start with an encouraging sentence. If the candidate is 'ex
 
 # --- Extraction Functions ---
 
-def extract_name(text: str) -> str:
-    """
-    Extracts a name using a combination of spaCy and a Hugging Face NER model
-    to improve accuracy. It prioritizes the longest name found.
-    """
-    text_to_search = text[:500] # Search in the top 500 characters
+NAME_SEARCH_CHARS = 500 # Names are searched for in the top of the resume only
+
+def _pick_name(text_to_search: str, doc, ner_results) -> str:
+    """Combines spaCy and Hugging Face entities for one resume and prioritizes the longest name found."""
     all_names = set()
 
-    # 1. Try with spaCy
-    doc = nlp(text_to_search)
+    # 1. spaCy entities
     for ent in doc.ents:
         if ent.label_ == 'PERSON' and ent.text.lower() not in NON_NAMES:
             all_names.add(ent.text.strip())
 
-    # 2. Try with Hugging Face NER
-    # We avoid .title() as it can alter the structure NER models expect
-    try:
-        ner_results = ner_pipeline(text_to_search) # With aggregation_strategy="simple", each result is a full entity
-        for entity in ner_results:
-            if entity['entity_group'] == 'PER' and entity['word'].lower() not in NON_NAMES and len(entity['word']) > 1:
-                clean_name = entity['word'].replace('##', '').strip()
-                all_names.add(clean_name)
-    except Exception:
-        pass # Silently fail if the model has issues
+    # 2. Hugging Face entities (with aggregation_strategy="simple", each result is a full entity)
+    for entity in ner_results:
+        if entity['entity_group'] == 'PER' and entity['word'].lower() not in NON_NAMES and len(entity['word']) > 1:
+            clean_name = entity['word'].replace('##', '').strip()
+            all_names.add(clean_name)
 
     # 3. Fallback with a simple regex for "Firstname Lastname" at the start
-    regex_match = re.match(r"^\s*([A-Z][a-z]+(?: [A-Z][a-z]+){1,2})", text_to_search)
+    regex_match = patterns.LEADING_NAME_PATTERN.match(text_to_search)
     if regex_match:
         all_names.add(regex_match.group(1).strip())
 
     return max(list(all_names), key=len) if all_names else "N/A"
+
+def extract_names_batch(texts: List[str], batch_size: Optional[int] = None) -> List[str]:
+    """
+    Extracts candidate names for many resumes at once, running spaCy through `nlp.pipe`
+    and the Hugging Face NER model in batched forward passes.
+    """
+    if not texts:
+        return []
+    batch_size = batch_size or settings.NER_BATCH_SIZE
+    texts_to_search = [text[:NAME_SEARCH_CHARS] for text in texts]
+
+    docs = list(get_nlp().pipe(texts_to_search, batch_size=batch_size))
+
+    # We avoid .title() as it can alter the structure NER models expect
+    ner_results: List[List[Dict[str, Any]]] = [[] for _ in texts_to_search]
+    non_empty = [i for i, text in enumerate(texts_to_search) if text.strip()]
+    try:
+        batched_results = get_ner_pipeline()([texts_to_search[i] for i in non_empty], batch_size=batch_size)
+        for i, results in zip(non_empty, batched_results):
+            ner_results[i] = results
+    except Exception:
+        pass # Silently fail if the model has issues
+
+    return [_pick_name(text, doc, results) for text, doc, results in zip(texts_to_search, docs, ner_results)]
+
+def extract_name(text: str) -> str:
+    """
+    Extracts a name using a combination of spaCy and a Hugging Face NER model
+    to improve accuracy. It prioritizes the longest name found.
+    """
+    return extract_names_batch([text])[0]
+
 def extract_contact_info(text: str) -> Dict[str, List[str]]:
     """Extracts emails and phone numbers."""
-    emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
-    phones = re.findall(r'(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})', text)
+    emails = patterns.EMAIL_PATTERN.findall(text)
+    phones = patterns.PHONE_PATTERN.findall(text)
     return {"emails": sorted(list(set(emails))), "phone_numbers": sorted(list(set(phones)))}
 
-def extract_skills(text: str, skills_list: List[str]) -> List[str]:
-    """Extracts skills from text based on a predefined list."""
-    found_skills = set()
-    for skill in skills_list:
-        if re.search(r'\b' + re.escape(skill) + r'\b', text, re.IGNORECASE):
-            found_skills.add(skill)
-    return sorted(list(found_skills), key=str.lower)
+@lru_cache(maxsize=8)
+def _build_skill_index(skills: Tuple[str, ...]) -> SkillIndex:
+    return SkillIndex(skills)
 
-def extract_section(text: str, section_titles: List[str]) -> str:
-    """
-    Extracts a whole section from the resume text based on a list of possible titles.
-    This version is more robust and uses line-by-line checking instead of a single large regex.
-    """
-    lines = text.split('\n')
-    start_index = -1
-    end_index = len(lines)
-
-    # A list of all known section titles to detect the end of the current section
-    all_section_headers = ["experience", "education", "skills", "projects", "certifications", "summary", "objective", "awards", "publications", "work experience", "academic qualifications"]
-
-    # Find the start line of our target section
-    for i, line in enumerate(lines):
-        if any(title.lower() in line.lower() for title in section_titles):
-            start_index = i
-            break
-    
-    if start_index == -1:
-        return ""
-
-    # Find the end line (the start of the *next* section)
-    for i in range(start_index + 1, len(lines)):
-        # Check if the line looks like a header
-        line_lower = lines[i].lower().strip()
-        if any(header in line_lower for header in all_section_headers if header not in [t.lower() for t in section_titles]):
-             # If it's a different header, we've found the end of our section
-            if len(line_lower) < 30: # Assume headers are short
-                end_index = i
-                break
-
-    return "\n".join(lines[start_index:end_index])
-
-def parse_education(section_text: str) -> List[Dict[str, str]]:
+def extract_skills(text: str, skills_list: List[str] = SKILLS_LIST) -> List[str]:
+    """Extracts skills from text in a single pass over a prebuilt skill index."""
+    index = SKILL_INDEX if skills_list is SKILLS_LIST else _build_skill_index(tuple(skills_list))
+    return index.extract(text)
+
+def parse_education(section: Optional[Section]) -> List[Dict[str, str]]:
     """Parses the education section to extract degree, university, and year."""
-    if not section_text:
+    if section is None:
         return []
 
     educations = []
-    # Clean up lines and remove the header
-    lines = [line.strip() for line in section_text.split('\n') if line.strip()]
-    if lines and any(header in lines[0].lower() for header in ["education", "academic"]):
-        lines = lines[1:]
+    # Clean up lines (the header is already split off by the sectionizer)
+    lines = [line.strip() for line in section.lines if line.strip()]
 
     # Group lines that belong to the same educational entry
     grouped_entries = []
@@ -156,11 +185,11 @@ def parse_education(section_text: str) -> List[Dict[str, str]]:
     # Parse each grouped entry
     for entry_text in grouped_entries:
         # Extract Year
-        year_match = re.search(r'\b(20\d{2})\b', entry_text)
+        year_match = patterns.GRADUATION_YEAR_PATTERN.search(entry_text)
         year = year_match.group(1) if year_match else "N/A"
 
         # Extract University/College
-        uni_match = re.search(r'([A-Z][\w\s]+(?:University|College|School))', entry_text, re.IGNORECASE)
+        uni_match = patterns.INSTITUTION_PATTERN.search(entry_text)
         university = uni_match.group(1).strip() if uni_match else "N/A"
 
         educations.append({
@@ -171,17 +200,17 @@ def parse_education(section_text: str) -> List[Dict[str, str]]:
     return educations
 
 
-def parse_experience(section_text: str) -> List[Dict[str, str]]:
+def parse_experience(section: Optional[Section]) -> List[Dict[str, str]]:
     """Parses the experience section to extract company name, job title, duration, and key achievements."""
-    if not section_text.strip():
+    if section is None or not section.body.strip():
         return []
 
     experiences = []
     # Split the section into entries. This assumes a blank line or a line with a date range might separate entries.
     # This is a heuristic and can be improved.
-    entries = re.split(r'\n\s*\n', section_text.strip())
+    entries = patterns.ENTRY_SEPARATOR_PATTERN.split(section.body.strip())
 
-    duration_pattern = re.compile(r'(\w+\s?\d{4}\s*[-–to]+\s*(?:\w+\s?\d{4}|Present|Current))', re.IGNORECASE)
+    duration_pattern = patterns.DURATION_PATTERN
 
     for entry in entries:
         if not entry.strip():
@@ -220,13 +249,11 @@ def parse_experience(section_text: str) -> List[Dict[str, str]]:
     return experiences
 
 
-def parse_certifications(section_text: str) -> List[str]:
-    """Extracts certifications by splitting the section text by lines."""
-    if not section_text:
+def parse_certifications(section: Optional[Section]) -> List[str]:
+    """Extracts certifications, assuming each one is on its own line."""
+    if section is None:
         return []
-    # Assumes each certification is on a new line, ignoring the section title itself.
-    lines = section_text.strip().split('\n')[1:]
-    return [line.strip() for line in lines if line.strip()]
+    return [line.strip() for line in section.lines if line.strip()]
 
 
 # --- ATS and Analysis Functions ---
@@ -316,20 +343,12 @@ def generate_summary(name: str, ats_score: int, resume_skills: List[str], jd_pro
         weakness_score = f"The main area for improvement is tailoring the resume for the target job, as indicated by the ATS score of {ats_score}%."
     return f"{strengths} {weakness_score} Focusing on highlighting relevant skills and quantifying achievements will significantly improve its effectiveness."
 
-def generate_ai_feedback(resume_data: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Generates AI-powered feedback using the Google Gemini API.
-    """
-    # Check if the Google API key is configured
-    if not settings.GOOGLE_API_KEY:
-        return {"error": "Google API key not configured for AI feedback."}
-
-    genai.configure(api_key=settings.GOOGLE_API_KEY)
-    
+def build_feedback_prompt(resume_data: Dict[str, Any]) -> str:
+    """Summarizes the structured analysis into the Gemini feedback prompt."""
     # Create summaries of resume sections to provide context to the AI model
     skills_str = ", ".join(resume_data.get("skills_extracted", [])[:10]) or "Not specified"
     missing_skills_str = ", ".join(resume_data.get("missing_skills", [])) or "None"
-    
+
     experience_summary = "Not specified"
     if resume_data.get("experience"):
         num_roles = len(resume_data["experience"])
@@ -341,67 +360,88 @@ def generate_ai_feedback(resume_data: Dict[str, Any]) -> Dict[str, Any]:
         num_degrees = len(resume_data["education"])
         education_summary = f"{num_degrees} degree(s)/qualification(s) listed."
 
-    try:
-        prompt = AI_PROMPT_TEMPLATE.format(
-            candidate_type=resume_data.get("candidate_type", "N/A"),
-            ats_score=resume_data.get("ATS_score", "N/A"),
-            skills=skills_str,
-            missing_skills=missing_skills_str,
-            experience_summary=experience_summary,
-            education_summary=education_summary
-        )
+    return AI_PROMPT_TEMPLATE.format(
+        candidate_type=resume_data.get("candidate_type", "N/A"),
+        ats_score=resume_data.get("ATS_score", "N/A"),
+        skills=skills_str,
+        missing_skills=missing_skills_str,
+        experience_summary=experience_summary,
+        education_summary=education_summary
+    )
 
-        # Use the Gemini Pro model
-        model = genai.GenerativeModel('models/gemini-2.5-flash')
-        
-        try:
-            response = model.generate_content(prompt)
-            feedback = response.text.strip()
-        except ResourceExhausted:
-            logger.warning("Gemini API quota exhausted. Waiting for 60 seconds before retrying.")
-            time.sleep(60)
-            # Retry once after waiting
-            response = model.generate_content(prompt)
-            feedback = response.text.strip()
+def generate_ai_feedback(resume_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generates AI-powered feedback using the Google Gemini API.
+    Blocking variant for scripts and batch callers; request handlers use generate_ai_feedback_async.
+    """
+    # Check if the Google API key is configured
+    if not ai_client.enabled:
+        return {"error": "Google API key not configured for AI feedback."}
+
+    try:
+        feedback = ai_client.generate_sync(build_feedback_prompt(resume_data), feature="resume_feedback")
         return {"feedback_summary": feedback}
+    except Exception as e:
+        logger.error(f"An error occurred while generating AI feedback with Gemini: {str(e)}")
+        return {"error": "Could not generate AI feedback at this time."}
 
+async def generate_ai_feedback_async(resume_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Async Gemini feedback through the shared client. The whole attempt, retries included,
+    is bounded by AI_FEEDBACK_RETRY_BUDGET_SECONDS.
+    """
+    if not ai_client.enabled:
+        return {"error": "Google API key not configured for AI feedback."}
+
+    try:
+        feedback = await ai_client.generate(
+            build_feedback_prompt(resume_data),
+            feature="resume_feedback",
+            priority=Priority.INTERACTIVE,
+            budget_seconds=settings.AI_FEEDBACK_RETRY_BUDGET_SECONDS,
+        )
+        return {"feedback_summary": feedback}
     except Exception as e:
         logger.error(f"An error occurred while generating AI feedback with Gemini: {str(e)}")
-        return {"feedback_summary": "Could not generate AI feedback at this time."}
+        return {"error": "Could not generate AI feedback at this time."}
 
-def analyze_resume_against_jd(resume_text: str, job_description: str, candidate_type: str = "experienced") -> Dict[str, Any]:
-    """Main function to orchestrate the entire resume analysis process."""
-    
-    # 1. Extract information from resume
-    candidate_name = extract_name(resume_text)
-    contact_info = extract_contact_info(resume_text)
-    resume_skills = extract_skills(resume_text, SKILLS_LIST)
-    
-    # Extract experience section, including Internships for fresher profiles
-    experience_section = extract_section(resume_text, ["Experience", "Work Experience", "Projects", "Internships"])
-    experience_details = parse_experience(experience_section)
+def extract_resume_profile(
+    resume_text: str,
+    candidate_name: Optional[str] = None,
+    timer: Optional[StageTimer] = None,
+) -> Dict[str, Any]:
+    """
+    Deterministic extraction step: everything that depends only on the resume text.
+    The result does not depend on the job description, so it can be cached by a hash of the text.
+    Pass a StageTimer to get the time spent on NER and on section parsing.
+    """
+    timer = timer or StageTimer()
+    with timer.stage("ner"):
+        if candidate_name is None:
+            candidate_name = extract_name(resume_text)
 
-    # Check for keywords indicating work experience (company names, roles, dates)
-    experience_keywords = re.search(r"(?:(?:(?:[A-Z][a-z]+)\s?){1,2}(?:Inc\.|LLC|Ltd\.)|\b(?:Engineer|Developer|Analyst)\b|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s?\d{4}\s?[-–]\s?(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s?\d{4})", experience_section, re.IGNORECASE)
+    with timer.stage("sections"):
+        contact_info = extract_contact_info(resume_text)
+        resume_skills = extract_skills(resume_text, SKILLS_LIST)
 
-    # Determine candidate type based on experience keywords
-    candidate_type = "experienced" if experience_keywords else "fresher"
+        # Split the resume into typed sections once; every parser works off this structure
+        sections = sectionize(resume_text)
 
-    education_section = extract_section(resume_text, ["Education", "Academic Qualifications"])
-    education_details = parse_education(education_section)
+        # The experience section includes Projects and Internships for fresher profiles
+        experience = sections.get("experience")
+        experience_section = experience.text if experience else ""
+        experience_details = parse_experience(experience)
 
-    certs_section = extract_section(resume_text, ["Certifications", "Licenses & Certifications"])
-    certifications = parse_certifications(certs_section)
-    jd_provided = bool(job_description and job_description.strip())
-    jd_skills = extract_skills(job_description, SKILLS_LIST)
-    ats_results = calculate_ats_score(set(resume_skills), set(jd_skills), candidate_type, education_details, experience_section)
-    
-    # 3. Provide Recommendations
-    suggestions = generate_recommendations(ats_results, jd_provided)
-    summary = generate_summary(candidate_name, ats_results["ATS_score"], resume_skills, jd_provided) # Pass the new ATS results
-    
-    # 4. Compile initial structured data
-    structured_data = {
+        # Check for keywords indicating work experience (company names, roles, dates)
+        experience_keywords = patterns.EXPERIENCE_KEYWORDS_PATTERN.search(experience_section)
+
+        # Determine candidate type based on experience keywords
+        candidate_type = "experienced" if experience_keywords else "fresher"
+
+        education_details = parse_education(sections.get("education"))
+        certifications = parse_certifications(sections.get("certifications"))
+
+    return {
         "candidate_name": candidate_name,
         "contact_info": contact_info,
         "skills_extracted": resume_skills,
@@ -409,14 +449,51 @@ def analyze_resume_against_jd(resume_text: str, job_description: str, candidate_
         "education": education_details,
         "experience": experience_details,
         "certifications": certifications,
+        "experience_section": experience_section,
+    }
+
+def score_resume_profile(profile: Dict[str, Any], job_description: str, jd_skills: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Scores an extracted resume profile against a job description and builds the response data."""
+    resume_skills = profile["skills_extracted"]
+    jd_provided = bool(job_description and job_description.strip())
+    if jd_skills is None:
+        jd_skills = extract_skills(job_description, SKILLS_LIST)
+    ats_results = calculate_ats_score(set(resume_skills), set(jd_skills), profile["candidate_type"], profile["education"], profile["experience_section"])
+    
+    # Provide Recommendations
+    suggestions = generate_recommendations(ats_results, jd_provided)
+    summary = generate_summary(profile["candidate_name"], ats_results["ATS_score"], resume_skills, jd_provided) # Pass the new ATS results
+    
+    # Compile initial structured data
+    structured_data = {key: value for key, value in profile.items() if key != "experience_section"}
+    structured_data.update({
         "ATS_score": ats_results["ATS_score"],
         "missing_skills": ats_results["missing_skills"],
         "improvement_suggestions": suggestions,
         "resume_summary": summary
-    }
+    })
+    return structured_data
+
+def analyze_resume_against_jd(
+    resume_text: str,
+    job_description: str,
+    candidate_type: str = "experienced",
+    candidate_name: Optional[str] = None,
+    jd_skills: Optional[List[str]] = None,
+    include_ai_feedback: bool = True,
+) -> Dict[str, Any]:
+    """
+    Main function to orchestrate the entire resume analysis process.
+    `candidate_name` and `jd_skills` can be passed in when they were already computed for a batch.
+    """
+    # 1. Extract information from resume
+    profile = extract_resume_profile(resume_text, candidate_name)
+
+    # 2. Score against the job description and build recommendations
+    structured_data = score_resume_profile(profile, job_description, jd_skills)
 
-    # 5. Generate AI-powered feedback
-    ai_feedback = generate_ai_feedback(structured_data)
-    structured_data["ai_feedback"] = ai_feedback
+    # 3. Generate AI-powered feedback
+    if include_ai_feedback:
+        structured_data["ai_feedback"] = generate_ai_feedback(structured_data)
 
-    return structured_data
\ No newline at end of file
+    return structured_data
@@ -0,0 +1,107 @@
+import datetime
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from ..core.db import resume_analysis_cache_collection
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# --- Metrics ---
+
+cache_lookups = metrics.counter("resume_cache_lookups_total", "Resume cache lookups by kind and result.")
+
+# Entry kinds: the deterministic extraction of a resume text, AI feedback for a resume + JD pair,
+# and a marker for feedback still being generated (so any worker can report it as pending)
+PROFILE = "profile"
+FEEDBACK = "feedback"
+FEEDBACK_PENDING = "feedback_pending"
+
+
+# --- Keys ---
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_job_description(job_description: str) -> str:
+    """Lowercases and collapses whitespace so formatting-only JD edits share a cache entry."""
+    return " ".join((job_description or "").lower().split())
+
+
+def profile_key(text_hash: str, version: str) -> str:
+    return f"{version}:{text_hash}"
+
+
+def feedback_key(text_hash: str, job_description: str, version: str) -> str:
+    return f"{version}:{text_hash}:{hash_text(normalize_job_description(job_description))}"
+
+
+# --- Cache ---
+
+class ResumeAnalysisCache:
+    """
+    Two-level cache for resume analysis: an in-process LRU in front of a MongoDB
+    collection whose `created_at` TTL index (see main.startup_db_client) expires entries.
+    MongoDB errors are logged and treated as misses so analysis never fails because of the cache.
+    """
+
+    def __init__(self, collection, max_entries: int):
+        self._collection = collection
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _remember(self, cache_id: str, value: Dict[str, Any]) -> None:
+        self._entries[cache_id] = value
+        self._entries.move_to_end(cache_id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, kind: str, key: str, use_memory: bool = True) -> Optional[Dict[str, Any]]:
+        """Looks the entry up in memory, then MongoDB. `use_memory=False` always reads MongoDB."""
+        cache_id = f"{kind}:{key}"
+        if use_memory and cache_id in self._entries:
+            self._entries.move_to_end(cache_id)
+            cache_lookups.inc(kind=kind, result="memory_hit")
+            return self._entries[cache_id]
+
+        try:
+            document = await self._collection.find_one({"_id": cache_id})
+        except Exception as e:
+            logger.warning(f"Resume cache lookup failed for {cache_id}: {e}")
+            document = None
+        if document is None:
+            cache_lookups.inc(kind=kind, result="miss")
+            return None
+
+        cache_lookups.inc(kind=kind, result="mongo_hit")
+        if use_memory:
+            self._remember(cache_id, document["value"])
+        return document["value"]
+
+    async def set(self, kind: str, key: str, value: Dict[str, Any], use_memory: bool = True) -> None:
+        cache_id = f"{kind}:{key}"
+        if use_memory:
+            self._remember(cache_id, value)
+        try:
+            await self._collection.update_one(
+                {"_id": cache_id},
+                {"$set": {"kind": kind, "value": value, "created_at": datetime.datetime.now(datetime.timezone.utc)}},
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"Resume cache write failed for {cache_id}: {e}")
+
+    async def delete(self, kind: str, key: str) -> None:
+        cache_id = f"{kind}:{key}"
+        self._entries.pop(cache_id, None)
+        try:
+            await self._collection.delete_one({"_id": cache_id})
+        except Exception as e:
+            logger.warning(f"Resume cache delete failed for {cache_id}: {e}")
+
+
+resume_cache = ResumeAnalysisCache(resume_analysis_cache_collection, settings.RESUME_CACHE_MAX_ENTRIES)
@@ -0,0 +1,53 @@
+import re
+from typing import Dict
+
+# --- Precompiled patterns for the resume analyzer ---
+# Every regex used while analyzing a resume is compiled here once at import time,
+# instead of being compiled (or looked up in re's small cache) on every call.
+
+# Contact details
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})')
+
+# "Firstname Lastname" at the very start of the resume, used as a name fallback
+LEADING_NAME_PATTERN = re.compile(r"^\s*([A-Z][a-z]+(?: [A-Z][a-z]+){1,2})")
+
+# Education entries
+GRADUATION_YEAR_PATTERN = re.compile(r'\b(20\d{2})\b')
+INSTITUTION_PATTERN = re.compile(r'([A-Z][\w\s]+(?:University|College|School))', re.IGNORECASE)
+
+# Experience entries
+ENTRY_SEPARATOR_PATTERN = re.compile(r'\n\s*\n')
+DURATION_PATTERN = re.compile(r'(\w+\s?\d{4}\s*[-–to]+\s*(?:\w+\s?\d{4}|Present|Current))', re.IGNORECASE)
+
+# Signals of real work experience (company suffixes, job titles, month-year date ranges)
+EXPERIENCE_KEYWORDS_PATTERN = re.compile(
+    r"(?:(?:(?:[A-Z][a-z]+)\s?){1,2}(?:Inc\.|LLC|Ltd\.)"
+    r"|\b(?:Engineer|Developer|Analyst)\b"
+    r"|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s?\d{4}\s?[-–]\s?(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s?\d{4})",
+    re.IGNORECASE,
+)
+
+# Section headers, mapped to the section kind they open. Spellings that share a kind
+# (e.g. "Experience" followed by "Projects") are merged into one contiguous section.
+SECTION_KINDS: Dict[str, str] = {
+    "work experience": "experience",
+    "experience": "experience",
+    "projects": "experience",
+    "internships": "experience",
+    "academic qualifications": "education",
+    "education": "education",
+    "licenses & certifications": "certifications",
+    "certifications": "certifications",
+    "skills": "skills",
+    "summary": "summary",
+    "objective": "objective",
+    "awards": "awards",
+    "publications": "publications",
+}
+
+# Longest spellings first so "work experience" wins over "experience"
+SECTION_HEADER_PATTERN = re.compile(
+    "|".join(re.escape(header) for header in sorted(SECTION_KINDS, key=len, reverse=True)),
+    re.IGNORECASE,
+)
@@ -0,0 +1,437 @@
+import asyncio
+import logging
+import os
+import time
+import zipfile
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.metrics import StageTimer, metrics
+from . import resume_analyzer, resume_cache
+from .document_extraction import (
+    DocumentExtractionError,
+    DocumentTooLargeError,
+    StagedDocument,
+    extract_text,
+    stage_stream,
+)
+from .resume_pool import resume_pool
+
+logger = logging.getLogger(__name__)
+
+# --- Metrics ---
+
+stage_seconds = metrics.histogram("resume_stage_seconds", "Time spent per resume analysis stage.")
+feedback_deferred = metrics.counter(
+    "resume_feedback_deferred_total", "Resume analyses returned with AI feedback still pending."
+)
+
+# --- Zip Archives ---
+
+def read_zip_archive(path: str, max_files: int, max_total_bytes: int) -> List[StagedDocument]:
+    """
+    Stages each resume in a zip archive to its own temporary file, enforcing file-count
+    and uncompressed-size limits on the bytes actually read rather than the archive headers.
+    """
+    try:
+        archive = zipfile.ZipFile(path)
+    except zipfile.BadZipFile as e:
+        raise DocumentExtractionError(f"Invalid zip archive: {e}")
+
+    documents: List[StagedDocument] = []
+    total_bytes = 0
+    try:
+        with archive:
+            for info in archive.infolist():
+                name = os.path.basename(info.filename)
+                if info.is_dir() or not name or info.filename.startswith("__MACOSX/") or name.startswith("."):
+                    continue
+                if len(documents) >= max_files:
+                    raise DocumentExtractionError(f"Too many files in archive (limit is {max_files}).")
+                remaining = max_total_bytes - total_bytes
+                if remaining <= 0:
+                    raise DocumentTooLargeError("Archive is too large once uncompressed.")
+                with archive.open(info) as member:
+                    document = stage_stream(member, name, min(settings.RESUME_MAX_UPLOAD_BYTES, remaining))
+                documents.append(document)
+                total_bytes += document.size
+    except Exception:
+        for document in documents:
+            document.cleanup()
+        raise
+    return documents
+
+
+# --- Worker Entry Points ---
+
+def extract_document_text(path: str, document_type: Optional[str]) -> Tuple[str, Dict[str, float]]:
+    """
+    Extracts resume text from a staged file. Runs in a process-pool worker, so it must stay
+    picklable; stage timings are returned alongside the result because the worker's own
+    StageTimer does not cross the process boundary.
+    """
+    timer = StageTimer()
+    with timer.stage("extract"):
+        resume_text = extract_text(path, document_type)
+    if not resume_text.strip():
+        raise DocumentExtractionError("Could not extract text from the resume. The file might be empty or image-based.")
+    return resume_text, timer.timings
+
+
+def extract_profile(resume_text: str) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Builds the JD-independent resume profile in a process-pool worker."""
+    timer = StageTimer()
+    profile = resume_analyzer.extract_resume_profile(resume_text, timer=timer)
+    return profile, timer.timings
+
+
+def extract_profiles(resume_texts: List[str]) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+    """
+    Builds profiles for a chunk of resumes in one pool task, so candidate names come from
+    batched spaCy and NER passes instead of one forward pass per resume.
+    """
+    timer = StageTimer()
+    with timer.stage("ner"):
+        candidate_names = resume_analyzer.extract_names_batch(resume_texts)
+    profiles = [
+        resume_analyzer.extract_resume_profile(resume_text, candidate_name=candidate_name, timer=timer)
+        for resume_text, candidate_name in zip(resume_texts, candidate_names)
+    ]
+    return profiles, timer.timings
+
+
+# --- Profile Micro-Batching ---
+
+class ProfileBatcher:
+    """
+    Coalesces profile extraction for concurrent single-resume requests. The first request
+    waits up to `max_wait_seconds` for others (or until `max_batch_size` are queued), then the
+    batch runs as one extract_profiles pool task and each request gets its own profile back.
+    The stage timings returned to each request cover the whole batch.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_seconds: float):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max(0.0, max_wait_seconds)
+        self._pending: List[Tuple[str, "asyncio.Future[Tuple[Dict[str, Any], Dict[str, float]]]"]] = []
+        # A batch only waits for a pool slot when every request in it would have
+        self._pending_wait = True
+        self._timer: Optional[asyncio.Task] = None
+
+    async def extract(self, resume_text: str, wait: bool = False) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        if self.max_batch_size == 1 or self.max_wait_seconds == 0:
+            return await resume_pool.run(extract_profile, resume_text, wait=wait)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((resume_text, future))
+        self._pending_wait = self._pending_wait and wait
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._dispatch_after_wait())
+        return await future
+
+    async def _dispatch_after_wait(self) -> None:
+        await asyncio.sleep(self.max_wait_seconds)
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, wait = self._pending, self._pending_wait
+        self._pending, self._pending_wait = [], True
+        if batch:
+            asyncio.create_task(self._run(batch, wait))
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]], wait: bool) -> None:
+        try:
+            profiles, timings = await resume_pool.run(extract_profiles, [text for text, _ in batch], wait=wait)
+            if len(profiles) != len(batch):
+                raise RuntimeError(f"extract_profiles returned {len(profiles)} profiles for {len(batch)} resumes.")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), profile in zip(batch, profiles):
+            # A request that was cancelled while waiting no longer needs its profile
+            if not future.done():
+                future.set_result((profile, timings))
+
+
+profile_batcher = ProfileBatcher(settings.NER_BATCH_SIZE, settings.NER_BATCH_MAX_WAIT_MS / 1000)
+
+
+# --- Deferred AI Feedback ---
+# Feedback runs as a background task keyed by its cache key. Requests wait for it up to a
+# deadline; past that they return a "pending" marker and the client fetches the result later
+# through get_feedback, once the task has stored it in the resume cache. While the task runs, a
+# FEEDBACK_PENDING entry in the shared cache lets a poll that lands on another worker see it.
+
+_feedback_tasks: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+
+async def _generate_and_cache_feedback(feedback_key: str, structured_data: Dict[str, Any]) -> Dict[str, Any]:
+    # Kept out of the in-process LRU, so other workers' polls always see its current state
+    await resume_cache.resume_cache.set(
+        resume_cache.FEEDBACK_PENDING, feedback_key, {"started_at": time.time()}, use_memory=False
+    )
+    try:
+        ai_feedback = await resume_analyzer.generate_ai_feedback_async(structured_data)
+        if "error" not in ai_feedback:
+            await resume_cache.resume_cache.set(resume_cache.FEEDBACK, feedback_key, ai_feedback)
+        return ai_feedback
+    finally:
+        await resume_cache.resume_cache.delete(resume_cache.FEEDBACK_PENDING, feedback_key)
+
+
+def _feedback_task(feedback_key: str, structured_data: Dict[str, Any]) -> "asyncio.Task[Dict[str, Any]]":
+    """Starts feedback generation, or joins the task already running for the same resume and JD."""
+    task = _feedback_tasks.get(feedback_key)
+    if task is None:
+        task = asyncio.create_task(_generate_and_cache_feedback(feedback_key, structured_data))
+        _feedback_tasks[feedback_key] = task
+        task.add_done_callback(lambda _: _feedback_tasks.pop(feedback_key, None))
+    return task
+
+
+def pending_feedback(feedback_key: str) -> Dict[str, Any]:
+    return {
+        "status": "pending",
+        "feedback_id": feedback_key,
+        "feedback_summary": "AI feedback is still being generated. Check back shortly.",
+    }
+
+
+async def await_feedback(feedback_key: str, structured_data: Dict[str, Any], deadline: float) -> Dict[str, Any]:
+    """Waits up to `deadline` seconds for AI feedback; the task keeps running in the background afterwards."""
+    task = _feedback_task(feedback_key, structured_data)
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), deadline)
+    except asyncio.TimeoutError:
+        feedback_deferred.inc()
+        return pending_feedback(feedback_key)
+
+
+async def get_feedback(feedback_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the feedback for a pending id once it is ready, or the pending marker while it is
+    still being generated. Returns None for unknown ids and for feedback that failed to generate.
+    """
+    ai_feedback = await resume_cache.resume_cache.get(resume_cache.FEEDBACK, feedback_id)
+    if ai_feedback is not None:
+        return {"status": "ready", **ai_feedback}
+    if feedback_id in _feedback_tasks:
+        return pending_feedback(feedback_id)
+    # Generation may be running on another worker. A marker older than the retry budget was
+    # left by a worker that died mid-generation.
+    marker = await resume_cache.resume_cache.get(resume_cache.FEEDBACK_PENDING, feedback_id, use_memory=False)
+    if marker is not None and time.time() - marker.get("started_at", 0) < 2 * settings.AI_FEEDBACK_RETRY_BUDGET_SECONDS:
+        return pending_feedback(feedback_id)
+    return None
+
+
+# --- Cached Analysis ---
+
+async def analyze_resume_text(
+    resume_text: str,
+    job_description: str,
+    jd_skills: Optional[List[str]] = None,
+    include_ai_feedback: bool = True,
+    wait: bool = False,
+    timer: Optional[StageTimer] = None,
+) -> Dict[str, Any]:
+    """
+    Analyzes extracted resume text, reusing cached work where possible.
+    The JD-independent profile is cached by a hash of the text, and AI feedback by the
+    text hash plus a normalized JD hash, so editing the JD only recomputes scoring and feedback.
+    Stages that actually ran are recorded on `timer`.
+    """
+    timer = timer or StageTimer()
+    text_hash = resume_cache.hash_text(resume_text)
+
+    profile_key = resume_cache.profile_key(text_hash, resume_analyzer.ANALYZER_VERSION)
+    profile = await resume_cache.resume_cache.get(resume_cache.PROFILE, profile_key)
+    if profile is None:
+        profile, profile_timings = await profile_batcher.extract(resume_text, wait=wait)
+        timer.merge(profile_timings)
+        await resume_cache.resume_cache.set(resume_cache.PROFILE, profile_key, profile)
+
+    return await _score_profile(profile, text_hash, job_description, jd_skills, include_ai_feedback, timer)
+
+
+async def _score_profile(
+    profile: Dict[str, Any],
+    text_hash: str,
+    job_description: str,
+    jd_skills: Optional[List[str]],
+    include_ai_feedback: bool,
+    timer: StageTimer,
+) -> Dict[str, Any]:
+    """Scores a resume profile against the JD and attaches cached or freshly generated AI feedback."""
+    with timer.stage("ats"):
+        structured_data = resume_analyzer.score_resume_profile(profile, job_description, jd_skills)
+    if not include_ai_feedback:
+        return structured_data
+
+    feedback_key = resume_cache.feedback_key(text_hash, job_description, resume_analyzer.ANALYZER_VERSION)
+    ai_feedback = await resume_cache.resume_cache.get(resume_cache.FEEDBACK, feedback_key)
+    if ai_feedback is None:
+        with timer.stage("ai_feedback"):
+            ai_feedback = await await_feedback(feedback_key, structured_data, settings.AI_FEEDBACK_DEADLINE_SECONDS)
+    structured_data["ai_feedback"] = ai_feedback
+    return structured_data
+
+
+async def analyze_staged_document(
+    document: StagedDocument,
+    job_description: str,
+    jd_skills: Optional[List[str]] = None,
+    include_ai_feedback: bool = True,
+    wait: bool = False,
+    debug: bool = False,
+) -> Dict[str, Any]:
+    """
+    Extracts text from a staged PDF/DOCX in the process pool and analyzes it.
+    Per-stage timings are always recorded as metrics and, with `debug`, returned under "timings" (ms).
+    """
+    timer = StageTimer()
+    resume_text, extract_timings = await resume_pool.run(
+        extract_document_text, document.path, document.document_type, wait=wait
+    )
+    timer.merge(extract_timings)
+    analysis = await analyze_resume_text(resume_text, job_description, jd_skills, include_ai_feedback, wait, timer)
+
+    timer.observe(stage_seconds)
+    if debug:
+        analysis["timings"] = timer.as_milliseconds()
+    return analysis
+
+
+# --- Bulk Screening ---
+
+async def screen_resumes(
+    documents: List[StagedDocument],
+    job_description: str,
+    include_ai_feedback: bool = False,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Analyzes many resumes against one job description across the process pool.
+    Resumes are screened in chunks of NER_BATCH_SIZE so profile extraction runs as one
+    batched NER pool task per chunk. Yields one record per resume as its chunk finishes
+    (errors are isolated per file), followed by a summary record that ranks the successful
+    resumes by ATS score.
+    """
+    jd_skills = resume_analyzer.extract_skills(job_description)
+    # A bulk run holds at most one pool slot per worker, leaving the rest of the queue to interactive requests
+    bulk_slots = asyncio.Semaphore(resume_pool.max_workers)
+
+    def error_record(document: StagedDocument, e: Exception) -> Dict[str, Any]:
+        logger.warning(f"Bulk screening failed for {document.filename}: {e}")
+        return {"type": "error", "filename": document.filename, "error": str(e)}
+
+    async def extract_one(document: StagedDocument) -> Tuple[str, Dict[str, float]]:
+        try:
+            async with bulk_slots:
+                return await resume_pool.run(
+                    extract_document_text, document.path, document.document_type, wait=True
+                )
+        finally:
+            document.cleanup()
+
+    async def screen_chunk(chunk: List[StagedDocument]) -> List[Dict[str, Any]]:
+        extracted = await asyncio.gather(*(extract_one(document) for document in chunk), return_exceptions=True)
+
+        records: Dict[int, Dict[str, Any]] = {}
+        timers: Dict[int, StageTimer] = {}
+        texts: Dict[int, str] = {}
+        for i, (document, outcome) in enumerate(zip(chunk, extracted)):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            if isinstance(outcome, Exception):
+                records[i] = error_record(document, outcome)
+                continue
+            texts[i], extract_timings = outcome
+            timers[i] = StageTimer()
+            timers[i].merge(extract_timings)
+
+        # Only resumes without a cached profile go through the batched NER task
+        text_hashes = {i: resume_cache.hash_text(text) for i, text in texts.items()}
+        profile_keys = {
+            i: resume_cache.profile_key(text_hash, resume_analyzer.ANALYZER_VERSION)
+            for i, text_hash in text_hashes.items()
+        }
+        profiles: Dict[int, Dict[str, Any]] = {}
+        for i, profile_key in profile_keys.items():
+            profile = await resume_cache.resume_cache.get(resume_cache.PROFILE, profile_key)
+            if profile is not None:
+                profiles[i] = profile
+        misses = [i for i in texts if i not in profiles]
+        if misses:
+            try:
+                async with bulk_slots:
+                    batch_profiles, profile_timings = await resume_pool.run(
+                        extract_profiles, [texts[i] for i in misses], wait=True
+                    )
+            except Exception as e:
+                for i in misses:
+                    records[i] = error_record(chunk[i], e)
+            else:
+                # Batch timings cover the whole chunk, so they are recorded once rather than per resume
+                chunk_timer = StageTimer()
+                chunk_timer.merge(profile_timings)
+                chunk_timer.observe(stage_seconds)
+                for i, profile in zip(misses, batch_profiles):
+                    profiles[i] = profile
+                    await resume_cache.resume_cache.set(resume_cache.PROFILE, profile_keys[i], profile)
+
+        for i, profile in profiles.items():
+            try:
+                analysis = await _score_profile(
+                    profile, text_hashes[i], job_description, jd_skills, include_ai_feedback, timers[i]
+                )
+            except Exception as e:
+                records[i] = error_record(chunk[i], e)
+                continue
+            timers[i].observe(stage_seconds)
+            records[i] = {"type": "result", "filename": chunk[i].filename, "analysis": analysis}
+        return [records[i] for i in sorted(records)]
+
+    chunk_size = settings.NER_BATCH_SIZE
+    chunks = [documents[start:start + chunk_size] for start in range(0, len(documents), chunk_size)]
+    tasks = [asyncio.ensure_future(screen_chunk(chunk)) for chunk in chunks]
+    ranking = []
+    failed = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for record in await next_done:
+                if record["type"] == "result":
+                    analysis = record["analysis"]
+                    ranking.append({
+                        "filename": record["filename"],
+                        "candidate_name": analysis.get("candidate_name"),
+                        "ATS_score": analysis.get("ATS_score", 0),
+                    })
+                else:
+                    failed += 1
+                yield record
+    finally:
+        # Stop queued work if the client goes away mid-stream
+        for task in tasks:
+            task.cancel()
+        for document in documents:
+            document.cleanup()
+
+    ranking.sort(key=lambda entry: entry["ATS_score"], reverse=True)
+    for position, entry in enumerate(ranking, start=1):
+        entry["rank"] = position
+    yield {
+        "type": "summary",
+        "total": len(documents),
+        "succeeded": len(ranking),
+        "failed": failed,
+        "jd_skills": jd_skills,
+        "ranking": ranking,
+    }
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# --- Metrics ---
+
+pool_in_flight = metrics.gauge("resume_pool_in_flight", "Resume tasks queued or running in the process pool.")
+pool_rejected = metrics.counter("resume_pool_rejected_total", "Resume tasks rejected because the pool was saturated.")
+pool_queue_seconds = metrics.histogram("resume_pool_queue_seconds", "Time resume tasks waited for a pool worker.")
+pool_task_seconds = metrics.histogram("resume_pool_task_seconds", "Time resume tasks spent running in a pool worker.")
+
+
+class PoolSaturatedError(Exception):
+    """Raised when the resume pool already has its maximum number of pending tasks."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Resume analysis is at capacity. Please retry shortly.")
+        self.retry_after = retry_after
+
+
+# --- Worker Process Functions ---
+
+def _init_worker() -> None:
+    """Loads the NLP models once per worker process, before it accepts any task."""
+    from . import resume_analyzer
+
+    try:
+        resume_analyzer.warm_up_models()
+    except Exception as e:
+        logger.error(f"Resume pool worker {os.getpid()} could not preload models: {e}")
+
+
+def _timed_call(fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[Any, float, float]:
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return result, started, time.time() - started
+
+
+# How long a warm-up task waits for the other workers to pick up theirs
+WARM_UP_BARRIER_SECONDS = 120.0
+
+
+def _worker_model_stats(barrier: Any = None) -> Dict[str, Any]:
+    from . import resume_analyzer
+
+    stats = {"pid": os.getpid(), "models": resume_analyzer.warm_up_models()}
+    if barrier is not None:
+        # A worker holding a warm-up task cannot take another one, so once every task has passed
+        # the barrier each worker process has run exactly one of them
+        try:
+            barrier.wait(WARM_UP_BARRIER_SECONDS)
+        except threading.BrokenBarrierError:
+            logger.warning(f"Resume pool worker {os.getpid()} warmed up without the other workers.")
+    return stats
+
+
+# --- Resume Process Pool ---
+
+class ResumeProcessPool:
+    """
+    A size-bounded process pool for CPU-bound resume work (PDF parsing, NER, regex passes).
+
+    At most `max_pending` tasks may be queued or running. Interactive callers are
+    rejected with PoolSaturatedError beyond that, so the API can answer 503 instead
+    of letting latency grow without bound, while batch callers may wait for a slot.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, retry_after_seconds: int):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.retry_after_seconds = retry_after_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # "spawn" avoids forking a process that already runs an event loop and worker threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    async def run(self, fn: Callable[..., Any], *args: Any, wait: bool = False, **kwargs: Any) -> Any:
+        """
+        Runs `fn(*args, **kwargs)` in a worker process.
+        With `wait=False` a saturated pool raises PoolSaturatedError instead of queueing.
+        """
+        slots = self._get_slots()
+        if slots.locked() and not wait:
+            pool_rejected.inc()
+            raise PoolSaturatedError(self.retry_after_seconds)
+
+        async with slots:
+            self._in_flight += 1
+            pool_in_flight.set(self._in_flight)
+            submitted = time.time()
+            try:
+                loop = asyncio.get_running_loop()
+                result, started, duration = await loop.run_in_executor(
+                    self._get_executor(), _timed_call, fn, args, kwargs
+                )
+            finally:
+                self._in_flight -= 1
+                pool_in_flight.set(self._in_flight)
+
+        pool_queue_seconds.observe(max(started - submitted, 0.0))
+        pool_task_seconds.observe(duration)
+        return result
+
+    async def warm_up(self) -> List[Dict[str, Any]]:
+        """Starts every worker process and returns the model stats reported by each one."""
+        manager = await asyncio.to_thread(multiprocessing.get_context("spawn").Manager)
+        try:
+            barrier = manager.Barrier(self.max_workers)
+            return await asyncio.gather(
+                *[self.run(_worker_model_stats, barrier, wait=True) for _ in range(self.max_workers)]
+            )
+        finally:
+            manager.shutdown()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+resume_pool = ResumeProcessPool(
+    max_workers=settings.RESUME_POOL_WORKERS,
+    max_pending=settings.RESUME_POOL_MAX_PENDING,
+    retry_after_seconds=settings.RESUME_POOL_RETRY_AFTER_SECONDS,
+)
@@ -0,0 +1,78 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .resume_patterns import SECTION_HEADER_PATTERN, SECTION_KINDS
+
+# --- Constants ---
+
+PREAMBLE = "preamble"
+
+# Headers are short lines; longer lines that merely mention "experience" are body text
+MAX_HEADER_LENGTH = 30
+
+
+# --- Data Structures ---
+
+@dataclass
+class Section:
+    kind: str
+    header: str
+    start: int
+    end: int
+    lines: List[str] = field(default_factory=list)
+
+    @property
+    def body(self) -> str:
+        return "\n".join(self.lines)
+
+    @property
+    def text(self) -> str:
+        """The section as it appears in the resume, header line included."""
+        return "\n".join([self.header] + self.lines) if self.header else self.body
+
+
+@dataclass
+class SectionedResume:
+    sections: List[Section]
+
+    def get(self, kind: str) -> Optional[Section]:
+        """Returns the first section of the given kind, or None if the resume has none."""
+        for section in self.sections:
+            if section.kind == kind:
+                return section
+        return None
+
+
+# --- Sectionizer ---
+
+def header_kind(line: str) -> Optional[str]:
+    """Returns the section kind if the line looks like a section header."""
+    stripped = line.strip()
+    if not stripped or len(stripped) >= MAX_HEADER_LENGTH:
+        return None
+    match = SECTION_HEADER_PATTERN.search(stripped)
+    return SECTION_KINDS[match.group(0).lower()] if match else None
+
+
+def sectionize(text: str) -> SectionedResume:
+    """
+    Splits resume text into typed sections in a single pass over its lines.
+    Text before the first header becomes a "preamble" section.
+    """
+    sections: List[Section] = []
+    current = Section(kind=PREAMBLE, header="", start=0, end=0)
+    offset = 0
+    for line in text.split("\n"):
+        kind = header_kind(line)
+        if kind is not None and kind != current.kind:
+            current.end = offset
+            if current.lines or current.header:
+                sections.append(current)
+            current = Section(kind=kind, header=line, start=offset, end=offset)
+        else:
+            current.lines.append(line)
+        offset += len(line) + 1
+    current.end = len(text)
+    if current.lines or current.header:
+        sections.append(current)
+    return SectionedResume(sections)
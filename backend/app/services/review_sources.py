@@ -0,0 +1,182 @@
+import asyncio
+import importlib.util
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ..core.config import settings
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# --- Metrics ---
+
+source_requests = metrics.counter("review_source_requests_total", "Review source fetches by source and outcome.")
+source_seconds = metrics.histogram("review_source_seconds", "Review source fetch latency, by source.")
+circuit_open = metrics.gauge("review_source_circuit_open", "1 while a review source's circuit breaker is open.")
+
+# HTTP/2 needs the optional `h2` package (httpx[http2]); without it the client falls back to HTTP/1.1 keep-alive
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class SourceUnavailable(RuntimeError):
+    """A review source failed, timed out, or is being skipped while its circuit is open."""
+
+
+# --- Circuit Breaker ---
+
+class CircuitBreaker:
+    """
+    Stops calling a source after `failure_threshold` consecutive failures. Once
+    `reset_seconds` have passed, one trial request is let through (half-open): success
+    closes the circuit, failure opens it again. Must be used from a single event loop.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """Frees the half-open trial slot when the trial ended without an outcome (e.g. it was cancelled)."""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        circuit_open.set(0, source=self.name)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.warning(f"Circuit opened for review source {self.name} after {self.failures} failures.")
+            self._opened_at = time.monotonic()
+            circuit_open.set(1, source=self.name)
+
+
+# --- Shared HTTP Client ---
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def http_client() -> httpx.AsyncClient:
+    """The pooled client shared by every review source, created on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=settings.REVIEW_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.REVIEW_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=settings.REVIEW_HTTP_KEEPALIVE_SECONDS,
+            ),
+            headers={"User-Agent": settings.REDDIT_USER_AGENT or "API-Client"},
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# --- Sources ---
+
+class ReviewSource:
+    """One upstream JSON API with its own timeout and circuit breaker."""
+
+    def __init__(self, name: str, base_url: str, timeout: float):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(
+            name, settings.REVIEW_SOURCE_BREAKER_FAILURES, settings.REVIEW_SOURCE_BREAKER_RESET_SECONDS
+        )
+
+    async def get_json(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        trial = self.breaker.state == "half-open"
+        if not self.breaker.allow():
+            source_requests.inc(source=self.name, outcome="circuit_open")
+            raise SourceUnavailable(f"{self.name} is temporarily disabled after repeated failures.")
+
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                http_client().get(f"{self.base_url}{path}", params=params), self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            self.breaker.record_failure()
+            source_requests.inc(source=self.name, outcome="timeout")
+            raise SourceUnavailable(f"{self.name} did not respond within {self.timeout:.0f}s.")
+        except (httpx.HTTPError, ValueError) as e:
+            self.breaker.record_failure()
+            source_requests.inc(source=self.name, outcome="error")
+            raise SourceUnavailable(f"{self.name} request failed: {e}")
+        finally:
+            source_seconds.observe(time.perf_counter() - started, source=self.name)
+            if trial:
+                # A cancelled or unexpectedly failing trial must not keep the circuit from ever closing
+                self.breaker.release_trial()
+
+        self.breaker.record_success()
+        source_requests.inc(source=self.name, outcome="ok")
+        return data
+
+
+serpapi_source = ReviewSource("serpapi", settings.SERPAPI_BASE_URL, settings.SERPAPI_TIMEOUT_SECONDS)
+reddit_source = ReviewSource("reddit", settings.REDDIT_BASE_URL, settings.REDDIT_TIMEOUT_SECONDS)
+
+
+async def fetch_serpapi_snippets(query: str, limit: int = 3) -> List[str]:
+    """Google organic result snippets for `query`, via SerpAPI's JSON endpoint."""
+    data = await serpapi_source.get_json(
+        "/search.json", {"engine": "google", "q": query, "api_key": settings.SERPAPI_API_KEY}
+    )
+    return [result.get("snippet", "") for result in data.get("organic_results", [])[:limit]]
+
+
+async def fetch_reddit_posts(query: str, limit: int = 5) -> List[str]:
+    """Self-text of the most relevant Reddit posts for `query`."""
+    data = await reddit_source.get_json(
+        "/search.json", {"q": query, "sort": "relevance", "t": "all", "limit": limit}
+    )
+    return [post.get("data", {}).get("selftext", "") for post in data.get("data", {}).get("children", [])]
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "http2": HTTP2_AVAILABLE,
+        "sources": {
+            source.name: {"state": source.breaker.state, "consecutive_failures": source.breaker.failures}
+            for source in (serpapi_source, reddit_source)
+        },
+    }
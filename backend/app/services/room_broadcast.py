@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# --- Metrics ---
+
+membership_changes = metrics.counter("gd_membership_changes_total", "GD room joins and leaves seen by the broadcast coalescer.")
+updates_sent = metrics.counter("gd_participant_updates_total", "participant_update broadcasts actually sent.")
+messages_saved = metrics.counter(
+    "gd_participant_update_messages_saved_total",
+    "Per-recipient participant_update messages avoided by coalescing (vs. one broadcast per change).",
+)
+
+Emit = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+@dataclass
+class _PendingUpdate:
+    joined: List[str] = field(default_factory=list)
+    left: List[str] = field(default_factory=list)
+    count: int = 0
+    changes: int = 0
+    task: Optional["asyncio.Task[None]"] = None
+
+
+class ParticipantUpdateCoalescer:
+    """
+    Debounces a room's membership changes over `window_seconds` and broadcasts them as one
+    delta-encoded participant_update: {"count", "joined": [sid, ...], "left": [sid, ...]}.
+    A sid that joins and leaves within the same window appears in neither list.
+    """
+
+    def __init__(self, emit: Emit, window_seconds: float):
+        self._emit = emit
+        self.window_seconds = window_seconds
+        self._pending: Dict[str, _PendingUpdate] = {}
+
+    def _record(self, room_id: str, count: int) -> _PendingUpdate:
+        membership_changes.inc()
+        pending = self._pending.get(room_id)
+        if pending is None:
+            pending = self._pending[room_id] = _PendingUpdate()
+            pending.task = asyncio.create_task(self._flush_later(room_id))
+        pending.count = count
+        pending.changes += 1
+        return pending
+
+    def joined(self, room_id: str, sid: str, count: int) -> None:
+        pending = self._record(room_id, count)
+        if sid in pending.left:
+            pending.left.remove(sid)
+        elif sid not in pending.joined:
+            pending.joined.append(sid)
+
+    def left(self, room_id: str, sid: str, count: int) -> None:
+        pending = self._record(room_id, count)
+        if sid in pending.joined:
+            pending.joined.remove(sid)
+        elif sid not in pending.left:
+            pending.left.append(sid)
+
+    async def _flush_later(self, room_id: str) -> None:
+        await asyncio.sleep(self.window_seconds)
+        await self.flush(room_id, cancel_timer=False)
+
+    async def flush(self, room_id: str, cancel_timer: bool = True) -> None:
+        """Sends the room's pending update now (e.g. right before gd_started)."""
+        pending = self._pending.pop(room_id, None)
+        if pending is None:
+            return
+        if cancel_timer and pending.task is not None:
+            pending.task.cancel()
+        recipients = max(pending.count, 1)
+        if not pending.joined and not pending.left:
+            # The changes cancelled out (e.g. a quick reconnect): nothing to send
+            messages_saved.inc(pending.changes * recipients)
+            return
+        updates_sent.inc()
+        # Every change would have been broadcast to roughly the whole room
+        messages_saved.inc((pending.changes - 1) * recipients)
+        try:
+            await self._emit(room_id, {"count": pending.count, "joined": pending.joined, "left": pending.left})
+        except Exception as e:
+            logger.warning(f"Could not send participant_update for room {room_id}: {e}")
@@ -0,0 +1,332 @@
+import copy
+import datetime
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Set
+
+from pymongo import ReturnDocument
+
+from ..core.config import settings
+from ..core.db import room_collection
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# --- Metrics ---
+
+live_rooms = metrics.gauge("gd_rooms_live", "GD rooms currently held by the room store.")
+live_participants = metrics.gauge("gd_room_participants", "Participants across all live GD rooms.")
+rooms_removed = metrics.counter("gd_rooms_removed_total", "GD rooms removed by the sweeper, by reason (empty, idle).")
+
+# --- Room States ---
+
+WAITING = "waiting"
+STARTING = "starting"
+IN_PROGRESS = "in_progress"
+
+Room = Dict[str, Any]
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+# --- Room Stores ---
+
+class RoomStore(ABC):
+    """
+    Group discussion room state. Every mutation is atomic and returns the room as it is
+    after the change, so handlers never act on a read that another worker has since changed.
+    Rooms look like {"room_id", "name", "required_participants", "difficulty",
+    "participants": [sid, ...], "status", "topic", "created_at", "updated_at", "emptied_at"}.
+    """
+
+    @abstractmethod
+    async def create(self, room_id: str, **fields: Any) -> Room:
+        ...
+
+    @abstractmethod
+    async def get(self, room_id: str) -> Optional[Room]:
+        ...
+
+    @abstractmethod
+    async def join(self, room_id: str, sid: str, defaults: Optional[Dict[str, Any]] = None) -> Optional[Room]:
+        """
+        Adds `sid` to the room's participants. Returns None if the room does not exist,
+        unless `defaults` is given, in which case the room is created with them.
+        """
+        ...
+
+    @abstractmethod
+    async def leave(self, room_id: str, sid: str) -> Optional[Room]:
+        ...
+
+    @abstractmethod
+    async def transition(self, room_id: str, expected: str, status: str, **fields: Any) -> Optional[Room]:
+        """
+        Compare-and-set on the room status: moves it from `expected` to `status` (setting
+        `fields` too) and returns the room, or returns None if the status was not `expected`.
+        """
+        ...
+
+    @abstractmethod
+    async def rooms_for(self, sid: str) -> List[str]:
+        """Ids of the rooms `sid` is a participant of."""
+        ...
+
+    @abstractmethod
+    async def delete(self, room_id: str) -> None:
+        ...
+
+    @abstractmethod
+    async def sweep(self, empty_grace_seconds: float, waiting_ttl_seconds: float) -> List[str]:
+        """
+        Removes rooms that have been empty for `empty_grace_seconds`, and rooms still waiting
+        with no join or leave for `waiting_ttl_seconds`. Returns the removed room ids.
+        """
+        ...
+
+    @abstractmethod
+    async def counts(self) -> Dict[str, int]:
+        """Live room and participant counts (also published as gauges)."""
+        ...
+
+
+def _new_room(room_id: str, fields: Dict[str, Any]) -> Room:
+    room = {
+        "room_id": room_id,
+        "name": room_id,
+        "required_participants": 1,
+        "difficulty": None,
+        "status": WAITING,
+        "topic": None,
+        "created_at": _now(),
+    }
+    room.update(fields)
+    room["participants"] = list(room.get("participants", []))
+    room["updated_at"] = room["created_at"]
+    # Rooms created before anyone joins count as empty from the start
+    room["emptied_at"] = None if room["participants"] else room["created_at"]
+    return room
+
+
+class MemoryRoomStore(RoomStore):
+    """
+    Rooms in a dict in this process, with a reverse index from sid to room ids so a
+    disconnect touches only that sid's rooms. Operations never await between reading and
+    writing, which makes them atomic on the event loop. Only valid with a single worker.
+    """
+
+    def __init__(self):
+        self._rooms: Dict[str, Room] = {}
+        self._sid_rooms: Dict[str, Set[str]] = {}
+        self._participants = 0
+
+    @staticmethod
+    def _view(room: Optional[Room]) -> Optional[Room]:
+        # Callers get a copy, as they would from MongoDB
+        return copy.deepcopy(room) if room is not None else None
+
+    def _publish(self) -> None:
+        live_rooms.set(len(self._rooms))
+        live_participants.set(self._participants)
+
+    def _add_participant(self, room: Room, sid: str) -> None:
+        if sid in room["participants"]:
+            return
+        room["participants"].append(sid)
+        room["updated_at"], room["emptied_at"] = _now(), None
+        self._sid_rooms.setdefault(sid, set()).add(room["room_id"])
+        self._participants += 1
+
+    def _remove_participant(self, room: Room, sid: str) -> None:
+        if sid not in room["participants"]:
+            return
+        room["participants"].remove(sid)
+        room["updated_at"] = _now()
+        if not room["participants"]:
+            room["emptied_at"] = room["updated_at"]
+        room_ids = self._sid_rooms.get(sid)
+        if room_ids is not None:
+            room_ids.discard(room["room_id"])
+            if not room_ids:
+                del self._sid_rooms[sid]
+        self._participants -= 1
+
+    async def create(self, room_id: str, **fields: Any) -> Room:
+        await self.delete(room_id)
+        room = self._rooms[room_id] = _new_room(room_id, {k: v for k, v in fields.items() if k != "participants"})
+        for sid in fields.get("participants", []):
+            self._add_participant(room, sid)
+        self._publish()
+        return self._view(room)
+
+    async def get(self, room_id: str) -> Optional[Room]:
+        return self._view(self._rooms.get(room_id))
+
+    async def join(self, room_id: str, sid: str, defaults: Optional[Dict[str, Any]] = None) -> Optional[Room]:
+        room = self._rooms.get(room_id)
+        if room is None:
+            if defaults is None:
+                return None
+            room = self._rooms[room_id] = _new_room(room_id, defaults)
+        self._add_participant(room, sid)
+        self._publish()
+        return self._view(room)
+
+    async def leave(self, room_id: str, sid: str) -> Optional[Room]:
+        room = self._rooms.get(room_id)
+        if room is None:
+            return None
+        self._remove_participant(room, sid)
+        self._publish()
+        return self._view(room)
+
+    async def transition(self, room_id: str, expected: str, status: str, **fields: Any) -> Optional[Room]:
+        room = self._rooms.get(room_id)
+        if room is None or room["status"] != expected:
+            return None
+        room.update(fields, status=status)
+        return self._view(room)
+
+    async def rooms_for(self, sid: str) -> List[str]:
+        return list(self._sid_rooms.get(sid, ()))
+
+    async def delete(self, room_id: str) -> None:
+        room = self._rooms.get(room_id)
+        if room is None:
+            return
+        for sid in list(room["participants"]):
+            self._remove_participant(room, sid)
+        del self._rooms[room_id]
+        self._publish()
+
+    async def sweep(self, empty_grace_seconds: float, waiting_ttl_seconds: float) -> List[str]:
+        now = _now()
+        empty_before = now - datetime.timedelta(seconds=empty_grace_seconds)
+        idle_before = now - datetime.timedelta(seconds=waiting_ttl_seconds)
+        removed = []
+        for room_id, room in list(self._rooms.items()):
+            if room["emptied_at"] is not None and room["emptied_at"] < empty_before:
+                rooms_removed.inc(reason="empty")
+            elif room["status"] == WAITING and room["updated_at"] < idle_before:
+                rooms_removed.inc(reason="idle")
+            else:
+                continue
+            await self.delete(room_id)
+            removed.append(room_id)
+        return removed
+
+    async def counts(self) -> Dict[str, int]:
+        return {"rooms": len(self._rooms), "participants": self._participants}
+
+
+class MongoRoomStore(RoomStore):
+    """
+    Rooms in MongoDB, shared by every API worker. Joins and leaves are $addToSet/$pull
+    updates and status changes are filtered on the expected status, so concurrent
+    workers cannot lose a participant or start a room twice.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    @staticmethod
+    def _view(document: Optional[Dict[str, Any]]) -> Optional[Room]:
+        if document is None:
+            return None
+        document["room_id"] = document.pop("_id")
+        return document
+
+    async def ensure_indexes(self) -> None:
+        # The multikey index on participants is the sid -> rooms reverse index
+        await self._collection.create_index("participants")
+        await self._collection.create_index("emptied_at", sparse=True)
+        await self._collection.create_index([("status", 1), ("updated_at", 1)])
+
+    async def create(self, room_id: str, **fields: Any) -> Room:
+        room = _new_room(room_id, fields)
+        document = {"_id": room.pop("room_id"), **room}
+        await self._collection.replace_one({"_id": room_id}, document, upsert=True)
+        return self._view(document)
+
+    async def get(self, room_id: str) -> Optional[Room]:
+        return self._view(await self._collection.find_one({"_id": room_id}))
+
+    async def join(self, room_id: str, sid: str, defaults: Optional[Dict[str, Any]] = None) -> Optional[Room]:
+        update: Dict[str, Any] = {
+            "$addToSet": {"participants": sid},
+            "$set": {"updated_at": _now(), "emptied_at": None},
+        }
+        if defaults is not None:
+            initial = _new_room(room_id, defaults)
+            for field in ("room_id", "participants", "updated_at", "emptied_at"):
+                initial.pop(field)
+            update["$setOnInsert"] = initial
+        document = await self._collection.find_one_and_update(
+            {"_id": room_id}, update, upsert=defaults is not None, return_document=ReturnDocument.AFTER
+        )
+        return self._view(document)
+
+    async def leave(self, room_id: str, sid: str) -> Optional[Room]:
+        now = _now()
+        document = await self._collection.find_one_and_update(
+            {"_id": room_id, "participants": sid},
+            {"$pull": {"participants": sid}, "$set": {"updated_at": now}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if document is not None and not document["participants"]:
+            # Stamped separately: the update above cannot know it removed the last participant
+            await self._collection.update_one(
+                {"_id": room_id, "participants": {"$size": 0}, "emptied_at": None}, {"$set": {"emptied_at": now}}
+            )
+            document["emptied_at"] = now
+        return self._view(document) if document is not None else await self.get(room_id)
+
+    async def transition(self, room_id: str, expected: str, status: str, **fields: Any) -> Optional[Room]:
+        document = await self._collection.find_one_and_update(
+            {"_id": room_id, "status": expected},
+            {"$set": {**fields, "status": status}},
+            return_document=ReturnDocument.AFTER,
+        )
+        return self._view(document)
+
+    async def rooms_for(self, sid: str) -> List[str]:
+        return [document["_id"] async for document in self._collection.find({"participants": sid}, {"_id": 1})]
+
+    async def delete(self, room_id: str) -> None:
+        await self._collection.delete_one({"_id": room_id})
+
+    async def sweep(self, empty_grace_seconds: float, waiting_ttl_seconds: float) -> List[str]:
+        now = _now()
+        removed = []
+        for reason, query in (
+            ("empty", {"emptied_at": {"$lt": now - datetime.timedelta(seconds=empty_grace_seconds)}}),
+            ("idle", {"status": WAITING, "updated_at": {"$lt": now - datetime.timedelta(seconds=waiting_ttl_seconds)}}),
+        ):
+            async for document in self._collection.find(query, {"_id": 1}):
+                # Re-checked on delete, so a room joined in the meantime is kept
+                if await self._collection.find_one_and_delete({"_id": document["_id"], **query}, projection={"_id": 1}):
+                    rooms_removed.inc(reason=reason)
+                    removed.append(document["_id"])
+        return removed
+
+    async def counts(self) -> Dict[str, int]:
+        totals = await self._collection.aggregate([
+            {"$group": {"_id": None, "rooms": {"$sum": 1}, "participants": {"$sum": {"$size": "$participants"}}}},
+        ]).to_list(1)
+        counts = {"rooms": totals[0]["rooms"], "participants": totals[0]["participants"]} if totals else {"rooms": 0, "participants": 0}
+        live_rooms.set(counts["rooms"])
+        live_participants.set(counts["participants"])
+        return counts
+
+
+def create_room_store() -> RoomStore:
+    if settings.GD_ROOM_STORE == "mongo":
+        return MongoRoomStore(room_collection)
+    if settings.GD_ROOM_STORE != "memory":
+        raise ValueError(f"Unknown GD_ROOM_STORE {settings.GD_ROOM_STORE!r}; expected 'memory' or 'mongo'.")
+    return MemoryRoomStore()
+
+
+room_store = create_room_store()
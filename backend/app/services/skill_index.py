@@ -0,0 +1,103 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# --- Helpers ---
+
+def _is_word_char(char: str) -> bool:
+    """Mirrors the regex notion of a word character (\\w)."""
+    return char.isalnum() or char == "_"
+
+
+# --- Skill Index ---
+
+class SkillIndex:
+    """
+    An Aho-Corasick automaton over a skill taxonomy.
+
+    The automaton is built once from canonical skill names (plus optional aliases)
+    and then finds every skill in a text with a single linear pass, independent of
+    how many skills are indexed. Matching is case-insensitive and a match only
+    counts when it is not glued to a neighbouring word character, so "Java" does
+    not match inside "JavaScript" while "C++" and "C#" still match. Aliases must also
+    not follow a ".", so "JS" is not reported for "Node.js".
+    """
+
+    def __init__(self, skills: Iterable[str], aliases: Optional[Dict[str, Iterable[str]]] = None):
+        # Each state is a dict of transitions; outputs hold (pattern length, canonical name, is alias).
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Tuple[int, str, bool]]] = [[]]
+        self.size = 0
+
+        for skill in skills:
+            self._add(skill, skill)
+        for canonical, alias_list in (aliases or {}).items():
+            for alias in alias_list:
+                self._add(alias, canonical, is_alias=True)
+        self._build_failure_links()
+
+    def _add(self, pattern: str, canonical: str, is_alias: bool = False) -> None:
+        key = pattern.strip().lower()
+        if not key:
+            return
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        output = (len(key), canonical, is_alias)
+        if output not in self._outputs[state]:
+            self._outputs[state].append(output)
+            self.size += 1
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # Inherit the matches of the longest proper suffix so lookups stay O(1).
+                inherited = self._outputs[self._fail[next_state]]
+                if inherited:
+                    self._outputs[next_state] = self._outputs[next_state] + inherited
+
+    def find(self, text: str) -> Set[str]:
+        """Returns the canonical names of every skill that occurs in the text."""
+        found: Set[str] = set()
+        if not text:
+            return found
+
+        haystack = text.lower()
+        length = len(haystack)
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for position, char in enumerate(haystack):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not outputs[state]:
+                continue
+            end = position + 1
+            if end < length and _is_word_char(haystack[end]):
+                continue
+            for pattern_length, canonical, is_alias in outputs[state]:
+                start = end - pattern_length
+                if start > 0 and (_is_word_char(haystack[start - 1]) or (is_alias and haystack[start - 1] == ".")):
+                    continue
+                found.add(canonical)
+        return found
+
+    def extract(self, text: str) -> List[str]:
+        """Returns the matched canonical skills sorted case-insensitively."""
+        return sorted(self.find(text), key=str.lower)
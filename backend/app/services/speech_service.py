@@ -0,0 +1,360 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from ..core.config import settings
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# --- Metrics ---
+
+tts_requests = metrics.counter("tts_clips_total", "Synthesized speech clips by backend and cache result.")
+tts_seconds = metrics.histogram("tts_synthesis_seconds", "Time spent synthesizing one uncached clip, by backend.")
+
+# --- Sentence Splitting ---
+
+# End of a sentence: terminal punctuation, optional closing quotes/brackets, then whitespace
+SENTENCE_END_PATTERN = re.compile(r'(?<=[.!?])["\')\]]*\s+')
+
+# Fragments shorter than this ("Hi.", "Mr.") are merged into the following sentence,
+# which avoids synthesizing tiny clips and splitting on most abbreviations
+MIN_SENTENCE_CHARS = 20
+
+
+class SentenceSplitter:
+    """
+    Cuts streamed text into sentences incrementally. Feed it deltas as they arrive;
+    it returns each sentence as soon as the whitespace after it has been seen.
+    """
+
+    def __init__(self, min_chars: int = MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        self._buffer += delta
+        sentences = []
+        start = 0
+        for match in SENTENCE_END_PATTERN.finditer(self._buffer):
+            sentence = self._buffer[start:match.end()].strip()
+            if len(sentence) < self.min_chars:
+                continue
+            sentences.append(sentence)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Returns whatever text remains once the stream has ended."""
+        remainder, self._buffer = self._buffer.strip(), ""
+        return [remainder] if remainder else []
+
+
+def split_sentences(text: str) -> List[str]:
+    splitter = SentenceSplitter()
+    return splitter.feed(text) + splitter.flush()
+
+
+# --- Backends ---
+
+class TTSBackend(ABC):
+    """Turns one piece of text into one audio clip. Implementations are called from worker threads."""
+    name = ""
+    media_type = ""
+    extension = ""
+
+    @abstractmethod
+    def synthesize(self, text: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def join(self, clips: List[bytes]) -> bytes:
+        """Combines per-sentence clips into a single playable clip."""
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS. Needs network access; produces MP3."""
+    name = "gtts"
+    media_type = "audio/mpeg"
+    extension = "mp3"
+
+    def __init__(self, lang: str = "en"):
+        self.lang = lang
+
+    def synthesize(self, text: str) -> bytes:
+        from gtts import gTTS
+
+        audio_fp = io.BytesIO()
+        gTTS(text=text, lang=self.lang, slow=False).write_to_fp(audio_fp)
+        return audio_fp.getvalue()
+
+    def join(self, clips: List[bytes]) -> bytes:
+        # MP3 is a sequence of independent frames, so clips play back-to-back when concatenated
+        return b"".join(clips)
+
+
+class _WavBackend(TTSBackend):
+    media_type = "audio/wav"
+    extension = "wav"
+
+    def join(self, clips: List[bytes]) -> bytes:
+        if len(clips) == 1:
+            return clips[0]
+        output = io.BytesIO()
+        with wave.open(output, "wb") as joined:
+            for index, clip in enumerate(clips):
+                with wave.open(io.BytesIO(clip), "rb") as part:
+                    if index == 0:
+                        joined.setparams(part.getparams())
+                    joined.writeframes(part.readframes(part.getnframes()))
+        return output.getvalue()
+
+
+class EspeakBackend(_WavBackend):
+    """Local offline engine (espeak-ng or espeak). Produces WAV; no network needed."""
+    name = "espeak"
+
+    def __init__(self, voice: str = "en"):
+        self.voice = voice
+        self.executable = shutil.which("espeak-ng") or shutil.which("espeak")
+        if self.executable is None:
+            raise RuntimeError("TTS_BACKEND=espeak requires espeak-ng or espeak on the PATH.")
+
+    def synthesize(self, text: str) -> bytes:
+        result = subprocess.run(
+            [self.executable, "-v", self.voice, "--stdout", text],
+            capture_output=True,
+            check=True,
+            timeout=30,
+        )
+        return result.stdout
+
+
+class SilentBackend(_WavBackend):
+    """Silence proportional to the text length. For tests and development without audio."""
+    name = "silent"
+    sample_rate = 8000
+
+    def synthesize(self, text: str) -> bytes:
+        seconds = max(0.2, len(text) / 15)
+        output = io.BytesIO()
+        with wave.open(output, "wb") as clip:
+            clip.setnchannels(1)
+            clip.setsampwidth(1)
+            clip.setframerate(self.sample_rate)
+            clip.writeframes(b"\x80" * int(seconds * self.sample_rate))
+        return output.getvalue()
+
+
+BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    EspeakBackend.name: EspeakBackend,
+    SilentBackend.name: SilentBackend,
+}
+
+
+# --- Audio Cache ---
+
+# Clip ids are cache file names: a sha256 digest plus the backend's extension
+CLIP_ID_PATTERN = re.compile(r"^[0-9a-f]{64}\.(mp3|wav)$")
+MEDIA_TYPES = {"mp3": "audio/mpeg", "wav": "audio/wav"}
+
+class AudioCache:
+    """
+    Content-addressed clip cache on disk. Files are named by a hash of backend and text,
+    and evicted least-recently-used once the directory exceeds `max_bytes`. Pinned clips
+    (see `pin`) are skipped by eviction until their pin expires. Safe to use from several threads.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        # Clip key -> monotonic time until which it must not be evicted
+        self._pinned: Dict[str, float] = {}
+        self._total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def key(backend: TTSBackend, text: str) -> str:
+        digest = hashlib.sha256(f"{backend.name}:{text}".encode("utf-8")).hexdigest()
+        return f"{digest}.{backend.extension}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = os.path.join(self.directory, key)
+        try:
+            with open(path, "rb") as clip:
+                audio = clip.read()
+            # Keeps the on-disk order in line with recency, so the LRU survives restarts
+            os.utime(path)
+            return audio
+        except FileNotFoundError:
+            with self._lock:
+                self._total_bytes -= self._entries.pop(key, 0)
+            return None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def path(self, key: str) -> Optional[str]:
+        """Returns the file path of a cached clip, marking it as recently used."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = os.path.join(self.directory, key)
+        return path if os.path.exists(path) else None
+
+    def pin(self, key: str, seconds: float) -> None:
+        """Protects a clip from eviction for `seconds`, e.g. while a client has yet to fetch it."""
+        now = time.monotonic()
+        with self._lock:
+            self._pinned = {pinned: until for pinned, until in self._pinned.items() if until > now}
+            self._pinned[key] = max(self._pinned.get(key, 0.0), now + seconds)
+
+    def put(self, key: str, audio: bytes) -> None:
+        # Write to a temporary name first so readers never see a partial clip
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(audio)
+        os.replace(temp_path, os.path.join(self.directory, key))
+
+        with self._lock:
+            self._total_bytes += len(audio) - self._entries.pop(key, 0)
+            self._entries[key] = len(audio)
+            now = time.monotonic()
+            for evicted in list(self._entries):
+                if self._total_bytes <= self.max_bytes or len(self._entries) <= 1:
+                    break
+                if evicted == key or self._pinned.get(evicted, 0.0) > now:
+                    # Pinned clips may hold the cache over its cap until their pins expire
+                    continue
+                self._pinned.pop(evicted, None)
+                self._total_bytes -= self._entries.pop(evicted)
+                try:
+                    os.remove(os.path.join(self.directory, evicted))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self._total_bytes, "max_bytes": self.max_bytes}
+
+
+# --- Engine ---
+
+class SpeechEngine:
+    """
+    Runs a TTS backend in a bounded thread pool, off the event loop. Clips are cached per
+    sentence, so repeated phrases and the fixed parts of templated greetings are only
+    synthesized once; concurrent requests for the same uncached clip share one synthesis.
+    """
+
+    def __init__(self, backend: TTSBackend, cache: Optional[AudioCache], max_workers: int):
+        self.backend = backend
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="tts")
+        self._in_flight: Dict[str, "asyncio.Future[bytes]"] = {}
+
+    @property
+    def media_type(self) -> str:
+        return self.backend.media_type
+
+    def _synthesize_and_store(self, key: str, text: str) -> bytes:
+        started = time.perf_counter()
+        audio = self.backend.synthesize(text)
+        tts_seconds.observe(time.perf_counter() - started, backend=self.backend.name)
+        if self.cache is not None:
+            try:
+                self.cache.put(key, audio)
+            except OSError as e:
+                logger.warning(f"Could not cache TTS clip {key}: {e}")
+        return audio
+
+    async def synthesize_sentence(self, text: str) -> bytes:
+        """Returns the clip for one sentence, from the cache when possible."""
+        key = AudioCache.key(self.backend, text)
+        if self.cache is not None:
+            audio = await asyncio.get_running_loop().run_in_executor(self._executor, self.cache.get, key)
+            if audio is not None:
+                tts_requests.inc(backend=self.backend.name, result="hit")
+                return audio
+
+        future = self._in_flight.get(key)
+        if future is None:
+            tts_requests.inc(backend=self.backend.name, result="miss")
+            future = asyncio.ensure_future(
+                asyncio.get_running_loop().run_in_executor(self._executor, self._synthesize_and_store, key, text)
+            )
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def synthesize(self, text: str) -> bytes:
+        """Synthesizes `text` sentence by sentence (in parallel) and joins the clips in order."""
+        sentences = split_sentences(text) or [text]
+        clips = await asyncio.gather(*(self.synthesize_sentence(sentence) for sentence in sentences))
+        return self.backend.join(list(clips))
+
+    async def synthesize_clip(self, text: str) -> str:
+        """
+        Synthesizes `text` into the audio cache and returns its clip id, so the audio can be
+        fetched by URL instead of being embedded in the JSON response.
+        """
+        if self.cache is None:
+            raise RuntimeError("Audio URLs require the TTS audio cache (TTS_CACHE_MAX_BYTES > 0).")
+        clip_id = AudioCache.key(self.backend, text)
+        # Pinned before the lookup, so the clip cannot be evicted between here and the client's GET
+        self.cache.pin(clip_id, settings.TTS_CLIP_PIN_SECONDS)
+        if clip_id not in self.cache:
+            audio = await self.synthesize(text)
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.cache.put, clip_id, audio)
+        return clip_id
+
+    def clip_path(self, clip_id: str) -> Optional[str]:
+        if self.cache is None or not CLIP_ID_PATTERN.match(clip_id):
+            return None
+        return self.cache.path(clip_id)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_engine() -> SpeechEngine:
+    backend_cls = BACKENDS.get(settings.TTS_BACKEND)
+    if backend_cls is None:
+        raise ValueError(f"Unknown TTS_BACKEND {settings.TTS_BACKEND!r}; expected one of {sorted(BACKENDS)}.")
+    cache = AudioCache(settings.TTS_CACHE_DIR, settings.TTS_CACHE_MAX_BYTES) if settings.TTS_CACHE_MAX_BYTES > 0 else None
+    return SpeechEngine(backend_cls(), cache, settings.TTS_MAX_WORKERS)
+
+
+speech_engine = create_engine()
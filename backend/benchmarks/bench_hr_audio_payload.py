@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: HR turn payloads with base64 audio in JSON vs. an audio URL plus raw bytes.
+
+Measures, per interviewer turn, the bytes on the wire and the time spent turning the
+audio into a response (server) and back into playable bytes (client).
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_hr_audio_payload
+"""
+import base64
+import json
+import os
+import time
+from typing import Callable, Tuple
+
+TURN_TEXT = (
+    "Thanks for sharing that. It sounds like you handled a difficult stakeholder with patience. "
+    "Could you tell me about a time you had to change your approach halfway through a project?"
+)
+
+# gTTS produces roughly 4 KB of MP3 per second of speech
+AUDIO_SIZES = {
+    "short turn (~5s)": 20 * 1024,
+    "typical turn (~15s)": 60 * 1024,
+    "long turn (~60s)": 240 * 1024,
+    "greeting + question (~4min)": 1024 * 1024,
+}
+
+CLIP_URL = "/api/v1/hr/audio/" + "0" * 64 + ".mp3"
+
+
+def inline_turn(audio: bytes) -> Tuple[bytes, bytes]:
+    """The original response: the whole MP3 base64-encoded inside the JSON body."""
+    body = json.dumps({
+        "text": TURN_TEXT,
+        "audio": base64.b64encode(audio).decode("utf-8"),
+        "interview_id": "a" * 36,
+    }).encode("utf-8")
+    return body, b""
+
+
+def url_turn(audio: bytes) -> Tuple[bytes, bytes]:
+    """audio_delivery="url": a small JSON body, with the MP3 fetched as raw bytes from the audio endpoint."""
+    body = json.dumps({
+        "text": TURN_TEXT,
+        "audio_url": CLIP_URL,
+        "audio_media_type": "audio/mpeg",
+        "interview_id": "a" * 36,
+    }).encode("utf-8")
+    return body, audio
+
+
+def decode_inline(body: bytes, _: bytes) -> bytes:
+    return base64.b64decode(json.loads(body)["audio"])
+
+
+def decode_url(body: bytes, audio: bytes) -> bytes:
+    json.loads(body)
+    return audio
+
+
+def time_per_call(fn: Callable[[], object], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    print(f"{'audio':<30}{'mode':<8}{'json bytes':>12}{'wire bytes':>12}{'encode ms':>11}{'decode ms':>11}")
+    for label, size in AUDIO_SIZES.items():
+        audio = os.urandom(size)
+        repeat = max(20, 20_000_000 // size)
+        for mode, encode, decode in (("inline", inline_turn, decode_inline), ("url", url_turn, decode_url)):
+            body, raw = encode(audio)
+            assert decode(body, raw) == audio
+            encode_ms = time_per_call(lambda: encode(audio), repeat) * 1000
+            decode_ms = time_per_call(lambda: decode(body, raw), repeat) * 1000
+            print(f"{label:<30}{mode:<8}{len(body):>12,}{len(body) + len(raw):>12,}{encode_ms:>11.3f}{decode_ms:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Micro-benchmark: per-skill regex loop vs. the prebuilt SkillIndex automaton.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_skill_index
+"""
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.skill_index import SkillIndex  # noqa: E402
+
+BASE_SKILLS = [
+    "Python", "Java", "C++", "C#", "JavaScript", "TypeScript", "HTML", "CSS", "React", "Angular", "Vue.js", "Node.js",
+    "Express.js", "FastAPI", "Django", "Flask", "Spring Boot", "Ruby on Rails",
+    "MongoDB", "SQL", "PostgreSQL", "MySQL", "NoSQL", "GraphQL",
+    "Git", "GitHub", "GitLab", "CI/CD", "Jenkins", "Docker", "Kubernetes", "Terraform",
+    "AWS", "Azure", "Google Cloud", "GCP", "Heroku",
+    "Machine Learning", "Data Analysis", "NLP", "Natural Language Processing", "Pandas", "NumPy", "Scikit-learn",
+    "TensorFlow", "PyTorch", "Project Management", "Agile", "Scrum", "JIRA",
+]
+
+RESUME_TEXT = """
+Jane Doe - Senior Software Engineer
+Experience
+Built FastAPI and Django services backed by PostgreSQL and MongoDB, deployed with Docker and Kubernetes on AWS.
+Led Machine Learning projects with PyTorch, Pandas and NumPy; owned CI/CD pipelines in Jenkins and GitHub Actions.
+Frontend work in React, TypeScript, HTML and CSS. Comfortable with Agile and Scrum, tracked in JIRA.
+""" * 4
+
+
+def legacy_extract_skills(text: str, skills_list: List[str]) -> List[str]:
+    """The original implementation: one regex search per skill."""
+    found_skills = set()
+    for skill in skills_list:
+        if re.search(r'\b' + re.escape(skill) + r'\b', text, re.IGNORECASE):
+            found_skills.add(skill)
+    return sorted(list(found_skills), key=str.lower)
+
+
+def make_taxonomy(size: int) -> List[str]:
+    rng = random.Random(size)
+    skills = list(BASE_SKILLS[:size])
+    while len(skills) < size:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(rng.randint(1, 3))]
+        skills.append(" ".join(words).title())
+    return skills
+
+
+def time_per_call(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    print(f"{'skills':>8} {'legacy ms':>12} {'index ms':>10} {'build ms':>10} {'speedup':>9}")
+    for size in (50, 5_000, 50_000):
+        skills = make_taxonomy(size)
+        repeat = 20 if size <= 5_000 else 3
+
+        build_start = time.perf_counter()
+        index = SkillIndex(skills)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        legacy = legacy_extract_skills(RESUME_TEXT, skills)
+        assert set(legacy) <= set(index.extract(RESUME_TEXT)), "index missed a skill found by the legacy loop"
+
+        legacy_ms = time_per_call(lambda: legacy_extract_skills(RESUME_TEXT, skills), repeat) * 1000
+        index_ms = time_per_call(lambda: index.extract(RESUME_TEXT), repeat * 10) * 1000
+        print(f"{size:>8} {legacy_ms:>12.2f} {index_ms:>10.3f} {build_ms:>10.1f} {legacy_ms / index_ms:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Local stand-in for the SerpAPI and Reddit search endpoints used by the interview review
+pipeline, for testing without API keys, quota or network access.
+
+Run from the backend directory, then point the API at it:
+
+    python -m benchmarks.review_sources_stub --port 8765 --delay 0.5
+    SERPAPI_BASE_URL=http://127.0.0.1:8765 REDDIT_BASE_URL=http://127.0.0.1:8765 uvicorn app.main:app
+
+Both APIs are served at /search.json: requests with an `engine` parameter get a SerpAPI
+response, the rest a Reddit one. `--fail-rate` makes a share of requests return 503,
+to exercise the circuit breakers.
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def serpapi_response(query: str) -> dict:
+    return {
+        "search_parameters": {"engine": "google", "q": query},
+        "organic_results": [
+            {"position": i + 1, "title": f"{query} #{i + 1}", "snippet": f"Stub snippet {i + 1}: candidates describe {query}."}
+            for i in range(5)
+        ],
+    }
+
+
+def reddit_response(query: str, limit: int) -> dict:
+    return {
+        "data": {
+            "children": [
+                {"data": {"title": f"{query} ({i + 1})", "selftext": f"Stub post {i + 1} about {query}: two rounds, one coding."}}
+                for i in range(limit)
+            ]
+        }
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    fail_rate = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        time.sleep(self.delay)
+        if url.path != "/search.json":
+            self._send(404, {"error": "not found"})
+        elif random.random() < self.fail_rate:
+            self._send(503, {"error": "stub failure"})
+        elif "engine" in params:
+            self._send(200, serpapi_response(params.get("q", "")))
+        else:
+            self._send(200, reddit_response(params.get("q", ""), int(params.get("limit", 5))))
+
+    def _send(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before every response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with 503")
+    args = parser.parse_args()
+
+    StubHandler.delay = args.delay
+    StubHandler.fail_rate = args.fail_rate
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Review sources stub listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
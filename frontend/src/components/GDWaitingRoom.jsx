@@ -29,9 +29,12 @@ const GDWaitingRoom = () => {
         // Join the room as soon as the component mounts
         newSocket.emit('join_room', { roomId });
 
-        // Listen for updates on the participant list
+        // Participant updates are deltas: apply who joined and who left since the last one
         newSocket.on('participant_update', (data) => {
-            setParticipants(data.participants);
+            setParticipants((current) => [
+                ...current.filter((sid) => !(data.left || []).includes(sid)),
+                ...(data.joined || []).filter((sid) => !current.includes(sid)),
+            ]);
         });
 
         // Listen for the signal to start the GD
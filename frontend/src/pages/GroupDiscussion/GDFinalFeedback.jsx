@@ -2,7 +2,8 @@ import React, { useState, useEffect } from 'react';
 import { useLocation, useNavigate } from 'react-router-dom';
 import { FaSpinner, FaLightbulb, FaThumbsUp, FaExclamationTriangle } from 'react-icons/fa';
 import './GDFinalFeedback.css';
-import apiClient from '../../services/api'; // Import the API client
+import axios from 'axios';
+import { postUntilReady } from '../../services/api';
 
 const GDFinalFeedback = () => {
     const location = useLocation();
@@ -19,11 +20,14 @@ const GDFinalFeedback = () => {
             return;
         }
 
+        const controller = new AbortController();
         const fetchFeedback = async () => {
             try {
-                const response = await apiClient.post('/gd/feedback', { transcript });
+                // 202 means the feedback job is still running; re-posting waits on the same job
+                const response = await postUntilReady('/gd/feedback', { transcript }, { signal: controller.signal });
                 setFeedback(response.data);
             } catch (err) {
+                if (axios.isCancel(err)) return;
                 console.error("Error generating feedback:", err);
                 setFeedback({ error: "Failed to generate feedback. Please try again." });
             } finally {
@@ -32,6 +36,7 @@ const GDFinalFeedback = () => {
         };
 
         fetchFeedback();
+        return () => controller.abort();
     }, [transcript]);
 
     // This handles the case where the user navigates directly to this page
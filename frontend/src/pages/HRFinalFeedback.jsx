@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import apiClient from '../services/api';
+import axios from 'axios';
+import { postUntilReady } from '../services/api';
 import { FaCheckCircle, FaExclamationTriangle, FaBullseye, FaSpinner, FaArrowLeft } from 'react-icons/fa';
 import './HRFinalFeedback.css';
 
@@ -31,12 +32,15 @@ const HRFinalFeedback = () => {
             return;
         }
 
+        const controller = new AbortController();
         const fetchFeedback = async () => {
             try {
                 // The backend endpoint is a POST request to trigger generation if needed
-                const response = await apiClient.post(`/hr/feedback/${interviewId}`);
+                // 202 means the feedback job is still running; re-posting waits on the same job
+                const response = await postUntilReady(`/hr/feedback/${interviewId}`, undefined, { signal: controller.signal });
                 setFeedback(response.data);
             } catch (err) {
+                if (axios.isCancel(err)) return;
                 console.error("Error fetching feedback:", err);
                 setError("Failed to load your interview feedback. Please try again later.");
             } finally {
@@ -45,6 +49,7 @@ const HRFinalFeedback = () => {
         };
 
         fetchFeedback();
+        return () => controller.abort();
     }, [interviewId]);
 
     if (loading) {
@@ -37,10 +37,10 @@ const HRInterview = () => {
                     ...formData,
                     conversation: [],
                 });
-                const { text, audio, interview_id } = response.data;
+                const { text, audio, audio_media_type, interview_id } = response.data;
                 setConversationHistory([{ speaker: 'HR', text }]);
                 setInterviewId(interview_id);
-                playAudioAndListen(audio);
+                playAudioAndListen(audio, audio_media_type);
             } catch (error) {
                 console.error("Error starting interview:", error);
                 alert("Could not start the interview. Please try again.");
@@ -62,12 +62,13 @@ const HRInterview = () => {
         setConversationHistory(newHistory);
 
         try {
+            // The server keeps the transcript; only the latest answer is sent
             const response = await apiClient.post('/hr/respond', {
                 ...formData,
-                conversation: newHistory,
+                answer: userText,
                 interview_id: interviewId,
             });
-            const { text, audio } = response.data;
+            const { text, audio, audio_media_type } = response.data;
 
             // Check if the interview is over
             if (text.toLowerCase().includes("thank you for your time")) {
@@ -75,7 +76,7 @@ const HRInterview = () => {
                 // Don't start listening again
             } else {
                 setConversationHistory(prev => [...prev, { speaker: 'HR', text }]);
-                playAudioAndListen(audio);
+                playAudioAndListen(audio, audio_media_type);
             }
         } catch (error) {
             console.error("Error getting AI response:", error);
@@ -206,8 +207,9 @@ const HRInterview = () => {
         }
     };
 
-    const playAudioAndListen = (audioBase64) => {
-        const audioSrc = `data:audio/mp3;base64,${audioBase64}`;
+    // The server names the clip's format (MP3 for gTTS, WAV for espeak); older servers only sent MP3
+    const playAudioAndListen = (audioBase64, mediaType = 'audio/mpeg') => {
+        const audioSrc = `data:${mediaType};base64,${audioBase64}`;
         if (audioRef.current) {
             audioRef.current.pause();
         }
@@ -20,4 +20,26 @@ apiClient.interceptors.request.use(
     (error) => Promise.reject(error)
 );
 
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// POSTs to a feedback endpoint until it stops answering 202 (job still running).
+// Retries back off exponentially and give up after maxAttempts; pass an AbortSignal to stop early.
+export const postUntilReady = async (url, body, { maxAttempts = 20, initialDelayMs = 1000, maxDelayMs = 8000, signal } = {}) => {
+    let delay = initialDelayMs;
+    for (let attempt = 1; ; attempt++) {
+        const response = await apiClient.post(url, body, { signal });
+        if (response.status !== 202) {
+            return response;
+        }
+        if (attempt >= maxAttempts) {
+            throw new Error('Feedback is taking longer than expected.');
+        }
+        await sleep(delay);
+        if (signal?.aborted) {
+            throw new axios.CanceledError();
+        }
+        delay = Math.min(delay * 2, maxDelayMs);
+    }
+};
+
 export default apiClient;
\ No newline at end of file